@@ -0,0 +1,140 @@
+import hashlib
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from config_and_database import extract_gps_info, check_image_metadata
+from ai_analysis import run_authenticity_cascade, determine_ocean_hazard_level
+from classifier_backends import classify_disaster_with_backend
+from video_analysis import analyze_video_bytes, VIDEO_EXTENSIONS
+
+# Background analysis jobs for the incident reporting wizard
+# Jobs are keyed by the SHA-256 of the uploaded bytes and shared by every
+# session in the server process, so reruns and duplicate uploads reuse the
+# finished result instead of re-running the pipeline.
+
+ANALYSIS_WORKERS = 4
+MAX_ACTIVE_JOBS = 32       # queued + running; beyond this uploads are told to retry
+MAX_RETAINED_JOBS = 256    # finished jobs kept for reuse
+
+_jobs_lock = threading.Lock()
+_jobs = OrderedDict()
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis-job")
+
+def compute_upload_hash(image_bytes):
+    """Job key for an uploaded file"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def _update_job(job_id, **changes):
+    with _jobs_lock:
+        if job_id in _jobs:
+            _jobs[job_id].update(changes)
+
+def _run_analysis_job(job_id, image_bytes):
+    """Full evidence analysis pipeline with stage progress reporting"""
+    try:
+        _update_job(job_id, status='running')
+        image = Image.open(BytesIO(image_bytes))
+
+        _update_job(job_id, stage="🗺️ Enhanced GPS Extraction...", progress=15)
+        lat, lon = extract_gps_info(image)
+
+        _update_job(job_id, stage="📅 Advanced Metadata Analysis...", progress=30)
+        is_recent, metadata_msg, camera_info = check_image_metadata(image)
+
+        _update_job(job_id, stage="🔍 Enhanced Authenticity Verification...", progress=50)
+        is_authentic, auth_score, auth_msg, authenticity_features = run_authenticity_cascade(image)
+
+        _update_job(job_id, stage="🎯 Enhanced Disaster Classification...", progress=70)
+        disaster_type, confidence, class_msg, classification_features = classify_disaster_with_backend(image)
+
+        _update_job(job_id, stage="🌊 Ocean Hazard Assessment...", progress=90)
+        ocean_hazard_level = determine_ocean_hazard_level(disaster_type)
+
+        result = {
+            'lat': lat, 'lon': lon,
+            'is_recent': is_recent, 'metadata_msg': metadata_msg, 'camera_info': camera_info,
+            'is_authentic': is_authentic, 'auth_score': auth_score, 'auth_msg': auth_msg,
+            'disaster_type': disaster_type, 'confidence': confidence, 'class_msg': class_msg,
+            'ocean_hazard_level': ocean_hazard_level,
+            'classification_features': classification_features,
+            'authenticity_features': authenticity_features
+        }
+        _update_job(job_id, status='done', stage="✅ Enhanced Analysis Complete!", progress=100,
+                    result=result, finished_at=datetime.now())
+    except Exception as e:
+        _update_job(job_id, status='failed', stage="❌ Analysis failed", progress=100,
+                    error=str(e), finished_at=datetime.now())
+
+def _run_video_analysis_job(job_id, video_bytes, extension):
+    """Keyframe analysis of an uploaded video with stage progress reporting"""
+    try:
+        _update_job(job_id, status='running', stage="🎞️ Detecting scene changes...", progress=15)
+
+        def report_scene(done, total):
+            _update_job(job_id, stage=f"🔍 Analyzing scene {done}/{total}...", progress=20 + int(70 * done / total))
+
+        verdict = analyze_video_bytes(video_bytes, extension, progress_callback=report_scene)
+
+        _update_job(job_id, stage="🌊 Ocean Hazard Assessment...", progress=95)
+        result = dict(verdict, lat=None, lon=None, is_recent=False, camera_info={},
+                      metadata_msg=f"🎞️ Video - {len(verdict['keyframes'])} scenes from {verdict['frames']} frames "
+                                   f"({verdict['duration']:.0f}s), no timestamp metadata",
+                      ocean_hazard_level=determine_ocean_hazard_level(verdict['disaster_type']))
+        _update_job(job_id, status='done', stage="✅ Enhanced Analysis Complete!", progress=100,
+                    result=result, finished_at=datetime.now())
+    except Exception as e:
+        _update_job(job_id, status='failed', stage="❌ Analysis failed", progress=100,
+                    error=str(e), finished_at=datetime.now())
+
+def _evict_finished_jobs():
+    finished = [job_id for job_id, job in _jobs.items() if job['status'] in ('done', 'failed')]
+    for job_id in finished[:max(len(finished) - MAX_RETAINED_JOBS, 0)]:
+        del _jobs[job_id]
+
+def submit_analysis_job(image_bytes, job_id=None, extension=None):
+    """Queue an upload for analysis, or return the existing job for the same bytes
+
+    Uploads with a video extension go through keyframe analysis.
+    """
+    job_id = job_id or compute_upload_hash(image_bytes)
+
+    with _jobs_lock:
+        if job_id in _jobs:
+            _jobs.move_to_end(job_id)
+            return dict(_jobs[job_id])
+
+        active = sum(1 for job in _jobs.values() if job['status'] in ('queued', 'running'))
+        if active >= MAX_ACTIVE_JOBS:
+            return {'id': job_id, 'status': 'busy', 'stage': "⏳ Analysis queue full - waiting for a free slot...",
+                    'progress': 0, 'result': None, 'error': None}
+
+        _jobs[job_id] = {
+            'id': job_id, 'status': 'queued', 'stage': "⏳ Queued for analysis...",
+            'progress': 5, 'result': None, 'error': None,
+            'submitted_at': datetime.now(), 'finished_at': None
+        }
+        _evict_finished_jobs()
+        job = dict(_jobs[job_id])
+
+    if extension and extension.lower() in VIDEO_EXTENSIONS:
+        _executor.submit(_run_video_analysis_job, job_id, image_bytes, extension.lower())
+    else:
+        _executor.submit(_run_analysis_job, job_id, image_bytes)
+    return job
+
+def get_analysis_job(job_id):
+    """Current snapshot of a job, or None if unknown"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+def get_analysis_queue_stats():
+    """Queued/running/finished job counts"""
+    with _jobs_lock:
+        stats = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for job in _jobs.values():
+            stats[job['status']] += 1
+        return stats
@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Columnar analytics export
+# Incidents, social media posts and audit logs are copied out of the live
+# SQLite file into Hive-partitioned Parquet datasets (month=YYYY-MM, plus
+# disaster_type for incidents) so heavy post-event queries never touch the
+# database the UI writes to. The source is opened read-only and read in
+# batches. Append-only tables export rows past the last exported id;
+# incidents change after they are reported, so they are re-exported as a
+# snapshot that replaces the previous one. Queries run in an in-memory
+# DuckDB over the Parquet files, or with Arrow compute when DuckDB is not
+# installed.
+
+# Same setting as config_and_database.DB_PATH, read here so the CLI does not import Streamlit
+ANALYTICS_SOURCE_DB = os.environ.get('HARBINGER_DB_PATH', 'enhanced_disaster_management.db')
+ANALYTICS_EXPORT_PATH = os.environ.get('HARBINGER_ANALYTICS_PATH', 'analytics_export')
+ANALYTICS_EXPORT_INTERVAL = int(os.environ.get('HARBINGER_ANALYTICS_INTERVAL', '3600'))   # seconds, 0 disables
+EXPORT_BATCH_ROWS = 50000
+EXPORT_STATE_FILE = '_export_state.json'
+UNKNOWN_PARTITION = 'unknown'
+
+EXPORT_TABLES = {
+    'incidents': {'partition_by': ('month', 'disaster_type'), 'append_only': False},
+    'social_media_posts': {'partition_by': ('month',), 'append_only': True},
+    'system_logs': {'partition_by': ('month',), 'append_only': True}
+}
+
+# Columns of incidents exported from a session's incident list
+SESSION_INCIDENT_COLUMNS = {
+    'id': 'INTEGER', 'timestamp': 'TEXT', 'location': 'TEXT', 'latitude': 'REAL', 'longitude': 'REAL',
+    'disaster_type': 'TEXT', 'severity': 'TEXT', 'description': 'TEXT', 'username': 'TEXT',
+    'verified': 'BOOLEAN', 'verified_by': 'TEXT', 'verification_time': 'TEXT',
+    'volunteer_assigned': 'BOOLEAN', 'assigned_volunteer': 'TEXT', 'assignment_time': 'TEXT',
+    'authenticity_score': 'REAL', 'priority_score': 'INTEGER', 'ocean_hazard_level': 'INTEGER'
+}
+
+_export_lock = threading.Lock()
+_exporter_thread = None
+_last_export = {'time': None, 'rows': {}, 'error': None}
+
+def _arrow_type(declared):
+    """Arrow type for a SQLite declared column type"""
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return pa.int64()
+    if 'REAL' in declared or 'FLOA' in declared or 'DOUB' in declared:
+        return pa.float64()
+    if 'BOOL' in declared:
+        return pa.bool_()
+    return pa.string()
+
+def _partition_values(rows, time_column, partition_by):
+    """Partition column values for rows (lists of column values keyed by name)"""
+    values = {}
+    if 'month' in partition_by:
+        values['month'] = [str(t)[:7] if t else UNKNOWN_PARTITION for t in rows[time_column]]
+    if 'disaster_type' in partition_by:
+        values['disaster_type'] = [value or UNKNOWN_PARTITION for value in rows['disaster_type']]
+    return values
+
+def _column_array(values, arrow_type):
+    if arrow_type == pa.bool_():
+        # SQLite stores booleans as integers
+        values = [None if value is None else bool(value) for value in values]
+    return pa.array(values, type=arrow_type)
+
+def columns_to_arrow(columns, rows, partition_by=()):
+    """Arrow table from {column: values} with the declared types, plus partition columns"""
+    arrays = {name: _column_array(rows[name], _arrow_type(declared)) for name, declared in columns.items()}
+    for name, values in _partition_values(rows, 'timestamp', partition_by).items():
+        arrays[name] = pa.array(values, type=pa.string())
+    return pa.table(arrays)
+
+def _write(table, directory, partition_by):
+    """Add a table's rows to a Hive-partitioned Parquet dataset as new files"""
+    partitioning = ds.partitioning(pa.schema([(name, pa.string()) for name in partition_by]), flavor='hive')
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    ds.write_dataset(table, directory, format='parquet', partitioning=partitioning,
+                     basename_template=f"part-{stamp}-{{i}}.parquet",
+                     existing_data_behavior='overwrite_or_ignore')
+
+def _swap_in(staging, directory):
+    """Replace a dataset directory with a freshly written one"""
+    previous = directory + '.previous'
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, previous)
+    os.rename(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+
+def _load_state(export_path):
+    try:
+        with open(os.path.join(export_path, EXPORT_STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(export_path, state):
+    path = os.path.join(export_path, EXPORT_STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+def open_source_readonly(db_path=ANALYTICS_SOURCE_DB):
+    """Read-only connection to the live database; never takes write locks"""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=60)
+
+def export_table(conn, table, export_path=ANALYTICS_EXPORT_PATH, state=None):
+    """Export one table to Parquet; returns the number of rows written"""
+    config = EXPORT_TABLES[table]
+    columns = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if not columns:
+        return 0
+    state = state if state is not None else {}
+    directory = os.path.join(export_path, table)
+    staging = directory + '.staging'
+    shutil.rmtree(staging, ignore_errors=True)
+
+    last_id = state.get(table, 0) if config['append_only'] else 0
+    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+    names = [description[0] for description in cursor.description]
+    written = 0
+    while True:
+        batch = cursor.fetchmany(EXPORT_BATCH_ROWS)
+        if not batch:
+            break
+        rows = {name: list(values) for name, values in zip(names, zip(*batch))}
+        table_data = columns_to_arrow(columns, rows, config['partition_by'])
+        _write(table_data, directory if config['append_only'] else staging, config['partition_by'])
+        written += len(batch)
+        last_id = max(last_id, rows['id'][-1])
+
+    if config['append_only']:
+        state[table] = last_id
+    elif written:
+        _swap_in(staging, directory)
+    shutil.rmtree(staging, ignore_errors=True)
+    return written
+
+def export_analytics_tables(db_path=ANALYTICS_SOURCE_DB, export_path=ANALYTICS_EXPORT_PATH, tables=None):
+    """Export the configured tables; returns rows written per table"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for the analytics export (pip install pyarrow)")
+    with _export_lock:
+        os.makedirs(export_path, exist_ok=True)
+        state = _load_state(export_path)
+        conn = open_source_readonly(db_path)
+        try:
+            written = {table: export_table(conn, table, export_path, state) for table in (tables or EXPORT_TABLES)}
+        finally:
+            conn.close()
+        _save_state(export_path, state)
+        _last_export.update({'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'rows': written, 'error': None})
+        return written
+
+def export_session_incidents(incidents, export_path=ANALYTICS_EXPORT_PATH):
+    """Snapshot a session's incident list to the session_incidents dataset; returns the rows written"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for the analytics export (pip install pyarrow)")
+    partition_by = EXPORT_TABLES['incidents']['partition_by']
+    rows = {name: [incident.get(name) for incident in incidents] for name in SESSION_INCIDENT_COLUMNS}
+    directory = os.path.join(export_path, 'session_incidents')
+    with _export_lock:
+        staging = directory + '.staging'
+        shutil.rmtree(staging, ignore_errors=True)
+        for start in range(0, len(incidents), EXPORT_BATCH_ROWS):
+            batch = {name: values[start:start + EXPORT_BATCH_ROWS] for name, values in rows.items()}
+            _write(columns_to_arrow(SESSION_INCIDENT_COLUMNS, batch, partition_by), staging, partition_by)
+        if incidents:
+            _swap_in(staging, directory)
+    return len(incidents)
+
+def _export_loop(interval, db_path, export_path):
+    while True:
+        try:
+            if os.path.exists(db_path):
+                export_analytics_tables(db_path, export_path)
+        except Exception as e:
+            _last_export['error'] = str(e)
+        time.sleep(interval)
+
+def start_periodic_export(interval=ANALYTICS_EXPORT_INTERVAL, db_path=ANALYTICS_SOURCE_DB,
+                          export_path=ANALYTICS_EXPORT_PATH):
+    """Start the background exporter once per process; False if disabled or pyarrow is missing"""
+    global _exporter_thread
+    if interval <= 0 or not PYARROW_AVAILABLE:
+        return False
+    with _export_lock:
+        if _exporter_thread is None:
+            _exporter_thread = threading.Thread(target=_export_loop, args=(interval, db_path, export_path),
+                                                name="analytics-export", daemon=True)
+            _exporter_thread.start()
+    return True
+
+def get_analytics_export_status():
+    """Last export time, rows written per table and error, if any"""
+    return dict(_last_export, running=_exporter_thread is not None)
+
+def exported_datasets(export_path=ANALYTICS_EXPORT_PATH):
+    """Names of the Parquet datasets present under the export path"""
+    if not os.path.isdir(export_path):
+        return []
+    return sorted(name for name in os.listdir(export_path)
+                  if os.path.isdir(os.path.join(export_path, name)) and '.' not in name)
+
+def analytics_connection(export_path=ANALYTICS_EXPORT_PATH):
+    """In-memory DuckDB with one view per exported dataset, isolated from the live database
+
+    Ad-hoc SQL can only read the export directory: file access elsewhere,
+    extension loading and writes through COPY/ATTACH are disabled once the
+    views exist.
+    """
+    if not DUCKDB_AVAILABLE:
+        raise RuntimeError("DuckDB is not installed (pip install duckdb)")
+    export_path = os.path.abspath(export_path)
+    conn = duckdb.connect(':memory:')
+    for name in exported_datasets(export_path):
+        pattern = os.path.join(export_path, name, '**', '*.parquet').replace("'", "''")
+        conn.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{pattern}', "
+                     f"hive_partitioning = true, union_by_name = true)")
+    conn.execute("SET allowed_directories = ?", [[export_path + os.sep]])
+    conn.execute("SET enable_external_access = false")
+    conn.execute("SET lock_configuration = true")
+    return conn
+
+def query_analytics(sql, export_path=ANALYTICS_EXPORT_PATH):
+    """Run an ad-hoc read-only SQL query over the exported datasets; returns a DataFrame"""
+    conn = analytics_connection(export_path)
+    try:
+        # COPY ... TO could still write inside the export directory
+        if any(statement.type not in (duckdb.StatementType.SELECT, duckdb.StatementType.EXPLAIN)
+               for statement in conn.extract_statements(sql)):
+            raise ValueError("Only SELECT queries can be run on the analytics export")
+        return conn.execute(sql).fetchdf()
+    finally:
+        conn.close()
+
+def summarize_dataset(name, group_by, export_path=ANALYTICS_EXPORT_PATH):
+    """Row counts per group with Arrow compute; the fallback when DuckDB is not installed"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for analytics queries (pip install pyarrow)")
+    dataset = ds.dataset(os.path.join(export_path, name), format='parquet', partitioning='hive')
+    table = dataset.to_table(columns=list(group_by))
+    return table.group_by(list(group_by)).aggregate([([], 'count_all')]).rename_columns(
+        list(group_by) + ['count']).to_pandas().sort_values(list(group_by))
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parquet analytics export and ad-hoc queries")
+    parser.add_argument("--db", default=ANALYTICS_SOURCE_DB)
+    parser.add_argument("--export-path", default=ANALYTICS_EXPORT_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export = subparsers.add_parser("export", help="Export the database tables to Parquet")
+    export.add_argument("--tables", nargs="+", choices=list(EXPORT_TABLES))
+    export.add_argument("--every", type=int, default=0, help="Keep exporting every N seconds")
+
+    query = subparsers.add_parser("query", help="Run SQL over the exported datasets (DuckDB)")
+    query.add_argument("sql")
+
+    summary = subparsers.add_parser("summary", help="Row counts per group (Arrow compute)")
+    summary.add_argument("dataset")
+    summary.add_argument("--by", nargs="+", default=["month"])
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        while True:
+            written = export_analytics_tables(args.db, args.export_path, args.tables)
+            print(", ".join(f"{table}: {rows} rows" for table, rows in written.items()), file=sys.stderr)
+            if not args.every:
+                break
+            time.sleep(args.every)
+    elif args.command == "query":
+        print(query_analytics(args.sql, args.export_path).to_string(index=False))
+    else:
+        print(summarize_dataset(args.dataset, args.by, args.export_path).to_string(index=False))
@@ -0,0 +1,155 @@
+import os
+import sys
+import time
+import itertools
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from PIL import Image
+import cv2
+from config_and_database import get_db_connection, init_enhanced_database
+from ai_analysis import run_authenticity_cascade, determine_ocean_hazard_level
+from classifier_backends import classify_disaster_with_backend
+from feature_store import build_feature_vector, append_feature_vectors
+
+# Bulk image ingestion for field team SD cards and social media feeds
+
+BATCH_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+DEFAULT_CHUNK_SIZE = 16
+DB_WRITE_BATCH_SIZE = 500
+
+def _init_batch_worker(opencv_threads):
+    """Keep OpenCV from spawning its own thread pool inside every worker process"""
+    cv2.setNumThreads(opencv_threads)
+    cv2.ocl.setUseOpenCL(False)
+
+def analyze_image_file(path):
+    """Run the classification and authenticity pipeline on one image file"""
+    result = {
+        'file_path': path,
+        'disaster_type': None,
+        'confidence': None,
+        'classification_notes': None,
+        'is_authentic': None,
+        'authenticity_score': None,
+        'authenticity_notes': None,
+        'ocean_hazard_level': 0,
+        'error': None,
+        'analyzed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    try:
+        with Image.open(path) as image:
+            image.load()
+            rgb_image = image if image.mode == 'RGB' else image.convert('RGB')
+
+            disaster_type, confidence, class_msg, classification_features = classify_disaster_with_backend(rgb_image)
+            is_authentic, auth_score, auth_msg, authenticity_features = run_authenticity_cascade(rgb_image)
+
+        result.update({
+            'disaster_type': disaster_type,
+            'confidence': float(confidence),
+            'classification_notes': class_msg,
+            'is_authentic': bool(is_authentic),
+            'authenticity_score': float(auth_score),
+            'authenticity_notes': auth_msg,
+            'ocean_hazard_level': determine_ocean_hazard_level(disaster_type),
+            'feature_vector': build_feature_vector(classification_features, authenticity_features,
+                                                   disaster_type, confidence, auth_score, is_authentic)
+        })
+    except Exception as e:
+        result['error'] = str(e)
+
+    return result
+
+def _analyze_chunk(paths):
+    return [analyze_image_file(path) for path in paths]
+
+def analyze_images_batch(paths, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, opencv_threads=1):
+    """Analyze many images over a process pool, yielding results as each chunk finishes"""
+    workers = workers or os.cpu_count() or 1
+    path_iter = iter(paths)
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_batch_worker,
+                             initargs=(opencv_threads,)) as pool:
+        in_flight = set()
+
+        def submit_next_chunk():
+            chunk = list(itertools.islice(path_iter, chunk_size))
+            if chunk:
+                in_flight.add(pool.submit(_analyze_chunk, chunk))
+            return bool(chunk)
+
+        while len(in_flight) < max_in_flight and submit_next_chunk():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                for result in future.result():
+                    yield result
+                submit_next_chunk()
+
+def collect_image_paths(inputs):
+    """Expand files and directories into a stream of image paths"""
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if name.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif item.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+            yield item
+
+def save_analysis_results(conn, results):
+    """Insert a batch of analysis results in one transaction"""
+    conn.executemany("""INSERT INTO image_analysis_results
+                        (file_path, disaster_type, confidence, classification_notes,
+                         is_authentic, authenticity_score, authenticity_notes,
+                         ocean_hazard_level, error, analyzed_at)
+                        VALUES (:file_path, :disaster_type, :confidence, :classification_notes,
+                                :is_authentic, :authenticity_score, :authenticity_notes,
+                                :ocean_hazard_level, :error, :analyzed_at)""", results)
+    conn.commit()
+    append_feature_vectors([result['feature_vector'][0] for result in results if result.get('feature_vector') is not None])
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk-analyze incident images and store results in the database")
+    parser.add_argument("inputs", nargs="+", help="Image files or directories (searched recursively)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Images per work unit")
+    parser.add_argument("--opencv-threads", type=int, default=1, help="OpenCV threads per worker")
+    args = parser.parse_args()
+
+    init_enhanced_database()
+
+    analyzed = 0
+    failed = 0
+    pending = []
+    start = time.perf_counter()
+
+    with get_db_connection() as conn:
+        for result in analyze_images_batch(collect_image_paths(args.inputs), args.workers,
+                                           args.chunk_size, args.opencv_threads):
+            pending.append(result)
+            analyzed += 1
+            failed += result['error'] is not None
+
+            if len(pending) >= DB_WRITE_BATCH_SIZE:
+                save_analysis_results(conn, pending)
+                pending = []
+
+            if analyzed % 100 == 0:
+                rate = analyzed / (time.perf_counter() - start)
+                print(f"{analyzed} images analyzed ({rate:.1f} images/s)", file=sys.stderr)
+
+        if pending:
+            save_analysis_results(conn, pending)
+
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {analyzed} images ({failed} failed) in {elapsed:.1f}s")
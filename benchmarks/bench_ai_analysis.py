@@ -0,0 +1,187 @@
+"""Latency and peak memory of the ai_analysis functions at phone camera resolutions
+
+Usage:
+    python benchmarks/bench_ai_analysis.py --output results.json
+    python benchmarks/bench_ai_analysis.py --save-baseline           # record this machine's baseline
+    python benchmarks/bench_ai_analysis.py --baseline benchmarks/baseline_ai_analysis.json
+
+Exits with status 1 when a function is slower (p50) or uses more peak memory
+than the baseline by more than --tolerance.
+
+Peak memory is measured with tracemalloc in a separate untimed run, so it
+covers Python and NumPy allocations but not OpenCV's internal buffers.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import cv2
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_analysis import (classify_disaster_enhanced, advanced_deepfake_detection,
+                         detect_compression_artifacts_enhanced, analyze_water_authenticity)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_ai_analysis.json')
+
+# Megapixels -> (width, height), 4:3 like phone sensors
+RESOLUTIONS = {
+    1: (1152, 864),
+    12: (4000, 3000),
+    48: (8000, 6000)
+}
+DEFAULT_REPEATS = {1: 10, 12: 5, 48: 3}
+SCENES = ('water', 'fire', 'vegetation', 'noise')
+
+def make_scene(scene, width, height, seed=0):
+    """Deterministic synthetic RGB scene; structure is drawn small and upscaled"""
+    cv2.setRNGSeed(seed)
+    rng = np.random.default_rng(seed)
+    small_w, small_h = 400, 300
+    y, x = np.mgrid[0:small_h, 0:small_w].astype(np.float32)
+
+    if scene == 'water':
+        ripple = 20 * np.sin(x / 9 + np.sin(y / 23) * 3) + 10 * np.sin(y / 5)
+        small = np.dstack([40 + ripple * 0.3, 110 + ripple * 0.6, 190 + ripple])
+    elif scene == 'fire':
+        small = np.dstack([np.full_like(x, 40), np.full_like(x, 20), np.full_like(x, 15)])
+        for _ in range(12):
+            cx, cy, r = rng.uniform(0, small_w), rng.uniform(0, small_h), rng.uniform(20, 80)
+            flame = np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * r ** 2))
+            small += np.dstack([215 * flame, 110 * flame, 10 * flame])
+    elif scene == 'vegetation':
+        texture = rng.normal(0, 1, (small_h, small_w)).astype(np.float32)
+        texture = cv2.GaussianBlur(texture, (0, 0), 2) * 60
+        small = np.dstack([60 + texture * 0.4, 130 + texture, 50 + texture * 0.3])
+    elif scene == 'noise':
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        cv2.randu(image, 0, 256)
+        return image
+    else:
+        raise ValueError(f"Unknown scene: {scene}")
+
+    image = cv2.resize(np.clip(small, 0, 255).astype(np.uint8), (width, height), interpolation=cv2.INTER_LINEAR)
+    grain = np.empty_like(image)
+    cv2.randu(grain, 0, 24)
+    return cv2.subtract(cv2.add(image, grain), 12)
+
+def benchmark_targets(img_array):
+    """(name, callable) pairs, each called with inputs prepared outside the timing"""
+    image = Image.fromarray(img_array)
+    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    return [
+        ('classify_disaster_enhanced', lambda: classify_disaster_enhanced(image)),
+        ('advanced_deepfake_detection', lambda: advanced_deepfake_detection(image)),
+        ('detect_compression_artifacts_enhanced', lambda: detect_compression_artifacts_enhanced(gray)),
+        ('analyze_water_authenticity', lambda: analyze_water_authenticity(img_array))
+    ]
+
+def measure(function, repeats):
+    """Latency samples in ms and tracemalloc peak in MB"""
+    function()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline_bytes = tracemalloc.get_traced_memory()[0]
+    function()
+    peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+    tracemalloc.stop()
+
+    samples = np.array(samples)
+    return {
+        'repeats': repeats,
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p90_ms': float(np.percentile(samples, 90)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+        'max_ms': float(samples.max()),
+        'peak_mb': peak_bytes / 1024 ** 2
+    }
+
+def run_suite(megapixels, scenes, repeats=None, functions=None):
+    results = []
+    for mp in megapixels:
+        width, height = RESOLUTIONS[mp]
+        for scene in scenes:
+            img_array = make_scene(scene, width, height)
+            for name, function in benchmark_targets(img_array):
+                if functions and name not in functions:
+                    continue
+                result = measure(function, repeats or DEFAULT_REPEATS[mp])
+                result.update({'function': name, 'scene': scene, 'megapixels': mp})
+                results.append(result)
+                print(f"{name:<40}{scene:<12}{mp:>4} MP  p50 {result['p50_ms']:9.1f} ms  "
+                      f"p90 {result['p90_ms']:9.1f} ms  peak {result['peak_mb']:8.1f} MB", file=sys.stderr)
+            del img_array
+    return results
+
+def _result_key(result):
+    return f"{result['function']}/{result['scene']}/{result['megapixels']}"
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Regressions as (key, metric, baseline value, current value)"""
+    baseline_results = {_result_key(r): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = baseline_results.get(_result_key(result))
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'peak_mb'):
+            if result[metric] > previous[metric] * (1 + tolerance) and result[metric] - previous[metric] > 1:
+                regressions.append((_result_key(result), metric, previous[metric], result[metric]))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ai_analysis functions")
+    parser.add_argument("--megapixels", nargs="+", type=int, default=sorted(RESOLUTIONS), choices=sorted(RESOLUTIONS))
+    parser.add_argument("--scenes", nargs="+", default=list(SCENES), choices=SCENES)
+    parser.add_argument("--functions", nargs="+", help="Only benchmark these functions")
+    parser.add_argument("--repeats", type=int, help="Timed runs per case (default depends on resolution)")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/memory growth (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': run_suite(args.megapixels, args.scenes, args.repeats, args.functions)
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report['results'], json.load(f), args.tolerance)
+        for key, metric, previous, current in regressions:
+            print(f"REGRESSION {key} {metric}: {previous:.1f} -> {current:.1f} "
+                  f"({(current / previous - 1) * 100:+.0f}%)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}", file=sys.stderr)
@@ -0,0 +1,75 @@
+"""Latency and throughput of the disaster classifier backends
+
+Usage: python benchmarks/bench_classifier_backends.py --backends heuristic onnx --concurrency 1 8
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classifier_backends import (available_classifier_backends, classify_disaster_with_backend,
+                                 get_classifier_batch_stats)
+
+def make_test_images(count, width, height, seed=0):
+    """Noisy color-field images roughly like outdoor scenes"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        base = rng.integers(30, 220, size=3)
+        noise = rng.integers(-40, 40, size=(height, width, 3))
+        images.append(Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8)))
+    return images
+
+def run_backend(backend, images, requests, concurrency):
+    """Per-request latencies and overall throughput at a given concurrency"""
+    def timed_call(index):
+        start = time.perf_counter()
+        classify_disaster_with_backend(images[index % len(images)], backend=backend)
+        return time.perf_counter() - start
+
+    # Warm-up also triggers lazy model loading
+    for image in images[:2]:
+        classify_disaster_with_backend(image, backend=backend)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(timed_call, range(requests))))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'throughput': requests / elapsed
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=available_classifier_backends())
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--size", default="1280x720", help="Test image size WIDTHxHEIGHT")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    images = make_test_images(16, width, height)
+
+    print(f"{'backend':<12}{'threads':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'img/s':>10}")
+    for backend in args.backends:
+        probe = classify_disaster_with_backend(images[0], backend=backend)
+        if "model unavailable" in probe[2]:
+            print(f"{backend:<12} skipped: {probe[2].split('model unavailable: ', 1)[1][:-1]}")
+            continue
+
+        for concurrency in args.concurrency:
+            result = run_backend(backend, images, args.requests, concurrency)
+            print(f"{backend:<12}{concurrency:>8}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                  f"{result['p99_ms']:>10.1f}{result['throughput']:>10.1f}")
+
+    for backend, stats in get_classifier_batch_stats().items():
+        print(f"{backend} micro-batches: {stats['batches']}, avg size {stats['avg_batch_size']:.1f}")
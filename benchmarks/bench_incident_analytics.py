@@ -0,0 +1,57 @@
+"""Multi-year incident series: full-resolution SVG traces vs LTTB-downsampled WebGL traces
+
+Usage: python benchmarks/bench_incident_analytics.py --incidents 200000 --years 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incident_analytics import create_incident_rollups, add_incidents_to_rollups, update_incident_rollups, rollup_series, rollup_figure
+from bench_map_payload import make_incidents
+
+def full_resolution_figure(rollups, grain, dimension):
+    """Every bucket of every series as an SVG trace"""
+    x, series = rollup_series(rollups, grain, dimension)
+    figure = go.Figure()
+    for value, counts in series.items():
+        figure.add_trace(go.Scatter(x=pd.to_datetime(x, unit='s'), y=counts, mode='lines', name=str(value)))
+    return figure
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=200000)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    start = datetime.now() - timedelta(days=365 * args.years)
+    incidents = make_incidents(args.incidents)
+    for incident in incidents:
+        incident['timestamp'] = (start + timedelta(minutes=random.randrange(args.years * 365 * 24 * 60))).strftime("%Y-%m-%d %H:%M:%S")
+
+    rollups, build_ms = timed(lambda: add_incidents_to_rollups(create_incident_rollups(), incidents))
+    incidents[0]['severity'] = 'Critical'
+    _, update_ms = timed(lambda: update_incident_rollups(rollups, incidents[0]))
+    print(f"{args.incidents} incidents over {args.years} years: rollups built in {build_ms:.0f} ms, "
+          f"one change applied in {update_ms:.2f} ms")
+
+    print(f"{'hourly series by type':<24}{'points':>10}{'build ms':>10}{'JSON KB':>10}")
+    for name, build in [("full resolution", lambda: full_resolution_figure(rollups, 'hour', 'disaster_type')),
+                        ("LTTB + WebGL", lambda: rollup_figure(rollups, 'hour', 'disaster_type'))]:
+        figure, ms = timed(build)
+        payload, json_ms = timed(figure.to_json)
+        points = sum(len(trace.x) for trace in figure.data)
+        print(f"{name:<24}{points:>10}{ms + json_ms:>10.0f}{len(payload) / 1024:>10.0f}")
@@ -0,0 +1,60 @@
+"""Naive in-memory GeoJSON export vs the streaming exporter: peak memory by export size
+
+Usage: python benchmarks/bench_incident_export.py --sizes 1000 100000 1000000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incident_export import EXPORT_COLUMNS, stream_incident_export, incident_matches
+
+def generate_rows(count):
+    """Incident rows produced on the fly, like a database cursor"""
+    for i in range(count):
+        yield {'id': i, 'timestamp': f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00",
+               'latitude': 8.0 + (i % 2700) / 100, 'longitude': 68.0 + (i % 2900) / 100,
+               'disaster_type': ('Flood', 'Cyclone/Storm', 'Tsunami')[i % 3], 'severity': 'High',
+               'description': "Water level rising near the embankment", 'username': f"reporter{i % 5000}",
+               'verified': i % 4 == 0, 'priority_score': i % 100, 'ocean_hazard_level': i % 4}
+
+def naive_geojson(rows):
+    """Every feature built in memory and serialized at once"""
+    features = [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [row['longitude'], row['latitude']]},
+                 'properties': {column: row.get(column) for column in EXPORT_COLUMNS}} for row in rows]
+    return json.dumps({'type': 'FeatureCollection', 'features': features}).encode('utf-8')
+
+def streamed(rows, export_format, compress):
+    return sum(len(chunk) for chunk in stream_incident_export(rows, export_format, compress))
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20, seconds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'export':>22}{'peak MB':>10}{'seconds':>10}")
+    for size in args.sizes:
+        for name, fn in [
+            ("naive geojson", lambda: naive_geojson(generate_rows(size))),
+            ("streamed geojson.gz", lambda: streamed(generate_rows(size), 'geojson', True)),
+            ("streamed csv.gz", lambda: streamed(generate_rows(size), 'csv', True)),
+            ("streamed parquet", lambda: streamed(generate_rows(size), 'parquet', False)),
+            ("streamed + filters", lambda: streamed((row for row in generate_rows(size) if incident_matches(
+                row, since="2025-06-01 00:00:00", bbox=(8.0, 68.0, 24.0, 80.0), disaster_types={'Tsunami'})),
+                'geojson', True))
+        ]:
+            peak_mb, seconds = measure(fn)
+            print(f"{size:>10}{name:>22}{peak_mb:>10.1f}{seconds:>10.1f}")
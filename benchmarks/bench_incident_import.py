@@ -0,0 +1,54 @@
+"""Per-row inserts vs the batched historical importer, with and without deferred indexes
+
+Usage: python benchmarks/bench_incident_import.py --records 200000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_and_database import get_db_connection, init_enhanced_database
+from incident_import import import_incidents, validate_record, score_batch
+
+def generate_records(count):
+    """Archive records with coordinates, as read from an IMD CSV"""
+    for i in range(count):
+        yield {'date': f"20{10 + i % 15}-{i % 12 + 1:02d}-{i % 28 + 1:02d} 06:00:00",
+               'place': f"Station {i % 400}", 'lat': str(8.0 + (i % 1400) / 100), 'lon': str(68.0 + (i % 2200) / 100),
+               'event_type': ('Flood', 'Cyclone/Storm', 'Tsunami', 'High Waves')[i % 4],
+               'intensity': ('Low', 'Medium', 'High', 'Critical')[i % 4], 'remarks': "Recorded by coastal station"}
+
+def per_row(records):
+    """One INSERT and commit per record, as incident reports are saved"""
+    with get_db_connection() as conn:
+        for record in records:
+            row = score_batch([validate_record(record)], "IMD")[0]
+            conn.execute("""INSERT INTO incidents
+                            (timestamp, location, latitude, longitude, disaster_type, severity, description,
+                             user_id, authenticity_score, priority_score, ocean_hazard_level)
+                            VALUES (:timestamp, :location, :latitude, :longitude, :disaster_type, :severity,
+                                    :description, :source, :authenticity_score, :priority_score,
+                                    :ocean_hazard_level)""", row)
+            conn.commit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--per-row-records", type=int, default=5000,
+                        help="Records for the per-row baseline, which is much slower")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    init_enhanced_database()
+
+    start = time.perf_counter()
+    per_row(generate_records(args.per_row_records))
+    seconds = time.perf_counter() - start
+    print(f"{'per-row insert + commit':>32}{args.per_row_records:>10}{args.per_row_records / seconds:>12.0f} rows/s")
+
+    for name, defer in [("executemany, live indexes", False), ("executemany, deferred indexes", True)]:
+        stats = import_incidents(generate_records(args.records), source="IMD", defer_indexes=defer)
+        print(f"{name:>32}{stats['imported']:>10}{stats['rows_per_second']:>12.0f} rows/s")
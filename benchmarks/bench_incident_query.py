@@ -0,0 +1,58 @@
+"""List-comprehension filters vs the bitmap query index
+
+Usage: python benchmarks/bench_incident_query.py --incidents 1000000
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incident_query import create_query_index, index_incidents, reindex_incident, query_incidents, incident_jurisdiction
+from bench_map_payload import make_incidents
+
+def best_ms(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=1000000)
+    args = parser.parse_args()
+
+    incidents = make_incidents(args.incidents)
+    start = time.perf_counter()
+    index = index_incidents(create_query_index(), incidents)
+    build_seconds = time.perf_counter() - start
+
+    jurisdiction = incident_jurisdiction(incidents[0])
+    cutoff = datetime.strptime(incidents[len(incidents) // 2]['timestamp'], "%Y-%m-%d %H:%M:%S")
+    since = (cutoff - datetime(1970, 1, 1)).total_seconds()
+    cutoff_text = cutoff.strftime("%Y-%m-%d %H:%M:%S")
+
+    # "unverified + ocean level >= 2 + Critical + <state> + recent"
+    def comprehension():
+        return [i for i, inc in enumerate(incidents)
+                if not inc.get('verified', False) and inc.get('ocean_hazard_level', 0) >= 2
+                and inc.get('severity') == 'Critical' and incident_jurisdiction(inc) == jurisdiction
+                and (inc.get('timestamp') or "") >= cutoff_text]
+
+    def indexed():
+        return query_incidents(index, since=since, min_ocean_level=2, verified=False,
+                               severity='Critical', jurisdiction=jurisdiction)
+
+    assert comprehension() == list(indexed())
+    print(f"{args.incidents} incidents (index built in {build_seconds:.1f}s), {len(indexed())} matches")
+    print(f"{'':<28}{'comprehension':>14}{'index':>10}{'ratio':>8}")
+    comprehension_ms, index_ms = best_ms(comprehension, 1), best_ms(indexed)
+    print(f"{'query (ms)':<28}{comprehension_ms:>14.1f}{index_ms:>10.1f}{comprehension_ms / index_ms:>7.1f}x")
+
+    changed = incidents[len(incidents) // 3]
+    changed['verified'] = not changed.get('verified', False)
+    print(f"{'reindex one write (ms)':<28}{'':>14}{best_ms(lambda: reindex_incident(index, changed)):>10.3f}")
@@ -0,0 +1,68 @@
+"""Incident dicts vs the columnar incident store: memory and dashboard metric latency
+
+Usage: python benchmarks/bench_incident_store.py --incidents 1000000
+"""
+import os
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incident_store import create_incident_store, append_incidents, incident_metrics, filter_incidents, incident_store_nbytes
+from bench_map_payload import make_incidents
+
+def dict_metrics(incidents, username=None):
+    """The dashboards' previous generator-expression metrics"""
+    if username is not None:
+        incidents = [inc for inc in incidents if inc.get('username') == username]
+    return {
+        'total': len(incidents),
+        'verified': sum(1 for inc in incidents if inc.get('verified', False)),
+        'high_priority': sum(1 for inc in incidents if inc.get('priority_score', 0) > 70),
+        'ocean': sum(1 for inc in incidents if inc.get('ocean_hazard_level', 0) > 0)
+    }
+
+def best_ms(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=1000000)
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    incidents = make_incidents(args.incidents)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    store = append_incidents(create_incident_store(), incidents)
+    build_seconds = time.perf_counter() - start
+    store_bytes = incident_store_nbytes(store)
+
+    username = incidents[0]['username']
+    expected = dict_metrics(incidents)
+    got = incident_metrics(store)
+    assert all(expected[key] == got[key] for key in expected), (expected, got)
+
+    print(f"{args.incidents} incidents (store built in {build_seconds:.1f}s)")
+    print(f"{'':<28}{'dicts':>12}{'store':>12}{'ratio':>8}")
+    print(f"{'bytes per incident':<28}{dict_bytes / args.incidents:>12.0f}{store_bytes / args.incidents:>12.0f}"
+          f"{dict_bytes / store_bytes:>7.1f}x")
+
+    for name, dict_fn, store_fn in [
+        ("system metrics (ms)", lambda: dict_metrics(incidents), lambda: incident_metrics(store)),
+        ("per-user metrics (ms)", lambda: dict_metrics(incidents, username),
+         lambda: incident_metrics(store, filter_incidents(store, username=username)))
+    ]:
+        dict_ms, store_ms = best_ms(dict_fn, 3), best_ms(store_fn)
+        print(f"{name:<28}{dict_ms:>12.1f}{store_ms:>12.1f}{dict_ms / store_ms:>7.1f}x")
@@ -0,0 +1,74 @@
+"""Live map payload size: per-marker HTML popups vs the compact GeoJSON layer
+
+Usage: python benchmarks/bench_map_payload.py --incidents 10000
+"""
+import os
+import sys
+import gzip
+import time
+import random
+import argparse
+import folium
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_layers import add_incident_geojson_layer, INCIDENT_COLOR_MAP
+from map_clustering import create_cluster_index, sync_cluster_index
+from ui_components import create_enhanced_india_map, incident_detail_html
+
+def make_incidents(count, seed=0):
+    """Synthetic incidents spread over India"""
+    rng = random.Random(seed)
+    types = list(INCIDENT_COLOR_MAP)
+    return [{
+        'id': i + 1,
+        'latitude': rng.uniform(8.0, 30.0),
+        'longitude': rng.uniform(68.0, 90.0),
+        'disaster_type': rng.choice(types),
+        'severity': rng.choice(['Low', 'Medium', 'High', 'Critical']),
+        'location': f"Ward {rng.randint(1, 200)}, District {rng.randint(1, 700)}",
+        'timestamp': "2026-10-19 12:00:00",
+        'username': f"reporter{rng.randint(1, 5000)}",
+        'description': "Water level rising quickly near the embankment, families moving to higher ground. " * 2,
+        'priority_score': rng.randint(10, 99),
+        'verified': rng.random() < 0.4,
+        'authenticity_score': rng.uniform(40, 95),
+        'ocean_hazard_level': rng.choice([0, 0, 1, 2, 3])
+    } for i in range(count)]
+
+def per_marker_map(incidents):
+    """The previous rendering: one Marker with an inline HTML popup per incident"""
+    m = folium.Map(location=[20.5937, 78.9629], zoom_start=5)
+    for incident in incidents:
+        folium.Marker(
+            location=[incident['latitude'], incident['longitude']],
+            popup=folium.Popup(incident_detail_html(incident), max_width=350),
+            icon=folium.Icon(color=INCIDENT_COLOR_MAP.get(incident['disaster_type'], 'gray'))
+        ).add_to(m)
+    return m
+
+def geojson_map(incidents):
+    m = folium.Map(location=[20.5937, 78.9629], zoom_start=5)
+    return add_incident_geojson_layer(m, incidents)
+
+def measure(name, build):
+    start = time.perf_counter()
+    html = build().get_root().render().encode('utf-8')
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28}{len(html) / 1024:>12.0f}{len(gzip.compress(html)) / 1024:>12.0f}{elapsed:>10.2f}")
+    return len(html)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=10000)
+    args = parser.parse_args()
+
+    incidents = make_incidents(args.incidents)
+    cluster_index = sync_cluster_index(create_cluster_index(), incidents)
+
+    print(f"{args.incidents} incidents")
+    print(f"{'layout':<28}{'KB':>12}{'gzip KB':>12}{'render s':>10}")
+    legacy = measure("per-marker popups", lambda: per_marker_map(incidents))
+    compact = measure("GeoJSON layer", lambda: geojson_map(incidents))
+    measure("clustered, national zoom", lambda: create_enhanced_india_map(incidents, zoom=5, cluster_index=cluster_index))
+    print(f"GeoJSON layer is {legacy / compact:.1f}x smaller than per-marker popups")
@@ -0,0 +1,50 @@
+"""Risk surface refresh time: full FFT rebuild vs incremental updates
+
+Usage: python benchmarks/bench_risk_surface.py --incidents 100000 --batch 50
+"""
+import os
+import sys
+import time
+import argparse
+import folium
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_surface import create_risk_surface, sync_risk_surface, risk_surface_density, add_risk_surface_overlay
+from bench_map_payload import make_incidents
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=50, help="New incidents per incremental refresh")
+    parser.add_argument("--refreshes", type=int, default=20)
+    args = parser.parse_args()
+
+    incidents = make_incidents(args.incidents + args.batch * args.refreshes)
+    initial = incidents[:args.incidents]
+
+    surface = create_risk_surface()
+    _, build_ms = timed(lambda: risk_surface_density(sync_risk_surface(surface, initial)))
+    print(f"{args.incidents} incidents on a {surface['weights'].shape[0]}x{surface['weights'].shape[1]} grid")
+    print(f"initial FFT build: {build_ms:.0f} ms")
+
+    update_ms = []
+    for i in range(args.refreshes):
+        end = args.incidents + (i + 1) * args.batch
+        _, elapsed = timed(lambda: risk_surface_density(sync_risk_surface(surface, incidents[:end])))
+        update_ms.append(elapsed)
+    print(f"incremental refresh (+{args.batch}): p50 {np.percentile(update_ms, 50):.1f} ms, "
+          f"max {max(update_ms):.1f} ms")
+
+    rebuilt = create_risk_surface()
+    expected = risk_surface_density(sync_risk_surface(rebuilt, incidents[:end]))
+    print(f"max difference from a full rebuild: {np.abs(expected - surface['density']).max():.2e}")
+
+    _, render_ms = timed(lambda: add_risk_surface_overlay(folium.Map(tiles=None), surface).get_root().render())
+    print(f"image overlay render: {render_ms:.0f} ms")
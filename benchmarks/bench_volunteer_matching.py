@@ -0,0 +1,74 @@
+"""Per-card haversine in Python vs the vectorized matrix and the per-session match cache
+
+Usage: python benchmarks/bench_volunteer_matching.py --incidents 100000 --volunteers 500
+"""
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incident_store import create_incident_store, sync_incident_store
+from volunteer_matching import (EARTH_RADIUS_KM, volunteer_distance_matrix, create_match_cache,
+                                sync_volunteer_matches, incident_match)
+from bench_map_payload import make_incidents
+
+def python_haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def best_ms(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=100000)
+    parser.add_argument("--volunteers", type=int, default=500)
+    parser.add_argument("--listed", type=int, default=500, help="Incidents shown to one volunteer")
+    args = parser.parse_args()
+
+    incidents = make_incidents(args.incidents)
+    rng = random.Random(1)
+    volunteers = {'latitude': np.array([rng.uniform(8.0, 30.0) for _ in range(args.volunteers)]),
+                  'longitude': np.array([rng.uniform(68.0, 90.0) for _ in range(args.volunteers)])}
+    volunteer = {'username': "volunteer1", 'latitude': volunteers['latitude'][:1],
+                 'longitude': volunteers['longitude'][:1], 'ocean_certified': True, 'responder': True}
+    listed = incidents[:args.listed]
+    open_lat = np.array([incident['latitude'] for incident in listed])
+    open_lon = np.array([incident['longitude'] for incident in listed])
+
+    v_lat, v_lon = volunteer['latitude'][0], volunteer['longitude'][0]
+    store = sync_incident_store(create_incident_store(), incidents, 0)
+    cache = create_match_cache()
+
+    def add_incidents(count=10):
+        for _ in range(count):
+            incident = dict(incidents[len(incidents) % args.incidents], id=len(incidents) + 1)
+            incidents.append(incident)
+            change_log.append((store['version'] + 1, incident))
+            sync_incident_store(store, incidents, store['version'] + 1, change_log)
+        return sync_volunteer_matches(cache, volunteer, store)
+
+    change_log = []
+    for name, fn, repeats in [
+        ("python loop, 1 volunteer x listed",
+         lambda: [python_haversine(v_lat, v_lon, i['latitude'], i['longitude']) for i in listed], 5),
+        ("python loop, all volunteers x listed",
+         lambda: [[python_haversine(lat, lon, i['latitude'], i['longitude']) for i in listed]
+                  for lat, lon in zip(volunteers['latitude'], volunteers['longitude'])], 1),
+        ("matrix, all volunteers x listed", lambda: volunteer_distance_matrix(volunteers, open_lat, open_lon), 5),
+        ("match cache, first sync over all incidents", lambda: sync_volunteer_matches(cache, volunteer, store), 1),
+        ("match cache, 10 new incidents + sync", add_incidents, 5),
+        ("match cache, lookups for listed", lambda: [incident_match(cache, i['id']) for i in listed], 5)
+    ]:
+        print(f"{name:>44}{best_ms(fn, repeats):>10.2f} ms")
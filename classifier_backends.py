@@ -0,0 +1,209 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+import cv2
+from ai_analysis import extract_classification_features, extract_location_context, score_classification_features
+from feature_store import CLASS_ORDER
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Pluggable disaster classifier backends
+# A backend is a predict_batch(items) function, where each item is
+# (RGB image array, feature dict with location context) and the result is a
+# list of (disaster_type, confidence, message). Model backends are loaded
+# once per process and fed through a micro-batcher shared by all sessions.
+
+CLASSIFIER_BACKEND = os.environ.get('HARBINGER_CLASSIFIER_BACKEND', 'heuristic')
+ONNX_MODEL_PATH = os.environ.get('HARBINGER_CLASSIFIER_MODEL', os.path.join('models', 'disaster_classifier.onnx'))
+ONNX_INTRA_OP_THREADS = int(os.environ.get('HARBINGER_ONNX_THREADS', '0'))   # 0 lets onnxruntime decide
+MODEL_INPUT_SIZE = 224
+MODEL_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+MODEL_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+MODEL_LABELS = CLASS_ORDER + ("Natural Disaster",)    # overridden by <model>.labels.txt
+
+MICRO_BATCH_SIZE = 16
+MICRO_BATCH_WAIT_MS = 5
+MICRO_BATCH_TIMEOUT = 30
+
+_backends = {}
+_active_backend = CLASSIFIER_BACKEND
+
+_onnx_lock = threading.Lock()
+_onnx_model = None
+
+_batchers_lock = threading.Lock()
+_batchers = {}
+_batch_stats = {}
+
+def register_classifier_backend(name, predict_batch, micro_batch=True):
+    """Add a backend; micro_batch=False runs it inline in the calling thread"""
+    _backends[name] = {'predict_batch': predict_batch, 'micro_batch': micro_batch}
+
+def available_classifier_backends():
+    """Registered backend names"""
+    return list(_backends)
+
+def get_classifier_backend():
+    """Backend used when none is passed explicitly"""
+    return _active_backend
+
+def set_classifier_backend(name):
+    """Switch the process-wide default backend"""
+    global _active_backend
+    if name not in _backends:
+        raise ValueError(f"Unknown classifier backend: {name}")
+    _active_backend = name
+
+def _heuristic_predict_batch(items):
+    """The hand-tuned color/texture rules"""
+    return [score_classification_features(features) for _, features in items]
+
+def load_onnx_classifier(model_path=None):
+    """ONNX Runtime session and labels, loaded once per process"""
+    global _onnx_model
+    with _onnx_lock:
+        if _onnx_model is None:
+            if not ONNXRUNTIME_AVAILABLE:
+                raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+
+            model_path = model_path or ONNX_MODEL_PATH
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+            session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+            labels = MODEL_LABELS
+            labels_path = os.path.splitext(model_path)[0] + '.labels.txt'
+            if os.path.exists(labels_path):
+                with open(labels_path) as f:
+                    labels = tuple(line.strip() for line in f if line.strip())
+
+            model_input = session.get_inputs()[0]
+            height, width = model_input.shape[2:4]
+            _onnx_model = {
+                'session': session,
+                'labels': labels,
+                'input_name': model_input.name,
+                'input_size': (height if isinstance(height, int) else MODEL_INPUT_SIZE,
+                               width if isinstance(width, int) else MODEL_INPUT_SIZE)
+            }
+    return _onnx_model
+
+def _preprocess_for_model(img_array, input_size):
+    """Resize and normalize an RGB array into a CHW float32 tensor"""
+    if img_array.ndim == 2:
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_GRAY2RGB)
+    img_array = img_array[:, :, :3]
+    resized = cv2.resize(img_array, (input_size[1], input_size[0]), interpolation=cv2.INTER_AREA)
+    tensor = (resized.astype(np.float32) / 255.0 - MODEL_MEAN) / MODEL_STD
+    return tensor.transpose(2, 0, 1)
+
+def _onnx_predict_batch(items):
+    """Trained classifier exported to ONNX, run on CPU"""
+    model = load_onnx_classifier()
+    batch = np.stack([_preprocess_for_model(img_array, model['input_size']) for img_array, _ in items])
+    logits = model['session'].run(None, {model['input_name']: batch})[0]
+
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    probabilities = exp / exp.sum(axis=1, keepdims=True)
+
+    results = []
+    for row in probabilities:
+        top, runner_up = np.argsort(row)[::-1][:2]
+        label = model['labels'][top]
+        message = (f"🧠 ONNX model: {label} ({row[top]:.0%}), "
+                   f"runner-up {model['labels'][runner_up]} ({row[runner_up]:.0%})")
+        results.append((label, round(float(row[top]) * 100, 1), message))
+    return results
+
+register_classifier_backend('heuristic', _heuristic_predict_batch, micro_batch=False)
+register_classifier_backend('onnx', _onnx_predict_batch)
+
+def _run_batcher(name, requests):
+    """Collect requests until the batch is full or the oldest has waited MICRO_BATCH_WAIT_MS"""
+    predict_batch = _backends[name]['predict_batch']
+    while True:
+        batch = [requests.get()]
+        deadline = time.perf_counter() + MICRO_BATCH_WAIT_MS / 1000
+        while len(batch) < MICRO_BATCH_SIZE:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        start = time.perf_counter()
+        try:
+            results = predict_batch([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+
+        with _batchers_lock:
+            stats = _batch_stats[name]
+            stats['batches'] += 1
+            stats['images'] += len(batch)
+            stats['seconds'] += time.perf_counter() - start
+
+def _submit_to_batcher(name, item):
+    with _batchers_lock:
+        if name not in _batchers:
+            requests = queue.Queue()
+            _batch_stats[name] = {'batches': 0, 'images': 0, 'seconds': 0.0}
+            threading.Thread(target=_run_batcher, args=(name, requests),
+                             name=f"classifier-batcher-{name}", daemon=True).start()
+            _batchers[name] = requests
+
+    future = Future()
+    _batchers[name].put((item, future))
+    return future
+
+def get_classifier_batch_stats():
+    """Per-backend micro-batch counts, average batch size and inference time"""
+    with _batchers_lock:
+        return {
+            name: dict(stats,
+                       avg_batch_size=stats['images'] / stats['batches'] if stats['batches'] else 0.0,
+                       avg_batch_ms=stats['seconds'] / stats['batches'] * 1000 if stats['batches'] else 0.0)
+            for name, stats in _batch_stats.items()
+        }
+
+def classify_disaster_with_backend(image, location_text="", additional_context="", backend=None):
+    """classify_disaster_with_features using the selected backend
+
+    Falls back to the heuristic rules if a model backend cannot run. The
+    backend that produced the label is recorded as features['classifier_backend'].
+    """
+    features = {}
+    try:
+        img_array = np.array(image)
+        features = extract_classification_features(img_array)
+        features.update(extract_location_context(location_text, additional_context))
+        item = (img_array, features)
+
+        name = backend or _active_backend
+        spec = _backends[name]
+        try:
+            if spec['micro_batch']:
+                result = _submit_to_batcher(name, item).result(timeout=MICRO_BATCH_TIMEOUT)
+            else:
+                result = spec['predict_batch']([item])[0]
+            features['classifier_backend'] = name
+        except Exception as e:
+            disaster_type, confidence, message = _heuristic_predict_batch([item])[0]
+            result = (disaster_type, confidence, f"{message} (model unavailable: {e})")
+            features['classifier_backend'] = 'heuristic'
+
+        return result + (features,)
+
+    except Exception as e:
+        return "Unknown", 50.0, f"Enhanced classification error: {e}", features
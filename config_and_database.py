@@ -31,8 +31,12 @@ import warnings
 import time
 from contextlib import contextmanager
 import re
+import uuid
 warnings.filterwarnings("ignore")
 
+INCIDENT_CHANGE_LOG_SIZE = 1000   # incident changes kept for incremental view updates
+DB_PATH = os.environ.get('HARBINGER_DB_PATH', 'enhanced_disaster_management.db')
+
 # Enhanced session state initialization
 if 'user_authenticated' not in st.session_state:
     st.session_state.user_authenticated = False
@@ -48,6 +52,36 @@ if 'chat_messages' not in st.session_state:
     st.session_state.chat_messages = []
 if 'ocean_warnings' not in st.session_state:
     st.session_state.ocean_warnings = []
+if 'incidents_version' not in st.session_state:
+    st.session_state.incidents_version = 0
+if 'incidents_dataset_id' not in st.session_state:
+    st.session_state.incidents_dataset_id = uuid.uuid4().hex
+if 'incident_changes' not in st.session_state:
+    st.session_state.incident_changes = []
+
+def bump_incidents_version(incident=None):
+    """Mark the session's incident list as changed so cached views are rebuilt
+
+    Pass the incident that was added or modified so views that keep their own
+    index (the work queues) can apply just that change.
+    """
+    st.session_state.incidents_version = st.session_state.get('incidents_version', 0) + 1
+    change_log = st.session_state.setdefault('incident_changes', [])
+    change_log.append((st.session_state.incidents_version, incident))
+    del change_log[:-INCIDENT_CHANGE_LOG_SIZE]
+
+def assign_volunteer_to_incident(incident_id, username):
+    """Assign a volunteer to an unassigned incident; False if it is gone or already taken"""
+    incident = next((inc for inc in st.session_state.incidents if inc.get('id') == incident_id), None)
+    if incident is None or incident.get('volunteer_assigned'):
+        return False
+
+    incident['volunteer_assigned'] = True
+    incident['assigned_volunteer'] = username
+    incident['assignment_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    bump_incidents_version(incident)
+    log_user_action("MISSION_ACCEPTED", f"Volunteer {username} accepted incident #{incident_id}")
+    return True
 
 # Enhanced database connection manager
 @contextmanager
@@ -58,14 +92,14 @@ def get_db_connection(retries=5, delay=0.3):
         try:
             # Remove lock files if they exist
             for suffix in ['-shm', '-wal']:
-                lock_file = f'enhanced_disaster_management.db{suffix}'
+                lock_file = f'{DB_PATH}{suffix}'
                 if os.path.exists(lock_file):
                     try:
                         os.remove(lock_file)
                     except:
                         pass
 
-            conn = sqlite3.connect('enhanced_disaster_management.db', timeout=60)
+            conn = sqlite3.connect(DB_PATH, timeout=60)
             # Enhanced performance settings
             conn.execute('PRAGMA journal_mode=WAL;')
             conn.execute('PRAGMA synchronous=NORMAL;')
@@ -171,8 +205,44 @@ def init_enhanced_database():
                       details TEXT, ip_address TEXT, user_agent TEXT,
                       timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
 
+        # Known-fake / recycled media corpus (perceptual hashes)
+        c.execute("""CREATE TABLE IF NOT EXISTS known_fake_media
+                     (id INTEGER PRIMARY KEY, phash INTEGER, source TEXT,
+                      description TEXT, original_date TEXT, file_path TEXT,
+                      added_at TEXT)""")
+
+        c.execute("""CREATE INDEX IF NOT EXISTS idx_known_fake_phash ON known_fake_media(phash)""")
+        c.execute("""SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_known_fake_phash_source'""")
+        if c.fetchone() is None:
+            # Earlier corpus reloads inserted the same hashes again; keep the first copy
+            c.execute("""DELETE FROM known_fake_media WHERE id NOT IN
+                         (SELECT MIN(id) FROM known_fake_media GROUP BY phash, source)""")
+            c.execute("""CREATE UNIQUE INDEX idx_known_fake_phash_source ON known_fake_media(phash, source)""")
+
+        # Bulk image analysis results (SD card / social feed ingestion)
+        c.execute("""CREATE TABLE IF NOT EXISTS image_analysis_results
+                     (id INTEGER PRIMARY KEY, file_path TEXT,
+                      disaster_type TEXT, confidence REAL, classification_notes TEXT,
+                      is_authentic BOOLEAN, authenticity_score REAL, authenticity_notes TEXT,
+                      ocean_hazard_level INTEGER DEFAULT 0, error TEXT,
+                      analyzed_at TEXT,
+                      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+
+        c.execute("""CREATE INDEX IF NOT EXISTS idx_analysis_file_path ON image_analysis_results(file_path)""")
+
         conn.commit()
 
+# Approximate state centers, used for state-level geocoding and incident jurisdictions
+STATE_CENTERS = {
+    'maharashtra': (19.7515, 75.7139), 'karnataka': (15.3173, 75.7139), 'tamil nadu': (11.1271, 78.6569),
+    'kerala': (10.8505, 76.2711), 'andhra pradesh': (15.9129, 79.7400), 'telangana': (18.1124, 79.0193),
+    'gujarat': (23.0225, 72.5714), 'rajasthan': (27.0238, 74.2179), 'madhya pradesh': (22.9734, 78.6569),
+    'uttar pradesh': (26.8467, 80.9462), 'bihar': (25.0961, 85.3131), 'west bengal': (22.9868, 87.8550),
+    'odisha': (20.9517, 85.0985), 'punjab': (31.1471, 75.3412), 'haryana': (29.0588, 76.0856),
+    'himachal pradesh': (31.1048, 77.1734), 'uttarakhand': (30.0668, 79.0193), 'jharkhand': (23.6102, 85.2799),
+    'chhattisgarh': (21.2787, 81.8661), 'assam': (26.2006, 92.9376), 'goa': (15.2993, 74.1240)
+}
+
 # Enhanced location geocoding with comprehensive Indian database
 def geocode_location_enhanced(location_text):
     """Enhanced location geocoding with comprehensive Indian location database"""
@@ -273,17 +343,7 @@ def geocode_location_enhanced(location_text):
             pass
 
     # Final fallback - try to extract state/region info
-    state_centers = {
-        'maharashtra': (19.7515, 75.7139), 'karnataka': (15.3173, 75.7139), 'tamil nadu': (11.1271, 78.6569),
-        'kerala': (10.8505, 76.2711), 'andhra pradesh': (15.9129, 79.7400), 'telangana': (18.1124, 79.0193),
-        'gujarat': (23.0225, 72.5714), 'rajasthan': (27.0238, 74.2179), 'madhya pradesh': (22.9734, 78.6569),
-        'uttar pradesh': (26.8467, 80.9462), 'bihar': (25.0961, 85.3131), 'west bengal': (22.9868, 87.8550),
-        'odisha': (20.9517, 85.0985), 'punjab': (31.1471, 75.3412), 'haryana': (29.0588, 76.0856),
-        'himachal pradesh': (31.1048, 77.1734), 'uttarakhand': (30.0668, 79.0193), 'jharkhand': (23.6102, 85.2799),
-        'chhattisgarh': (21.2787, 81.8661), 'assam': (26.2006, 92.9376), 'goa': (15.2993, 74.1240)
-    }
-
-    for state, coords in state_centers.items():
+    for state, coords in STATE_CENTERS.items():
         if state in location_lower:
             lat, lon = coords
             return lat, lon, f"📍 State-level match: {state.title()}"
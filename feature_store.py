@@ -0,0 +1,297 @@
+import os
+import time
+import json
+import threading
+import numpy as np
+from ai_analysis import (CLASSIFICATION_THRESHOLDS, AUTHENTICITY_POINTS, LOCATION_CONTEXT_KEYWORDS,
+                         AUTHENTIC_THRESHOLD, frequency_stage_max_points, authenticity_band)
+
+# Feature store for re-scoring classification and authenticity rules
+# Every analysed image appends one fixed-size structured record to a flat
+# binary file. Loading is a memory map, and the rule evaluators below mirror
+# score_classification_features / run_authenticity_cascade with NumPy so that
+# millions of stored vectors can be re-scored without decoding any image.
+
+FEATURE_STORE_DIR = os.environ.get('HARBINGER_FEATURE_STORE', 'feature_store')
+FEATURE_VECTORS_FILE = 'feature_vectors_v2.bin'   # v2 added classifier_backend to the record
+
+CLASSIFICATION_FEATURES = ('red_ratio', 'green_ratio', 'blue_ratio', 'avg_hue', 'avg_saturation',
+                           'avg_value', 'edge_density', 'water_smoothness', 'color_std_mean')
+CONTEXT_FLAGS = tuple(LOCATION_CONTEXT_KEYWORDS)
+AUTHENTICITY_FEATURES = ('variance', 'edge_density', 'edge_variance', 'color_variance',
+                         'saturation_mean', 'saturation_std', 'lab_variance', 'freq_variance',
+                         'freq_peak_count', 'compression_score', 'water_authenticity', 'header_penalty')
+
+FEATURE_VECTOR_DTYPE = np.dtype(
+    [('incident_id', '<i8'), ('image_hash', 'S64'), ('recorded_at', '<f8')]
+    + [('cls_' + name, '<f8') for name in CLASSIFICATION_FEATURES]
+    + [(flag, 'u1') for flag in CONTEXT_FLAGS]
+    + [('auth_' + name, '<f8') for name in AUTHENTICITY_FEATURES]
+    + [('recycled', 'u1'), ('classifier_backend', 'S16'), ('disaster_type', 'S40'), ('confidence', '<f8'),
+       ('authenticity_score', '<f8'), ('is_authentic', 'u1')]
+)
+
+# Column order of the vectorized classifier - must match the insertion
+# order of score_classification_features so ties resolve identically
+CLASS_ORDER = ('Flood', 'Tsunami', 'Coastal Surge', 'Storm Surge', 'Harmful Algal Bloom',
+               'Fire/Wildfire', 'Cyclone/Storm', 'Earthquake/Building Collapse', 'Landslide')
+OCEAN_CONTEXT_TYPES = ('Tsunami', 'Coastal Surge', 'Storm Surge', 'Harmful Algal Bloom')
+
+_store_lock = threading.Lock()
+
+def _store_path():
+    return os.path.join(FEATURE_STORE_DIR, FEATURE_VECTORS_FILE)
+
+def build_feature_vector(classification_features, authenticity_features, disaster_type, confidence,
+                         authenticity_score, is_authentic, incident_id=-1, image_hash=""):
+    """Pack one analysis into a structured feature record
+
+    The backend that produced disaster_type is taken from the classifier's
+    feature dict ('classifier_backend'), empty if classification failed.
+    """
+    record = np.zeros(1, dtype=FEATURE_VECTOR_DTYPE)
+    record['incident_id'] = incident_id if incident_id is not None else -1
+    record['image_hash'] = (image_hash or "").encode()[:64]
+    record['recorded_at'] = time.time()
+
+    for name in CLASSIFICATION_FEATURES:
+        record['cls_' + name] = classification_features.get(name, np.nan)
+    for flag in CONTEXT_FLAGS:
+        record[flag] = bool(classification_features.get(flag, False))
+    for name in AUTHENTICITY_FEATURES:
+        # Stage-3 features stay NaN when the cascade exited early
+        value = authenticity_features.get(name, np.nan)
+        record['auth_' + name] = np.sum(value) if np.ndim(value) else value
+
+    record['recycled'] = bool(authenticity_features.get('recycled', False))
+    record['classifier_backend'] = str(classification_features.get('classifier_backend', '')).encode()[:16]
+    record['disaster_type'] = str(disaster_type).encode()[:40]
+    record['confidence'] = confidence
+    record['authenticity_score'] = authenticity_score
+    record['is_authentic'] = bool(is_authentic)
+    return record
+
+def append_feature_vectors(records):
+    """Append records to the store"""
+    records = np.asarray(records, dtype=FEATURE_VECTOR_DTYPE)
+    if len(records) == 0:
+        return
+    with _store_lock:
+        os.makedirs(FEATURE_STORE_DIR, exist_ok=True)
+        with open(_store_path(), 'ab') as f:
+            f.write(records.tobytes())
+
+def load_feature_vectors():
+    """Memory-map every stored feature vector"""
+    path = _store_path()
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=FEATURE_VECTOR_DTYPE)
+
+    count = os.path.getsize(path) // FEATURE_VECTOR_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=FEATURE_VECTOR_DTYPE)
+    return np.memmap(path, dtype=FEATURE_VECTOR_DTYPE, mode='r', shape=(count,))
+
+def rescore_classifications(vectors, thresholds=None):
+    """Vectorized score_classification_features over stored vectors"""
+    conf, rank = classification_confidences(vectors, thresholds)
+
+    # max() over the dict keeps the first class reaching the best score
+    any_class = ~np.all(np.isnan(conf), axis=1)
+    best = np.full(len(vectors), 60.0)
+    best[any_class] = np.nanmax(conf[any_class], axis=1)
+    tie_rank = np.where(conf == best[:, None], rank, np.inf)
+    best_index = np.argmin(tie_rank, axis=1)
+
+    class_names = np.array(CLASS_ORDER + ("Natural Disaster",), dtype=object)
+    disaster_types = class_names[np.where(any_class, best_index, len(CLASS_ORDER))]
+    return disaster_types, np.minimum(best, 95)
+
+def classification_confidences(vectors, thresholds=None):
+    """Per-class rule confidences (NaN where a rule did not fire), columns in CLASS_ORDER
+
+    Also returns the insertion rank of each class, used to break ties.
+    """
+    t = dict(CLASSIFICATION_THRESHOLDS, **(thresholds or {}))
+    n = len(vectors)
+
+    r = vectors['cls_red_ratio']
+    g = vectors['cls_green_ratio']
+    b = vectors['cls_blue_ratio']
+    hue = vectors['cls_avg_hue']
+    sat = vectors['cls_avg_saturation']
+    val = vectors['cls_avg_value']
+    edge = vectors['cls_edge_density']
+    smooth = vectors['cls_water_smoothness']
+    color_std = vectors['cls_color_std_mean']
+
+    conf = np.full((n, len(CLASS_ORDER)), np.nan)
+    rank = np.tile(np.arange(len(CLASS_ORDER), dtype=np.float64), (n, 1))
+    col = {name: i for i, name in enumerate(CLASS_ORDER)}
+
+    water_indicators = ((b > t['water_blue_ratio']).astype(np.int64)
+                        + ((sat > t['water_saturation']) & (b > t['water_saturation_blue_ratio']))
+                        + ((smooth < t['water_smoothness']) & (b > t['water_smoothness_blue_ratio']))
+                        + ((t['water_hue_min'] < hue) & (hue < t['water_hue_max']) & (sat > t['water_hue_saturation'])))
+
+    flood = np.minimum((40 + water_indicators * 15) + np.where(b > 0.25, (b - 0.25) * 100, 0) + (sat / 255) * 25, 95)
+    conf[:, col['Flood']] = np.where(water_indicators >= t['flood_water_indicators'], flood, np.nan)
+
+    mask = (b > t['tsunami_blue_ratio']) & (smooth > t['tsunami_smoothness']) & (sat > t['tsunami_saturation'])
+    conf[:, col['Tsunami']] = np.where(mask, np.minimum((b - 0.35) * 200 + smooth, 90), np.nan)
+
+    mask = (b > t['surge_blue_ratio']) & (edge > t['surge_edge_density']) & (val > t['surge_value'])
+    conf[:, col['Coastal Surge']] = np.where(mask, np.minimum((b - 0.3) * 150 + edge * 200, 85), np.nan)
+
+    mask = (b > t['storm_surge_blue_ratio']) & (val < t['storm_surge_value']) & (edge > t['storm_surge_edge_density'])
+    conf[:, col['Storm Surge']] = np.where(mask, np.minimum((b - 0.25) * 120 + (1 - val/255) * 80, 80), np.nan)
+
+    mask = ((t['bloom_green_min'] < g) & (g < t['bloom_green_max']) & (r > t['bloom_red_ratio'])
+            & (sat > t['bloom_saturation']) & (t['bloom_hue_min'] < hue) & (hue < t['bloom_hue_max']))
+    conf[:, col['Harmful Algal Bloom']] = np.where(mask, np.minimum((g - 0.3) * 180 + (sat / 255) * 30, 75), np.nan)
+
+    mask = (r > t['fire_red_ratio']) & (hue < t['fire_hue'])
+    conf[:, col['Fire/Wildfire']] = np.where(mask, np.minimum((r - 0.3) * 250 + (sat / 255) * 40, 95), np.nan)
+
+    mask = (val < t['storm_value']) & (edge > t['storm_edge_density'])
+    conf[:, col['Cyclone/Storm']] = np.where(mask, np.minimum((1 - val/255) * 80 + edge * 120, 85), np.nan)
+
+    mask = (color_std > t['earthquake_color_std']) & (edge > t['earthquake_edge_density'])
+    conf[:, col['Earthquake/Building Collapse']] = np.where(mask, np.minimum(color_std / 1.8 + edge * 180, 80), np.nan)
+
+    brown_score = (r * 0.65 + g * 0.35 + b * 0.1)
+    mask = (brown_score > t['landslide_brown_score']) & (t['landslide_hue_min'] < hue) & (hue < t['landslide_hue_max'])
+    conf[:, col['Landslide']] = np.where(mask, np.minimum(brown_score * 120 + (hue - 15) * 1.5, 75), np.nan)
+
+    # Location context - classes added here are appended after the rule classes
+    ocean = vectors['ocean_context'].astype(bool)
+    for ocean_type in OCEAN_CONTEXT_TYPES:
+        present = ~np.isnan(conf[:, col[ocean_type]])
+        conf[ocean & present, col[ocean_type]] += 20
+        if ocean_type == 'Coastal Surge':
+            added = ocean & ~present & (b > t['ocean_context_blue_ratio'])
+            conf[added, col[ocean_type]] = 60
+            rank[added, col[ocean_type]] = len(CLASS_ORDER)
+
+    water = vectors['water_context'].astype(bool)
+    present = ~np.isnan(conf[:, col['Flood']])
+    conf[water & present, col['Flood']] += 25
+    added = water & ~present & (b > t['water_context_blue_ratio'])
+    conf[added, col['Flood']] = 70
+    rank[added, col['Flood']] = len(CLASS_ORDER) + 1
+
+    forest = vectors['forest_context'].astype(bool)
+    conf[forest, col['Fire/Wildfire']] += 15
+    conf[forest, col['Landslide']] += 12
+
+    urban = vectors['urban_context'].astype(bool)
+    conf[urban, col['Earthquake/Building Collapse']] += 15
+
+    return conf, rank
+
+def rescore_authenticity(vectors, points=None):
+    """Vectorized run_authenticity_cascade scoring over stored vectors
+
+    Returns scores, authentic flags and a mask of vectors whose cascade exited
+    before the frequency stage but would need it under the new point table.
+    """
+    p = dict(AUTHENTICITY_POINTS, **(points or {}))
+
+    variance = vectors['auth_variance']
+    tiers = p['variance_tiers']
+    pixel_points = np.select([variance > threshold for threshold, _ in tiers],
+                             [tier_points for _, tier_points in tiers], default=p['variance_floor']).astype(np.float64)
+
+    edge = vectors['auth_edge_density']
+    pixel_points += np.where((p['edge_density_min'] < edge) & (edge < p['edge_density_max']), p['edge_density_points'],
+                             np.where(edge > p['edge_density_weak'], p['edge_density_weak_points'], 0))
+    pixel_points += np.where(vectors['auth_edge_variance'] > p['edge_variance_min'], p['edge_variance_points'], 0)
+    pixel_points += np.minimum(vectors['auth_color_variance'] / p['color_variance_divisor'], p['color_variance_max'])
+
+    saturation = vectors['auth_saturation_mean']
+    saturation_band = (p['saturation_min'] < saturation) & (saturation < p['saturation_max'])
+    pixel_points += np.where(saturation_band, p['saturation_points'], 0)
+    pixel_points += np.where(saturation_band & (vectors['auth_saturation_std'] > p['saturation_std_min']), p['saturation_std_points'], 0)
+    pixel_points += np.where(vectors['auth_lab_variance'] > p['lab_variance_min'], p['lab_variance_points'], 0)
+
+    freq_points = np.where(vectors['auth_freq_variance'] > p['freq_variance_min'], p['freq_variance_points'], 0).astype(np.float64)
+    peaks = vectors['auth_freq_peak_count']
+    freq_points += np.where((p['freq_peak_min'] < peaks) & (peaks < p['freq_peak_max']), p['freq_peak_points'], 0)
+    compression = vectors['auth_compression_score']
+    freq_points += np.where((p['compression_min'] < compression) & (compression < p['compression_max']), p['compression_points'],
+                            np.where(compression > p['compression_weak'], p['compression_weak_points'], 0))
+    freq_points += np.where(vectors['auth_water_authenticity'] > p['water_authenticity_min'], p['water_authenticity_points'], 0)
+
+    penalty = np.nan_to_num(vectors['auth_header_penalty'])
+    lower_bound = np.maximum(np.minimum(pixel_points, 100) - penalty, 0)
+    upper_bound = np.maximum(np.minimum(pixel_points + frequency_stage_max_points(p), 100) - penalty, 0)
+    decided = authenticity_band(lower_bound) == authenticity_band(upper_bound)
+    has_frequency_stage = ~np.isnan(vectors['auth_freq_variance'])
+
+    full_score = np.maximum(np.minimum(pixel_points + freq_points, 100) - penalty, 0)
+    scores = np.where(decided, (lower_bound + upper_bound) / 2,
+                      np.where(has_frequency_stage, full_score, vectors['authenticity_score']))
+
+    recycled = vectors['recycled'].astype(bool)
+    scores = np.where(recycled, vectors['authenticity_score'], scores)
+    needs_full_analysis = ~recycled & ~decided & ~has_frequency_stage
+    return scores, scores > AUTHENTIC_THRESHOLD, needs_full_analysis
+
+def find_classification_flips(thresholds=None, points=None, vectors=None):
+    """Re-score stored vectors under new rules and report changed verdicts
+
+    Only labels from the heuristic backend are compared with the re-scored
+    rules; model labels are counted in 'model_classified' instead.
+    """
+    start = time.perf_counter()
+    vectors = load_feature_vectors() if vectors is None else vectors
+
+    disaster_types, confidences = rescore_classifications(vectors, thresholds)
+    scores, is_authentic, needs_full_analysis = rescore_authenticity(vectors, points)
+
+    stored_types = np.char.decode(vectors['disaster_type'], 'utf-8').astype(object)
+    heuristic = vectors['classifier_backend'] == b'heuristic'
+    type_flips = np.nonzero(heuristic & (disaster_types != stored_types))[0]
+    authenticity_flips = np.nonzero((is_authentic != vectors['is_authentic'].astype(bool)) & ~needs_full_analysis)[0]
+
+    def describe(index, old, new):
+        return {
+            'incident_id': int(vectors['incident_id'][index]),
+            'image_hash': vectors['image_hash'][index].decode(),
+            'old': old,
+            'new': new
+        }
+
+    return {
+        'vectors': len(vectors),
+        'seconds': time.perf_counter() - start,
+        'classification_flips': [describe(i, stored_types[i], disaster_types[i]) for i in type_flips],
+        'authenticity_flips': [describe(i, bool(vectors['is_authentic'][i]), bool(is_authentic[i])) for i in authenticity_flips],
+        'needs_full_analysis': int(np.sum(needs_full_analysis)),
+        'model_classified': int(np.sum(~heuristic))
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-score stored feature vectors with new rule thresholds")
+    parser.add_argument("--thresholds", help="JSON file overriding CLASSIFICATION_THRESHOLDS entries")
+    parser.add_argument("--points", help="JSON file overriding AUTHENTICITY_POINTS entries")
+    parser.add_argument("--limit", type=int, default=20, help="Flips to list per category")
+    args = parser.parse_args()
+
+    thresholds = json.load(open(args.thresholds)) if args.thresholds else None
+    points = json.load(open(args.points)) if args.points else None
+    report = find_classification_flips(thresholds, points)
+
+    print(f"Re-scored {report['vectors']} vectors in {report['seconds']:.2f}s")
+    print(f"Classification flips: {len(report['classification_flips'])}")
+    if report['model_classified']:
+        print(f"  ({report['model_classified']} vectors not labelled by the heuristic rules were not compared)")
+    for flip in report['classification_flips'][:args.limit]:
+        print(f"  incident {flip['incident_id']} ({flip['image_hash'][:12]}): {flip['old']} -> {flip['new']}")
+    print(f"Authenticity flips: {len(report['authenticity_flips'])}")
+    for flip in report['authenticity_flips'][:args.limit]:
+        print(f"  incident {flip['incident_id']} ({flip['image_hash'][:12]}): authentic {flip['old']} -> {flip['new']}")
+    if report['needs_full_analysis']:
+        print(f"{report['needs_full_analysis']} vectors skipped the frequency stage and need re-analysis under the new points")
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from incident_store import parse_timestamps, pending_incident_changes
+from incident_query import incident_jurisdiction
+
+# Incident analytics rollups
+# Counts per time bucket (hour/day/week) and value of each dimension are kept
+# in rollup tables keyed by (bucket start, value). New or changed incidents
+# adjust only the buckets they fall in: the previous values of a changed
+# incident are subtracted before its new ones are added. Charts are drawn
+# from dense per-value series, downsampled server-side with
+# Largest-Triangle-Three-Buckets and rendered as WebGL traces, so the
+# browser receives at most LTTB_POINTS points per trace whatever the span.
+
+ROLLUP_GRAINS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+WEEK_START_OFFSET = 3 * 86400   # 1970-01-01 was a Thursday; weeks start on Monday
+LTTB_POINTS = 1500
+
+ROLLUP_DIMENSIONS = {
+    'disaster_type': lambda incident: incident.get('disaster_type') or 'Other',
+    'severity': lambda incident: incident.get('severity') or 'Low',
+    'region': incident_jurisdiction,
+    'ocean_hazard_level': lambda incident: int(incident.get('ocean_hazard_level') or 0)
+}
+RESPONSE_FIELDS = {'assignment': 'assignment_time', 'verification': 'verification_time'}
+
+def create_incident_rollups():
+    """Empty rollup tables"""
+    return {
+        'counts': {grain: {dimension: {} for dimension in ROLLUP_DIMENSIONS} for grain in ROLLUP_GRAINS},
+        'row_ids': {},
+        'row_values': {dimension: [] for dimension in ROLLUP_DIMENSIONS},
+        'timestamps': [],
+        'response_minutes': {kind: {} for kind in RESPONSE_FIELDS},
+        'version': None
+    }
+
+def bucket_start(seconds, grain):
+    """Start of the hour/day/week bucket containing each epoch time"""
+    size = ROLLUP_GRAINS[grain]
+    offset = WEEK_START_OFFSET if grain == 'week' else 0
+    return np.floor((np.asarray(seconds) + offset) / size) * size - offset
+
+def _count(rollups, dimension, timestamps, values, sign):
+    """Add (sign=1) or remove (sign=-1) incidents from a dimension's tables at every grain"""
+    timed = ~np.isnan(timestamps)
+    if not timed.any():
+        return
+    codes, inverse = np.unique(np.array(values, dtype=object)[timed], return_inverse=True)
+    for grain, size in ROLLUP_GRAINS.items():
+        # One integer key per (bucket, value) pair so a 1-D unique does the grouping
+        offset = WEEK_START_OFFSET if grain == 'week' else 0
+        bucket_numbers = np.floor((timestamps[timed] + offset) / size).astype(np.int64)
+        keys, counts = np.unique(bucket_numbers * len(codes) + inverse.ravel(), return_counts=True)
+        table = rollups['counts'][grain][dimension]
+        for number, code, count in zip(keys // len(codes), keys % len(codes), counts):
+            key = (float(number * size - offset), codes[int(code)])
+            total = table.get(key, 0) + sign * int(count)
+            if total:
+                table[key] = total
+            else:
+                table.pop(key, None)
+
+def response_minutes(incident, kind):
+    """Minutes from report to assignment or verification, None if that has not happened"""
+    reported, responded = parse_timestamps([incident.get('timestamp'), incident.get(RESPONSE_FIELDS[kind])])
+    if np.isnan(reported) or np.isnan(responded):
+        return None
+    return (responded - reported) / 60
+
+def _record_responses(rollups, incident):
+    for kind, minutes in rollups['response_minutes'].items():
+        value = response_minutes(incident, kind)
+        if value is None:
+            minutes.pop(incident.get('id'), None)
+        else:
+            minutes[incident.get('id')] = value
+
+def add_incidents_to_rollups(rollups, incidents):
+    """Count new incidents"""
+    incidents = list(incidents)
+    if not incidents:
+        return rollups
+    start = len(rollups['timestamps'])
+    timestamps = parse_timestamps([incident.get('timestamp') for incident in incidents])
+    rollups['timestamps'].extend(timestamps.tolist())
+    for offset, incident in enumerate(incidents):
+        rollups['row_ids'][incident.get('id')] = start + offset
+        if any(incident.get(field) for field in RESPONSE_FIELDS.values()):
+            _record_responses(rollups, incident)
+    for dimension, extract in ROLLUP_DIMENSIONS.items():
+        values = [extract(incident) for incident in incidents]
+        rollups['row_values'][dimension].extend(values)
+        _count(rollups, dimension, timestamps, values, 1)
+    return rollups
+
+def update_incident_rollups(rollups, incident):
+    """Move a changed incident from the buckets of its previous values to those of its current ones"""
+    row = rollups['row_ids'].get(incident.get('id'))
+    if row is None:
+        return add_incidents_to_rollups(rollups, [incident])
+
+    old_timestamp = np.array([rollups['timestamps'][row]])
+    timestamp = parse_timestamps([incident.get('timestamp')])
+    for dimension, extract in ROLLUP_DIMENSIONS.items():
+        old, value = rollups['row_values'][dimension][row], extract(incident)
+        if value != old or not np.array_equal(timestamp, old_timestamp, equal_nan=True):
+            _count(rollups, dimension, old_timestamp, [old], -1)
+            _count(rollups, dimension, timestamp, [value], 1)
+            rollups['row_values'][dimension][row] = value
+    rollups['timestamps'][row] = float(timestamp[0])
+    _record_responses(rollups, incident)
+    return rollups
+
+def sync_incident_rollups(rollups, incidents, version, change_log=()):
+    """Bring the rollups up to version from the change log, rebuilding if it does not cover the gap"""
+    if rollups['version'] == version:
+        return rollups
+
+    changes = pending_incident_changes(change_log, rollups['version'], version)
+    if changes is None:
+        rollups.update(create_incident_rollups())
+        add_incidents_to_rollups(rollups, incidents)
+    else:
+        for incident in changes:
+            update_incident_rollups(rollups, incident)
+    rollups['version'] = version
+    return rollups
+
+def rollup_series(rollups, grain, dimension):
+    """Dense count series per value: (bucket starts, {value: counts}), with empty buckets as zero"""
+    table = rollups['counts'][grain][dimension]
+    if not table:
+        return np.zeros(0), {}
+    size = ROLLUP_GRAINS[grain]
+    buckets = np.fromiter((bucket for bucket, _ in table), dtype=np.float64, count=len(table))
+    values = np.array([value for _, value in table], dtype=object)
+    counts = np.fromiter(table.values(), dtype=np.float64, count=len(table))
+    x = np.arange(buckets.min(), buckets.max() + size, size)
+    positions = np.rint((buckets - x[0]) / size).astype(np.int64)
+
+    series = {}
+    for value in sorted(set(values), key=str):
+        matches = values == value
+        series[value] = np.zeros(len(x))
+        series[value][positions[matches]] = counts[matches]
+    return x, series
+
+def rollup_total(rollups, grain, since, until, dimension='disaster_type', accept=None):
+    """Incidents with a bucket start in [since, until), optionally only dimension values accepted by accept"""
+    return sum(count for (bucket, value), count in rollups['counts'][grain][dimension].items()
+               if since <= bucket < until and (accept is None or accept(value)))
+
+def lttb(x, y, threshold=LTTB_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling to at most threshold points
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    # Bucket averages in one pass; the next-bucket average of the last bucket is the final point
+    sizes = np.diff(np.append(edges, n))
+    avg_x = np.add.reduceat(x, edges) / sizes
+    avg_y = np.add.reduceat(y, edges) / sizes
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        areas = np.abs((x[a] - avg_x[i + 1]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a]))
+        a = selected[i + 1] = start + int(np.argmax(areas))
+    return x[selected], y[selected]
+
+def rollup_figure(rollups, grain, dimension, threshold=LTTB_POINTS):
+    """Plotly figure of per-value counts, one downsampled WebGL trace per value"""
+    x, series = rollup_series(rollups, grain, dimension)
+    figure = go.Figure()
+    for value, counts in series.items():
+        xs, ys = lttb(x, counts, threshold)
+        figure.add_trace(go.Scattergl(x=pd.to_datetime(xs, unit='s'), y=ys, mode='lines', name=str(value)))
+    figure.update_layout(height=380, margin=dict(l=10, r=10, t=30, b=10), legend_title_text=dimension,
+                         yaxis_title=f"Incidents per {grain}", hovermode='x unified')
+    return figure
+
+def response_time_stats(rollups, kind):
+    """Count and p50/p90 of response times in minutes"""
+    minutes = np.fromiter(rollups['response_minutes'][kind].values(), dtype=np.float64)
+    if not len(minutes):
+        return {'count': 0, 'p50_min': 0.0, 'p90_min': 0.0}
+    return {'count': len(minutes), 'p50_min': float(np.percentile(minutes, 50)),
+            'p90_min': float(np.percentile(minutes, 90))}
+
+def response_time_figure(rollups, bins=40):
+    """Histogram of assignment and verification response times, binned server-side"""
+    figure = go.Figure()
+    for kind, minutes in rollups['response_minutes'].items():
+        values = np.fromiter(minutes.values(), dtype=np.float64)
+        if not len(values):
+            continue
+        counts, edges = np.histogram(values, bins=bins)
+        figure.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                                name=kind.title(), opacity=0.7))
+    figure.update_layout(barmode='overlay', height=320, margin=dict(l=10, r=10, t=30, b=10),
+                         xaxis_title="Minutes from report", yaxis_title="Incidents")
+    return figure
@@ -0,0 +1,280 @@
+import io
+import os
+import csv
+import json
+import time
+import zlib
+import secrets
+import threading
+from itertools import islice
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from analytics_export import (SESSION_INCIDENT_COLUMNS, ANALYTICS_SOURCE_DB, PYARROW_AVAILABLE,
+                              open_source_readonly, columns_to_arrow)
+if PYARROW_AVAILABLE:
+    import pyarrow.parquet as pq
+
+# Streaming incident exports for partner agencies
+# Rows come from a generator over the session's incident list or from a
+# read-only database cursor, are filtered (time range, bounding box, type)
+# as they stream, and are encoded EXPORT_CHUNK_ROWS at a time into GeoJSON,
+# CSV or Parquet (one row group per chunk), optionally gzipped. Only one
+# chunk is held in memory whatever the export size. Downloads are served by
+# a small HTTP server started once per process: the command center
+# registers an export under a random token and the browser downloads it
+# from the server, which streams the file as it is encoded.
+
+EXPORT_FORMATS = {
+    'geojson': {'extension': 'geojson', 'mime': 'application/geo+json'},
+    'csv': {'extension': 'csv', 'mime': 'text/csv'},
+    'parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'}
+}
+EXPORT_COLUMNS = list(SESSION_INCIDENT_COLUMNS)
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_LINK_TTL = 15 * 60   # seconds a download link stays valid
+
+# Listens on loopback only; set HARBINGER_EXPORT_HOST (e.g. 0.0.0.0) to serve exports to other machines
+EXPORT_SERVER_HOST = os.environ.get('HARBINGER_EXPORT_HOST', '127.0.0.1')
+EXPORT_SERVER_PORT = int(os.environ.get('HARBINGER_EXPORT_PORT', '8766'))
+# Base URL the browser uses to reach the export server
+EXPORT_PUBLIC_URL = os.environ.get('HARBINGER_EXPORT_PUBLIC_URL', f"http://localhost:{EXPORT_SERVER_PORT}")
+
+_exports_lock = threading.Lock()
+_exports = {}
+_server = None
+_server_error = None
+
+def incident_matches(incident, since=None, until=None, bbox=None, disaster_types=None):
+    """Whether an incident passes the export filters
+
+    since/until are "%Y-%m-%d %H:%M:%S" strings (inclusive), bbox is
+    (south, west, north, east) and disaster_types a collection of types.
+    """
+    timestamp = incident.get('timestamp') or ""
+    if since is not None and timestamp < since:
+        return False
+    if until is not None and (not timestamp or timestamp > until):
+        return False
+    if bbox is not None:
+        lat, lon = incident.get('latitude'), incident.get('longitude')
+        if lat is None or lon is None or not (bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]):
+            return False
+    if disaster_types and incident.get('disaster_type') not in disaster_types:
+        return False
+    return True
+
+def iter_session_incidents(incidents, **filters):
+    """Export rows from an incident list, as it stands when the generator starts"""
+    for incident in islice(incidents, len(incidents)):
+        if incident_matches(incident, **filters):
+            yield {column: incident.get(column) for column in EXPORT_COLUMNS}
+
+def iter_db_incidents(db_path=ANALYTICS_SOURCE_DB, since=None, until=None, bbox=None, disaster_types=None):
+    """Export rows from the incidents table, filtered in SQL and fetched in chunks"""
+    conn = open_source_readonly(db_path)
+    try:
+        available = {row[1] for row in conn.execute("PRAGMA table_info(incidents)")}
+        # The table stores the reporter as user_id and has no verification columns
+        select = ", ".join(column if column in available else
+                           "user_id AS username" if column == 'username' else f"NULL AS {column}"
+                           for column in EXPORT_COLUMNS)
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(until)
+        if bbox is not None:
+            conditions.append("latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?")
+            params.extend([bbox[0], bbox[2], bbox[1], bbox[3]])
+        if disaster_types:
+            conditions.append(f"disaster_type IN ({', '.join('?' for _ in disaster_types)})")
+            params.extend(disaster_types)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor = conn.execute(f"SELECT {select} FROM incidents{where} ORDER BY id", params)
+        while True:
+            batch = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+            if not batch:
+                break
+            for row in batch:
+                yield dict(zip(EXPORT_COLUMNS, row))
+    finally:
+        conn.close()
+
+def _chunks(rows):
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_ROWS))
+        if not chunk:
+            return
+        yield chunk
+
+def csv_chunks(rows):
+    """CSV bytes, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for chunk in _chunks(rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _feature(row):
+    lat, lon = row.get('latitude'), row.get('longitude')
+    geometry = {'type': 'Point', 'coordinates': [lon, lat]} if lat is not None and lon is not None else None
+    properties = {column: value for column, value in row.items() if column not in ('latitude', 'longitude')}
+    return {'type': 'Feature', 'geometry': geometry, 'properties': properties}
+
+def geojson_chunks(rows):
+    """GeoJSON FeatureCollection bytes, one Point feature per incident"""
+    yield b'{"type": "FeatureCollection", "features": ['
+    separator = ""
+    for chunk in _chunks(rows):
+        body = ",\n".join(json.dumps(_feature(row), default=str) for row in chunk)
+        yield (separator + "\n" + body).encode('utf-8')
+        separator = ","
+    yield b'\n]}\n'
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller; the Parquet writer needs tell()"""
+    def __init__(self):
+        self.pending = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.pending.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data, self.pending = b"".join(self.pending), []
+        return data
+
+def parquet_chunks(rows):
+    """Parquet bytes with one row group per chunk"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for Parquet exports (pip install pyarrow)")
+    sink = _ChunkSink()
+    schema = columns_to_arrow(SESSION_INCIDENT_COLUMNS, {column: [] for column in EXPORT_COLUMNS}).schema
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    for chunk in _chunks(rows):
+        writer.write_table(columns_to_arrow(SESSION_INCIDENT_COLUMNS,
+                                            {column: [row.get(column) for row in chunk] for column in EXPORT_COLUMNS}))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+def gzip_chunks(chunks):
+    """Gzip a byte stream chunk by chunk"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_incident_export(rows, export_format, compress=False):
+    """Encoded export as an iterator of byte chunks"""
+    chunks = {'geojson': geojson_chunks, 'csv': csv_chunks, 'parquet': parquet_chunks}[export_format](rows)
+    return gzip_chunks(chunks) if compress else chunks
+
+def export_filename(export_format, compress=False, prefix="incidents"):
+    """File name for an export, e.g. incidents_20260101_120000.geojson.gz"""
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    return f"{prefix}_{stamp}.{EXPORT_FORMATS[export_format]['extension']}" + (".gz" if compress else "")
+
+def write_incident_export(rows, path, export_format, compress=False):
+    """Stream an export to a file; returns the bytes written"""
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in stream_incident_export(rows, export_format, compress):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+class _ExportRequestHandler(BaseHTTPRequestHandler):
+    """Serves /exports/<token> by streaming the registered export"""
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        with _exports_lock:
+            export = _exports.get(parts[1]) if len(parts) == 2 and parts[0] == 'exports' else None
+        if export is None or export['expires'] < time.time():
+            self.send_error(404, "Unknown or expired export link")
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/gzip' if export['compress']
+                         else EXPORT_FORMATS[export['format']]['mime'])
+        self.send_header('Content-Disposition', f'attachment; filename="{export["filename"]}"')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        # No Content-Length: the response is streamed and ends when the connection closes
+        try:
+            for chunk in stream_incident_export(export['rows'](), export['format'], export['compress']):
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def start_export_server(host=EXPORT_SERVER_HOST, port=EXPORT_SERVER_PORT):
+    """Start the download server once per process; False if it cannot bind"""
+    global _server, _server_error
+    with _exports_lock:
+        if _server is None and _server_error is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _ExportRequestHandler)
+                _server.daemon_threads = True
+                threading.Thread(target=_server.serve_forever, name="export-server", daemon=True).start()
+            except OSError as e:
+                _server_error = str(e)
+        return _server is not None
+
+def register_incident_export(rows_factory, export_format, compress=False, filename=None):
+    """Download URL for an export; rows_factory is called per download to produce the rows"""
+    if not start_export_server():
+        raise RuntimeError(f"Export server failed to start: {_server_error}")
+    token = secrets.token_urlsafe(16)
+    now = time.time()
+    with _exports_lock:
+        for expired in [key for key, export in _exports.items() if export['expires'] < now]:
+            del _exports[expired]
+        _exports[token] = {'rows': rows_factory, 'format': export_format, 'compress': compress,
+                           'filename': filename or export_filename(export_format, compress),
+                           'expires': now + EXPORT_LINK_TTL}
+    return f"{EXPORT_PUBLIC_URL}/exports/{token}"
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream incidents from the database to GeoJSON, CSV or Parquet")
+    parser.add_argument("output", help="Output file ('-' for stdout)")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="geojson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--db", default=ANALYTICS_SOURCE_DB)
+    parser.add_argument("--since", help="Earliest report time, YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--until", help="Latest report time, YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--bbox", nargs=4, type=float, metavar=("SOUTH", "WEST", "NORTH", "EAST"))
+    parser.add_argument("--types", nargs="+", help="Disaster types to include")
+    args = parser.parse_args()
+
+    until = args.until + " 23:59:59" if args.until and len(args.until) == 10 else args.until
+    rows = iter_db_incidents(args.db, since=args.since, until=until, bbox=args.bbox, disaster_types=args.types)
+    if args.output == '-':
+        for chunk in stream_incident_export(rows, args.format, args.gzip):
+            sys.stdout.buffer.write(chunk)
+    else:
+        written = write_incident_export(rows, args.output, args.format, args.gzip)
+        print(f"Wrote {written} bytes to {args.output}", file=sys.stderr)
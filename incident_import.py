@@ -0,0 +1,298 @@
+import io
+import csv
+import gzip
+import json
+import zlib
+import time
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from contextlib import closing
+from config_and_database import DB_PATH, init_enhanced_database, geocode_location_enhanced
+from ai_analysis import determine_ocean_hazard_level, calculate_priority_score_enhanced
+from incident_store import SEVERITY_ORDER_ASC, TIMESTAMP_FORMAT
+
+# Bulk import of historical incidents (IMD / NDMA archives)
+# Records are streamed from CSV or JSONL, validated and geocoded a batch at
+# a time (each distinct location once per import), scored like reported
+# incidents, and inserted with executemany, committing every
+# IMPORT_COMMIT_ROWS rows. For large imports the incidents table's
+# secondary indexes are dropped first and rebuilt once at the end, and the
+# session's derived views (store, query index, queues, rollups) are
+# invalidated once instead of per row. If the stream fails part way, the
+# uncommitted batches are rolled back and only committed rows are reported.
+#
+# The import uses its own connection rather than get_db_connection, which
+# deletes the -wal/-shm files on every call, and checkpoints after each
+# commit so committed batches are in the main database file.
+
+IMPORT_BATCH_ROWS = 2000
+IMPORT_COMMIT_ROWS = 50000
+IMPORT_MAX_ERRORS = 20   # rejected rows reported back in detail
+IMPORT_AUTHENTICITY_SCORE = 100   # archive records are authoritative
+DEFER_INDEXES_MIN_BYTES = 5 * 2 ** 20   # uploads at least this large rebuild indexes at the end
+IMPORT_TIMESTAMP_FORMATS = (TIMESTAMP_FORMAT, "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+                            "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y")
+
+# Errors that stop an import part way: unreadable input or a database failure
+IMPORT_ERRORS = (UnicodeDecodeError, csv.Error, OSError, EOFError, zlib.error, sqlite3.Error)
+
+# Archive column names accepted for each incident field
+FIELD_ALIASES = {
+    'timestamp': ('timestamp', 'date', 'datetime', 'time', 'event_date'),
+    'location': ('location', 'place', 'district', 'area'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lon', 'lng', 'long'),
+    'disaster_type': ('disaster_type', 'type', 'event_type', 'hazard'),
+    'severity': ('severity', 'intensity', 'category'),
+    'description': ('description', 'details', 'remarks', 'summary')
+}
+
+def _open_text(path_or_file):
+    if not isinstance(path_or_file, str):
+        if getattr(path_or_file, 'name', '').endswith('.gz'):
+            path_or_file = gzip.GzipFile(fileobj=path_or_file)
+        return io.TextIOWrapper(path_or_file, encoding='utf-8-sig', newline='')
+    if path_or_file.endswith('.gz'):
+        return gzip.open(path_or_file, 'rt', encoding='utf-8-sig', newline='')
+    return open(path_or_file, encoding='utf-8-sig', newline='')
+
+def read_import_records(path_or_file, file_format=None):
+    """Raw records from a CSV or JSONL file (optionally .gz), one at a time
+
+    file_format is 'csv' or 'jsonl'; by default it is taken from the file
+    name. Binary file objects (such as uploads) are accepted too.
+    """
+    name = path_or_file if isinstance(path_or_file, str) else getattr(path_or_file, 'name', '')
+    file_format = file_format or ('jsonl' if name.removesuffix('.gz').endswith(('.jsonl', '.json')) else 'csv')
+    with _open_text(path_or_file) as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield {'_invalid': f"malformed JSON ({e})"}
+
+def _field(record, field):
+    for alias in FIELD_ALIASES[field]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value.strip() if isinstance(value, str) else value
+    return None
+
+def _parse_timestamp(value):
+    for fmt in IMPORT_TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(str(value), fmt).strftime(TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
+
+def validate_record(record):
+    """Incident fields from a raw record; raises ValueError if it cannot be imported"""
+    if '_invalid' in record:
+        raise ValueError(record['_invalid'])
+    timestamp = _field(record, 'timestamp')
+    if timestamp is None:
+        raise ValueError("missing date")
+    disaster_type = _field(record, 'disaster_type')
+    if disaster_type is None:
+        raise ValueError("missing disaster type")
+    severity = str(_field(record, 'severity') or 'Medium').title()
+    if severity not in SEVERITY_ORDER_ASC:
+        raise ValueError(f"unknown severity {severity!r}")
+
+    latitude, longitude = _field(record, 'latitude'), _field(record, 'longitude')
+    if latitude is not None and longitude is not None:
+        latitude, longitude = float(latitude), float(longitude)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(f"coordinates out of range ({latitude}, {longitude})")
+    else:
+        latitude = longitude = None
+    location = _field(record, 'location')
+    if location is None and latitude is None:
+        raise ValueError("no location or coordinates")
+
+    return {
+        'timestamp': _parse_timestamp(timestamp),
+        'location': location or f"{latitude:.4f}, {longitude:.4f}",
+        'latitude': latitude,
+        'longitude': longitude,
+        'disaster_type': str(disaster_type),
+        'severity': severity,
+        'description': str(_field(record, 'description') or "")
+    }
+
+def geocode_batch(rows, cache):
+    """Fill missing coordinates, geocoding each distinct location once
+
+    Returns the rows whose location could not be resolved; their
+    coordinates stay None.
+    """
+    for location in {row['location'] for row in rows if row['latitude'] is None} - cache.keys():
+        lat, lon, message = geocode_location_enhanced(location)
+        # Unknown places come back as the centre of India with a warning
+        cache[location] = None if message.startswith("⚠️") else (lat, lon)
+    unresolved = []
+    for row in rows:
+        if row['latitude'] is None:
+            if cache[row['location']] is None:
+                unresolved.append(row)
+            else:
+                row['latitude'], row['longitude'] = cache[row['location']]
+    return unresolved
+
+def score_batch(rows, source):
+    """Ocean hazard level and priority score, as for reported incidents"""
+    for row in rows:
+        row['ocean_hazard_level'] = determine_ocean_hazard_level(row['disaster_type'])
+        row['authenticity_score'] = IMPORT_AUTHENTICITY_SCORE
+        row['priority_score'] = calculate_priority_score_enhanced(
+            row['severity'], row['disaster_type'], row['authenticity_score'], row['ocean_hazard_level'])
+        row['source'] = source
+    return rows
+
+def _incident_indexes(conn):
+    return conn.execute("""SELECT name, sql FROM sqlite_master
+                           WHERE type = 'index' AND tbl_name = 'incidents' AND sql IS NOT NULL""").fetchall()
+
+def insert_incident_rows(conn, rows):
+    """Insert validated rows with one executemany; the caller commits"""
+    conn.executemany("""INSERT INTO incidents
+                        (timestamp, location, latitude, longitude, disaster_type, severity, description,
+                         additional_context, user_id, verified, authenticity_score, priority_score,
+                         ocean_hazard_level)
+                        VALUES (:timestamp, :location, :latitude, :longitude, :disaster_type, :severity,
+                                :description, 'Imported from archive', :source, 1, :authenticity_score,
+                                :priority_score, :ocean_hazard_level)""", rows)
+
+def _reject(stats, number, reason):
+    stats['rejected'] += 1
+    if len(stats['errors']) < IMPORT_MAX_ERRORS:
+        stats['errors'].append((number, reason))
+
+def _import_connection(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL;')
+    conn.execute('PRAGMA synchronous=NORMAL;')
+    return conn
+
+def import_incidents(records, source="archive", defer_indexes=True, on_rows=None, progress_callback=None,
+                     db_path=DB_PATH):
+    """Validate, geocode, score and insert a stream of raw records
+
+    on_rows, if given, is called with the rows of each commit (used to add
+    the incidents to a session). Returns counts, rows per second and the
+    first IMPORT_MAX_ERRORS rejections as (record number, reason). Errors
+    reading the stream (bad encoding, malformed CSV) roll back the rows not
+    yet committed and propagate; by then on_rows has seen exactly the
+    committed rows.
+    """
+    stats = {'read': 0, 'imported': 0, 'rejected': 0, 'errors': []}
+    geocode_cache = {}
+    start = time.perf_counter()
+    records = iter(records)
+
+    with closing(_import_connection(db_path)) as conn:
+        indexes = _incident_indexes(conn) if defer_indexes else []
+        for name, _ in indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        pending = []
+
+        def commit():
+            conn.commit()
+            conn.execute('PRAGMA wal_checkpoint(FULL);')
+            stats['imported'] += len(pending)
+            if on_rows is not None and pending:
+                on_rows(pending)
+            pending.clear()
+
+        try:
+            while True:
+                batch = list(islice(records, IMPORT_BATCH_ROWS))
+                if not batch:
+                    break
+                rows = []
+                for record in batch:
+                    stats['read'] += 1
+                    try:
+                        row = validate_record(record)
+                        row['record'] = stats['read']
+                        rows.append(row)
+                    except (ValueError, TypeError, AttributeError) as e:
+                        _reject(stats, stats['read'], str(e))
+
+                for row in geocode_batch(rows, geocode_cache):
+                    _reject(stats, row['record'], f"location not found: {row['location']}")
+                rows = [row for row in rows if row['latitude'] is not None]
+
+                insert_incident_rows(conn, score_batch(rows, source))
+                pending.extend(rows)
+                if len(pending) >= IMPORT_COMMIT_ROWS:
+                    commit()
+                if progress_callback is not None:
+                    progress_callback(stats)
+            commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            # Dropping and creating indexes commit on their own; no import rows are pending here
+            for _, sql in indexes:
+                conn.execute(sql)
+            conn.commit()
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['read'] / stats['seconds'] if stats['seconds'] else 0.0
+    stats['geocoded_locations'] = len(geocode_cache)
+    return stats
+
+def session_incidents_from_rows(rows, first_id):
+    """Session incident dicts for imported rows, numbered from first_id"""
+    return [{
+        'id': first_id + offset,
+        'timestamp': row['timestamp'],
+        'location': row['location'],
+        'latitude': row['latitude'],
+        'longitude': row['longitude'],
+        'disaster_type': row['disaster_type'],
+        'severity': row['severity'],
+        'description': row['description'],
+        'additional_context': "Imported from archive",
+        'username': row['source'],
+        'verified': True,
+        'verified_by': row['source'],
+        'volunteer_assigned': False,
+        'historical': True,
+        'authenticity_score': row['authenticity_score'],
+        'priority_score': row['priority_score'],
+        'ocean_hazard_level': row['ocean_hazard_level']
+    } for offset, row in enumerate(rows)]
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream historical incident records into the database")
+    parser.add_argument("path", help="CSV or JSONL file, optionally gzipped")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from the file name)")
+    parser.add_argument("--source", default="archive", help="Record source, e.g. IMD or NDMA")
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain indexes per row instead of rebuilding")
+    args = parser.parse_args()
+
+    init_enhanced_database()
+
+    def report(stats):
+        if stats['read'] % (10 * IMPORT_BATCH_ROWS) == 0:
+            print(f"{stats['read']} rows read, {stats['imported']} imported", file=sys.stderr)
+
+    stats = import_incidents(read_import_records(args.path, args.format), source=args.source,
+                             defer_indexes=not args.keep_indexes, progress_callback=report)
+    for number, reason in stats['errors']:
+        print(f"record {number}: {reason}", file=sys.stderr)
+    print(f"Imported {stats['imported']} of {stats['read']} records ({stats['rejected']} rejected, "
+          f"{stats['geocoded_locations']} locations geocoded) in {stats['seconds']:.1f}s "
+          f"- {stats['rows_per_second']:.0f} rows/s")
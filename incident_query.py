@@ -0,0 +1,199 @@
+import re
+import numpy as np
+from config_and_database import STATE_CENTERS
+from incident_store import parse_timestamps, pending_incident_changes
+
+# Bitmap-indexed incident queries
+# Every indexed field keeps one boolean bitmap per value over the incident
+# rows (row i is incident i of the session list), and a sorted time index
+# maps a time window to rows with two binary searches. A query ANDs one
+# bitmap per field, ORing the bitmaps of the values accepted for that field,
+# so filters combine as bitwise operations. Writes update only the rows
+# that changed.
+
+QUERY_INDEX_INITIAL_CAPACITY = 1024
+UNKNOWN_JURISDICTION = "Unknown"
+
+_state_pattern = re.compile("|".join(re.escape(state) for state in sorted(STATE_CENTERS, key=len, reverse=True)))
+_state_names = list(STATE_CENTERS)
+_state_coords = np.array([STATE_CENTERS[state] for state in _state_names])
+
+def incident_jurisdiction(incident):
+    """State named in the location text, else the state whose center is nearest the coordinates"""
+    match = _state_pattern.search(str(incident.get('location') or "").lower())
+    if match:
+        return match.group(0).title()
+    lat, lon = incident.get('latitude'), incident.get('longitude')
+    if not lat or not lon:
+        return UNKNOWN_JURISDICTION
+    distances = (_state_coords[:, 0] - lat) ** 2 + ((_state_coords[:, 1] - lon) * np.cos(np.radians(lat))) ** 2
+    return _state_names[int(np.argmin(distances))].title()
+
+INDEXED_FIELDS = {
+    'disaster_type': lambda incident: incident.get('disaster_type') or 'Other',
+    'severity': lambda incident: incident.get('severity') or 'Low',
+    'verified': lambda incident: bool(incident.get('verified', False)),
+    'volunteer_assigned': lambda incident: bool(incident.get('volunteer_assigned', False)),
+    'ocean_hazard_level': lambda incident: int(incident.get('ocean_hazard_level') or 0),
+    'jurisdiction': incident_jurisdiction
+}
+
+def create_query_index(capacity=QUERY_INDEX_INITIAL_CAPACITY):
+    """Empty index"""
+    return {
+        'capacity': capacity,
+        'size': 0,
+        'bitmaps': {field: {} for field in INDEXED_FIELDS},
+        'row_values': {field: [] for field in INDEXED_FIELDS},
+        'row_ids': {},
+        'timestamps': np.zeros(capacity),
+        'time_sorted': np.zeros(0),    # timestamps in ascending order
+        'time_rows': np.zeros(0, dtype=np.int64),
+        'version': None
+    }
+
+def _grow(index, needed):
+    if needed <= index['capacity']:
+        return
+    capacity = max(needed, 2 * index['capacity'])
+    for bitmaps in index['bitmaps'].values():
+        for value, bitmap in bitmaps.items():
+            grown = np.zeros(capacity, dtype=bool)
+            grown[:index['size']] = bitmap[:index['size']]
+            bitmaps[value] = grown
+    timestamps = np.zeros(capacity)
+    timestamps[:index['size']] = index['timestamps'][:index['size']]
+    index['timestamps'] = timestamps
+    index['capacity'] = capacity
+
+def _bitmap(index, field, value):
+    bitmaps = index['bitmaps'][field]
+    if value not in bitmaps:
+        bitmaps[value] = np.zeros(index['capacity'], dtype=bool)
+    return bitmaps[value]
+
+def _insert_times(index, rows, timestamps):
+    """Merge rows into the sorted time index; incidents without a timestamp are not time-indexed"""
+    keep = ~np.isnan(timestamps)
+    rows, timestamps = rows[keep], timestamps[keep]
+    if not len(rows):
+        return
+    order = np.argsort(timestamps, kind='stable')
+    rows, timestamps = rows[order], timestamps[order]
+    if not len(index['time_sorted']) or timestamps[0] >= index['time_sorted'][-1]:
+        # Reports usually arrive in time order: append
+        index['time_sorted'] = np.concatenate([index['time_sorted'], timestamps])
+        index['time_rows'] = np.concatenate([index['time_rows'], rows])
+    else:
+        positions = np.searchsorted(index['time_sorted'], timestamps, side='right')
+        index['time_sorted'] = np.insert(index['time_sorted'], positions, timestamps)
+        index['time_rows'] = np.insert(index['time_rows'], positions, rows)
+
+def _remove_time(index, row):
+    keep = index['time_rows'] != row
+    index['time_sorted'] = index['time_sorted'][keep]
+    index['time_rows'] = index['time_rows'][keep]
+
+def index_incidents(index, incidents):
+    """Append incidents as new rows"""
+    incidents = list(incidents)
+    start = index['size']
+    _grow(index, start + len(incidents))
+    index['size'] = start + len(incidents)
+
+    for field, extract in INDEXED_FIELDS.items():
+        values = [extract(incident) for incident in incidents]
+        index['row_values'][field].extend(values)
+        # One vectorized scatter per distinct value
+        codes, inverse = np.unique(np.array(values, dtype=object), return_inverse=True)
+        for code, value in enumerate(codes):
+            _bitmap(index, field, value)[start:start + len(incidents)] = inverse == code
+
+    for offset, incident in enumerate(incidents):
+        index['row_ids'][incident.get('id')] = start + offset
+    timestamps = parse_timestamps([incident.get('timestamp') for incident in incidents])
+    index['timestamps'][start:start + len(incidents)] = timestamps
+    _insert_times(index, np.arange(start, start + len(incidents)), timestamps)
+    return index
+
+def reindex_incident(index, incident):
+    """Move a changed incident's row to the bitmaps of its new values"""
+    row = index['row_ids'].get(incident.get('id'))
+    if row is None:
+        return index_incidents(index, [incident])
+
+    for field, extract in INDEXED_FIELDS.items():
+        value = extract(incident)
+        old = index['row_values'][field][row]
+        if value != old:
+            index['bitmaps'][field][old][row] = False
+            _bitmap(index, field, value)[row] = True
+            index['row_values'][field][row] = value
+
+    timestamp = parse_timestamps([incident.get('timestamp')])[0]
+    old_timestamp = index['timestamps'][row]
+    if not (timestamp == old_timestamp or (np.isnan(timestamp) and np.isnan(old_timestamp))):
+        _remove_time(index, row)
+        index['timestamps'][row] = timestamp
+        _insert_times(index, np.array([row]), np.array([timestamp]))
+    return index
+
+def sync_query_index(index, incidents, version, change_log=()):
+    """Bring the index up to version from the change log, rebuilding if it does not cover the gap"""
+    if index['version'] == version:
+        return index
+
+    changes = pending_incident_changes(change_log, index['version'], version)
+    if changes is None:
+        index.update(create_query_index(max(len(incidents), QUERY_INDEX_INITIAL_CAPACITY)))
+        index_incidents(index, incidents)
+    else:
+        for incident in changes:
+            reindex_incident(index, incident)
+    index['version'] = version
+    return index
+
+def indexed_values(index, field):
+    """Values present in a field's index, with their row counts"""
+    size = index['size']
+    counts = {value: int(np.count_nonzero(bitmap[:size])) for value, bitmap in index['bitmaps'][field].items()}
+    return {value: count for value, count in sorted(counts.items(), key=lambda item: str(item[0])) if count}
+
+def time_window_rows(index, since=None, until=None):
+    """Rows with since <= timestamp <= until, from the sorted time index"""
+    lo = np.searchsorted(index['time_sorted'], since, side='left') if since is not None else 0
+    hi = np.searchsorted(index['time_sorted'], until, side='right') if until is not None else len(index['time_sorted'])
+    return index['time_rows'][lo:hi]
+
+def query_incidents(index, since=None, until=None, min_ocean_level=None, **filters):
+    """Rows matching every filter, in row order
+
+    Each keyword names an INDEXED_FIELDS field and takes one value or a
+    list of accepted values, e.g. severity=['High', 'Critical'],
+    verified=False, jurisdiction='Kerala'. since/until are epoch seconds.
+    """
+    size = index['size']
+    mask = np.ones(size, dtype=bool)
+    for field, accepted in filters.items():
+        if accepted is None:
+            continue
+        if not isinstance(accepted, (list, tuple, set)):
+            accepted = [accepted]
+        field_mask = np.zeros(size, dtype=bool)
+        for value in accepted:
+            if value in index['bitmaps'][field]:
+                field_mask |= index['bitmaps'][field][value][:size]
+        mask &= field_mask
+
+    if min_ocean_level is not None:
+        ocean_mask = np.zeros(size, dtype=bool)
+        for level, bitmap in index['bitmaps']['ocean_hazard_level'].items():
+            if level >= min_ocean_level:
+                ocean_mask |= bitmap[:size]
+        mask &= ocean_mask
+
+    if since is not None or until is not None:
+        window = np.zeros(size, dtype=bool)
+        window[time_window_rows(index, since, until)] = True
+        mask &= window
+    return np.flatnonzero(mask)
@@ -0,0 +1,155 @@
+import heapq
+from incident_store import pending_incident_changes
+
+# Incremental priority queues for open incidents
+# Each queue is an indexed binary min-heap of (-rank, seq, id) entries with
+# a position map, so an incident can be added, re-ranked or removed in
+# O(log N) as it changes instead of re-sorting the whole list. seq is the
+# incident's position in the session's incident list, which reproduces the
+# tie order of the stable sort the views used before. Pages are read with a
+# best-first walk of the heap from a keyset cursor: O(K log N) for the first
+# page of K entries, and O(p K log N) for page p, since the entries ranked
+# before the cursor have to be walked again.
+
+QUEUE_PAGE_SIZE = 10
+
+QUEUE_FILTERS = {
+    'available': lambda incident: not incident.get('volunteer_assigned', False) and not incident.get('historical', False),
+    'verification': lambda incident: not incident.get('verified', False)
+}
+
+def queue_rank(incident):
+    """Ordering used by every queue: ocean hazard level first, then priority"""
+    return incident.get('ocean_hazard_level', 0) * 30 + incident.get('priority_score', 0)
+
+def create_incident_queue(name):
+    """Empty queue using one of QUEUE_FILTERS"""
+    return {'name': name, 'heap': [], 'positions': {}, 'incidents': {}, 'seq': {}, 'version': None}
+
+def _swap(queue, i, j):
+    heap, positions = queue['heap'], queue['positions']
+    heap[i], heap[j] = heap[j], heap[i]
+    positions[heap[i][2]] = i
+    positions[heap[j][2]] = j
+
+def _sift_up(queue, i):
+    heap = queue['heap']
+    while i > 0:
+        parent = (i - 1) // 2
+        if heap[i] >= heap[parent]:
+            break
+        _swap(queue, i, parent)
+        i = parent
+
+def _sift_down(queue, i):
+    heap = queue['heap']
+    size = len(heap)
+    while True:
+        smallest = i
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < size and heap[child] < heap[smallest]:
+                smallest = child
+        if smallest == i:
+            return
+        _swap(queue, i, smallest)
+        i = smallest
+
+def queue_push_or_update(queue, incident, seq):
+    """Insert an incident or move it to its current rank"""
+    incident_id = incident['id']
+    queue['seq'].setdefault(incident_id, seq)
+    entry = (-queue_rank(incident), queue['seq'][incident_id], incident_id)
+    queue['incidents'][incident_id] = incident
+
+    i = queue['positions'].get(incident_id)
+    if i is None:
+        queue['heap'].append(entry)
+        i = queue['positions'][incident_id] = len(queue['heap']) - 1
+        _sift_up(queue, i)
+    elif entry != queue['heap'][i]:
+        old = queue['heap'][i]
+        queue['heap'][i] = entry
+        if entry < old:
+            _sift_up(queue, i)
+        else:
+            _sift_down(queue, i)
+
+def queue_remove(queue, incident_id):
+    """Remove an incident if it is queued"""
+    i = queue['positions'].pop(incident_id, None)
+    if i is None:
+        return
+    queue['incidents'].pop(incident_id, None)
+    heap = queue['heap']
+    last = heap.pop()
+    if i < len(heap):
+        heap[i] = last
+        queue['positions'][last[2]] = i
+        _sift_up(queue, i)
+        _sift_down(queue, queue['positions'][last[2]])
+
+def apply_incident_change(queue, incident, seq):
+    """Add, re-rank or remove one incident according to the queue's filter
+
+    seq is recorded even for incidents the queue skips, so it keeps
+    matching list positions for later appends.
+    """
+    queue['seq'].setdefault(incident['id'], seq)
+    if QUEUE_FILTERS[queue['name']](incident):
+        queue_push_or_update(queue, incident, seq)
+    else:
+        queue_remove(queue, incident['id'])
+
+def rebuild_incident_queue(queue, incidents):
+    """Heapify every matching incident; O(N)"""
+    belongs = QUEUE_FILTERS[queue['name']]
+    queue['seq'] = {incident['id']: seq for seq, incident in enumerate(incidents)}
+    queue['incidents'] = {incident['id']: incident for incident in incidents if belongs(incident)}
+    queue['heap'] = [(-queue_rank(incident), queue['seq'][incident_id], incident_id)
+                     for incident_id, incident in queue['incidents'].items()]
+    heapq.heapify(queue['heap'])
+    queue['positions'] = {entry[2]: i for i, entry in enumerate(queue['heap'])}
+
+def sync_incident_queue(queue, incidents, version, change_log=()):
+    """Bring the queue up to version
+
+    change_log holds (version, incident) pairs recorded by
+    bump_incidents_version; when it covers every version since the last sync,
+    only those incidents are applied, otherwise the queue is rebuilt.
+    """
+    if queue['version'] == version:
+        return queue
+
+    changes = pending_incident_changes(change_log, queue['version'], version)
+    if changes is None:
+        rebuild_incident_queue(queue, incidents)
+    else:
+        for incident in changes:
+            apply_incident_change(queue, incident, len(queue['seq']))
+    queue['version'] = version
+    return queue
+
+def queue_count(queue):
+    """Number of incidents in the queue"""
+    return len(queue['heap'])
+
+def queue_page(queue, cursor=None, page_size=QUEUE_PAGE_SIZE):
+    """Incidents ranked after cursor, and the cursor of the following page (None on the last page)
+
+    Walks the heap best-first from the root; entries at or before the
+    cursor are expanded but not returned, so page p costs O(p K log N)
+    for pages of K entries.
+    """
+    heap = queue['heap']
+    frontier = [(heap[0], 0)] if heap else []
+    keys = []
+    while frontier and len(keys) <= page_size:
+        entry, i = heapq.heappop(frontier)
+        if cursor is None or entry[:2] > cursor:
+            keys.append(entry)
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+
+    next_cursor = keys[page_size - 1][:2] if len(keys) > page_size else None
+    return [queue['incidents'][entry[2]] for entry in keys[:page_size]], next_cursor
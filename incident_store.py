@@ -0,0 +1,195 @@
+import numpy as np
+from datetime import datetime
+
+# Columnar incident store
+# Each numeric or flag field is its own contiguous NumPy array, and repeated
+# strings (type, severity, location, usernames) are interned into per-field
+# pools and stored as integer codes. Dashboard filters and aggregates are
+# vectorized over the columns instead of iterating incident dicts. Free text
+# (descriptions, notes) is not copied: row i of the store is incident i of
+# the source list, which detail views read directly.
+
+INCIDENT_STORE_INITIAL_CAPACITY = 1024
+HIGH_PRIORITY_THRESHOLD = 70
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+SEVERITY_ORDER_ASC = ('Low', 'Medium', 'High', 'Critical')
+
+NUMERIC_COLUMNS = {
+    'id': np.int64,
+    'timestamp': np.float64,          # seconds since the epoch, NaN if unknown
+    'latitude': np.float32,
+    'longitude': np.float32,
+    'priority_score': np.int16,
+    'ocean_hazard_level': np.int8,
+    'authenticity_score': np.float32
+}
+FLAG_COLUMNS = ('verified', 'volunteer_assigned', 'contact_shared', 'emergency_priority')
+CATEGORICAL_COLUMNS = ('disaster_type', 'severity', 'location', 'username', 'assigned_volunteer')
+
+def _column_dtypes():
+    dtypes = dict(NUMERIC_COLUMNS)
+    dtypes.update({flag: np.bool_ for flag in FLAG_COLUMNS})
+    dtypes.update({field + '_code': np.uint32 for field in CATEGORICAL_COLUMNS})
+    return dtypes
+
+def create_incident_store(capacity=INCIDENT_STORE_INITIAL_CAPACITY):
+    """Empty store; code 0 of every string pool is the empty string"""
+    return {
+        'columns': {name: np.zeros(capacity, dtype=dtype) for name, dtype in _column_dtypes().items()},
+        'size': 0,
+        'pools': {field: [""] for field in CATEGORICAL_COLUMNS},
+        'pool_codes': {field: {"": 0} for field in CATEGORICAL_COLUMNS},
+        'version': None
+    }
+
+def intern_value(store, field, value):
+    """Code of a categorical value, adding it to the field's pool if new"""
+    value = "" if value is None else str(value)
+    codes = store['pool_codes'][field]
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(store['pools'][field])
+        store['pools'][field].append(value)
+    return code
+
+def category_code(store, field, value):
+    """Code of a categorical value, -1 if it has never been stored"""
+    return store['pool_codes'][field].get("" if value is None else str(value), -1)
+
+def parse_timestamps(values):
+    """Seconds since the epoch (naive local time) for TIMESTAMP_FORMAT strings, NaN if unparseable"""
+    try:
+        parsed = np.array(values, dtype='datetime64[s]')
+        seconds = parsed.astype(np.float64)
+        seconds[np.isnat(parsed)] = np.nan
+        return seconds
+    except (TypeError, ValueError):
+        parsed = []
+        for value in values:
+            try:
+                parsed.append((datetime.strptime(value, TIMESTAMP_FORMAT) - datetime(1970, 1, 1)).total_seconds())
+            except (TypeError, ValueError):
+                parsed.append(np.nan)
+        return np.array(parsed)
+
+def _float_or_nan(value):
+    return np.nan if value is None or value == "" else value
+
+def _incident_columns(store, incidents):
+    """Column values for a list of incident dicts"""
+    return {
+        'id': [incident.get('id', -1) for incident in incidents],
+        'timestamp': parse_timestamps([incident.get('timestamp') for incident in incidents]),
+        'latitude': [_float_or_nan(incident.get('latitude')) for incident in incidents],
+        'longitude': [_float_or_nan(incident.get('longitude')) for incident in incidents],
+        'priority_score': [incident.get('priority_score') or 0 for incident in incidents],
+        'ocean_hazard_level': [incident.get('ocean_hazard_level') or 0 for incident in incidents],
+        'authenticity_score': [_float_or_nan(incident.get('authenticity_score')) for incident in incidents],
+        **{flag: [bool(incident.get(flag, False)) for incident in incidents] for flag in FLAG_COLUMNS},
+        **{field + '_code': [intern_value(store, field, incident.get(field)) for incident in incidents]
+           for field in CATEGORICAL_COLUMNS}
+    }
+
+def append_incidents(store, incidents):
+    """Append incident dicts, growing every column by doubling"""
+    incidents = list(incidents)
+    if not incidents:
+        return store
+    start, needed = store['size'], store['size'] + len(incidents)
+    columns = store['columns']
+    if needed > len(columns['id']):
+        capacity = max(needed, 2 * len(columns['id']))
+        for name, column in columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:start] = column[:start]
+            columns[name] = grown
+
+    for name, values in _incident_columns(store, incidents).items():
+        columns[name][start:needed] = values
+    store['size'] = needed
+    return store
+
+def update_incident(store, incident):
+    """Rewrite the row of a changed incident, appending it if unknown"""
+    rows = np.flatnonzero(incident_column(store, 'id') == incident.get('id', -1))
+    if not len(rows):
+        return append_incidents(store, [incident])
+    for name, values in _incident_columns(store, [incident]).items():
+        store['columns'][name][rows[-1]] = values[0]
+    return store
+
+def pending_incident_changes(change_log, since_version, version):
+    """Incidents changed after since_version, or None if the log cannot bring a view up to version"""
+    if since_version is None:
+        return None
+    changes = [incident for v, incident in change_log if v > since_version]
+    if len(changes) != version - since_version or any(incident is None for incident in changes):
+        return None
+    return changes
+
+def sync_incident_store(store, incidents, version, change_log=()):
+    """Bring the store up to version from the change log, rebuilding if it does not cover the gap"""
+    if store['version'] == version:
+        return store
+
+    changes = pending_incident_changes(change_log, store['version'], version)
+    if changes is None:
+        store.update(create_incident_store(max(len(incidents), INCIDENT_STORE_INITIAL_CAPACITY)))
+        append_incidents(store, incidents)
+    else:
+        for incident in changes:
+            update_incident(store, incident)
+    store['version'] = version
+    return store
+
+def incident_column(store, name):
+    """View of one column over the stored incidents"""
+    return store['columns'][name][:store['size']]
+
+def category_values(store, field, rows):
+    """Decoded strings of a categorical column for the given rows"""
+    pool = store['pools'][field]
+    return [pool[code] for code in incident_column(store, field + '_code')[rows]]
+
+def filter_incidents(store, verified=None, volunteer_assigned=None, username=None, assigned_volunteer=None,
+                     min_priority=None, ocean=None, disaster_type=None):
+    """Boolean row mask combining the given conditions"""
+    mask = np.ones(store['size'], dtype=bool)
+    if verified is not None:
+        mask &= incident_column(store, 'verified') == verified
+    if volunteer_assigned is not None:
+        mask &= incident_column(store, 'volunteer_assigned') == volunteer_assigned
+    if min_priority is not None:
+        mask &= incident_column(store, 'priority_score') > min_priority
+    if ocean is not None:
+        mask &= (incident_column(store, 'ocean_hazard_level') > 0) == ocean
+    for field, value in (('username', username), ('assigned_volunteer', assigned_volunteer),
+                         ('disaster_type', disaster_type)):
+        if value is not None:
+            mask &= incident_column(store, field + '_code') == category_code(store, field, value)
+    return mask
+
+def incident_metrics(store, mask=None):
+    """Dashboard counts and averages over all rows, or the rows selected by mask"""
+    rows = slice(None) if mask is None else np.flatnonzero(mask)
+    priority = incident_column(store, 'priority_score')[rows]
+    type_counts = np.bincount(incident_column(store, 'disaster_type_code')[rows],
+                              minlength=len(store['pools']['disaster_type']))
+    severity_counts = np.bincount(incident_column(store, 'severity_code')[rows],
+                                  minlength=len(store['pools']['severity']))
+    return {
+        'total': len(priority),
+        'verified': int(np.count_nonzero(incident_column(store, 'verified')[rows])),
+        'assigned': int(np.count_nonzero(incident_column(store, 'volunteer_assigned')[rows])),
+        'high_priority': int(np.count_nonzero(priority > HIGH_PRIORITY_THRESHOLD)),
+        'ocean': int(np.count_nonzero(incident_column(store, 'ocean_hazard_level')[rows])),
+        'avg_priority': float(priority.mean()) if len(priority) else 0.0,
+        'by_type': {name: int(count) for name, count in zip(store['pools']['disaster_type'], type_counts) if count and name},
+        'by_severity': {level: int(severity_counts[store['pool_codes']['severity'][level]])
+                        for level in SEVERITY_ORDER_ASC if level in store['pool_codes']['severity']}
+    }
+
+def incident_store_nbytes(store):
+    """Memory held by the store's columns and string pools"""
+    pools = sum(len(value.encode('utf-8')) + 50 for pool in store['pools'].values() for value in pool)
+    return sum(column.nbytes for column in store['columns'].values()) + pools
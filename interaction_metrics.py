@@ -0,0 +1,30 @@
+import threading
+from collections import deque
+import numpy as np
+
+# Server-side latency of user interactions, shared by all sessions
+# Fragment actions (accepting a mission, saving a verification) record the
+# time to handle the action and re-render their own card; full script runs
+# are recorded as 'full_rerun' for comparison.
+
+LATENCY_SAMPLES = 500   # most recent samples kept per interaction
+
+_latency_lock = threading.Lock()
+_latencies = {}
+
+def record_interaction_latency(name, seconds):
+    """Add one latency sample for an interaction"""
+    with _latency_lock:
+        _latencies.setdefault(name, deque(maxlen=LATENCY_SAMPLES)).append(seconds)
+
+def get_interaction_latency_stats():
+    """Per-interaction sample count and p50/p95/max latency in ms"""
+    with _latency_lock:
+        samples = {name: np.array(values) * 1000 for name, values in _latencies.items() if values}
+    return {
+        name: {'count': len(values),
+               'p50_ms': float(np.percentile(values, 50)),
+               'p95_ms': float(np.percentile(values, 95)),
+               'max_ms': float(values.max())}
+        for name, values in samples.items()
+    }
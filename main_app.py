@@ -5,6 +5,8 @@ from datetime import datetime
 from config_and_database import *
 from ai_analysis import *
 from ui_components import *
+from classifier_backends import *
+from interaction_metrics import *
 
 # Page configuration
 st.set_page_config(
@@ -230,6 +232,7 @@ def main():
     
     # Initialize the enhanced app
     initialize_enhanced_app()
+    start_periodic_export()
     
     # Enhanced header with ocean theme
     st.markdown("""
@@ -335,6 +338,100 @@ def main():
     elif selected_menu in ["System Control", "System Settings"]:
         show_enhanced_system_settings()
 
+@st.fragment
+def show_available_incident_card(incident, match=None):
+    """One incident card; accepting re-runs only this card
+
+    match holds the volunteer's distance, ETA and match score, None if the
+    volunteer's location or the incident's coordinates are unknown.
+    """
+    start = time.perf_counter()
+
+    # Enhanced card styling based on ocean hazard and priority
+    ocean_level = incident.get('ocean_hazard_level', 0)
+    priority_score = incident.get('priority_score', 0)
+
+    if match is not None:
+        eta = match['eta_minutes']
+        eta_text = f"{eta} mins" if eta < 120 else f"{eta // 60} h {eta % 60} mins"
+        distance_html = (f"<p>~{match['distance_km']:.1f} km</p>"
+                         f"<p>ETA: {eta_text} by {match['profile']}</p>")
+        match_html = f"<p>{match['score']}% compatible</p>"
+    else:
+        distance_html = "<p>Unavailable</p><p>Your registered location or the incident's could not be mapped</p>"
+        match_html = "<p>Not available</p>"
+
+    if ocean_level > 1 and priority_score > 80:
+        card_class = "tsunami-alert"
+        urgency_text = "🌊 CRITICAL OCEAN EMERGENCY"
+    elif priority_score > 80:
+        card_class = "alert-box"
+        urgency_text = "🚨 HIGH PRIORITY INCIDENT"
+    elif ocean_level > 0:
+        card_class = "ocean-card" 
+        urgency_text = "🌊 OCEAN HAZARD ALERT"
+    elif priority_score > 60:
+        card_class = "warning-box"
+        urgency_text = "⚠️ PRIORITY RESPONSE NEEDED"
+    else:
+        card_class = "info-box"
+        urgency_text = "📋 STANDARD INCIDENT"
+
+    st.markdown(f"""
+    <div class="{card_class}">
+        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
+            <h4>{urgency_text}</h4>
+            <div style="text-align: right;">
+                <span style="background: rgba(255,255,255,0.3); padding: 4px 12px; border-radius: 15px; font-weight: bold;">
+                    Priority: {priority_score}/100
+                </span>
+            </div>
+        </div>
+
+        <div style="display: grid; grid-template-columns: 2fr 1fr; gap: 1.5rem;">
+            <div>
+                <h4>🚨 {incident['disaster_type']} - {incident['severity']}</h4>
+                <p><strong>📍 Location:</strong> {incident['location']}</p>
+                <p><strong>⏰ Reported:</strong> {incident['timestamp']}</p>
+                <p><strong>👤 Reporter:</strong> {incident['username']}</p>
+                <p><strong>📝 Description:</strong> {incident['description'][:150]}...</p>
+                {"<p><strong>🌊 Ocean Hazard Level:</strong> " + str(ocean_level) + "/3</p>" if ocean_level > 0 else ""}
+                {"<p><strong>⚡ Emergency Priority:</strong> Yes</p>" if incident.get('emergency_priority') else ""}
+            </div>
+            <div style="text-align: center;">
+                <div style="background: rgba(255,255,255,0.2); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
+                    <h4>📍 Distance</h4>
+                    {distance_html}
+                </div>
+
+                <div style="background: rgba(255,255,255,0.2); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
+                    <h4>🎯 Match Score</h4>
+                    {match_html}
+                    <small>Based on skills & location</small>
+                </div>
+    """, unsafe_allow_html=True)
+
+    # Real-time acceptance button (KEY FEATURE)
+    if incident.get('volunteer_assigned'):
+        st.info(f"🚀 Mission already accepted by {incident.get('assigned_volunteer', 'another volunteer')}")
+    elif st.button(f"🤝 Accept Mission #{incident['id']}", 
+                   key=f"accept_incident_{incident['id']}", 
+                   use_container_width=True):
+
+        # Assign volunteer to incident; only this card re-renders
+        if assign_volunteer_to_incident(incident['id'], st.session_state.username):
+            st.markdown("""
+            <div class="success-box">
+                <h4>🚀 Mission Accepted Successfully!</h4>
+                <p>You have been assigned to this incident. Emergency coordination activated!</p>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.error("❌ Mission assignment failed. Please try again.")
+        record_interaction_latency('accept_mission', time.perf_counter() - start)
+
+    st.markdown("</div></div></div>", unsafe_allow_html=True)
+
 def show_enhanced_available_incidents():
     """Enhanced available incidents with real-time volunteer acceptance"""
     st.header("🔍 Enhanced Available Incidents")
@@ -346,109 +443,122 @@ def show_enhanced_available_incidents():
     </div>
     """, unsafe_allow_html=True)
 
-    # Filter for unassigned incidents
-    available_incidents = [inc for inc in st.session_state.incidents if not inc.get('volunteer_assigned', False)]
-
-    if available_incidents:
-        # Sort by priority and ocean hazard level
-        sorted_incidents = sorted(available_incidents, 
-                                key=lambda x: (x.get('ocean_hazard_level', 0) * 30 + x.get('priority_score', 0)), 
-                                reverse=True)
+    # One page of unassigned incidents, sorted by priority and ocean hazard level
+    page_incidents, total_available, page_number, next_cursor = get_incident_queue_page('available')
 
+    if page_incidents:
         st.markdown(f"""
         <div class="info-box">
-            <h4>📋 {len(sorted_incidents)} Incident(s) Awaiting Response</h4>
-            <p>Smart-sorted by priority and ocean hazard level for optimal volunteer matching</p>
+            <h4>📋 {total_available} Incident(s) Awaiting Response</h4>
+            <p>Smart-sorted by priority and ocean hazard level for optimal volunteer matching • Page {page_number}</p>
         </div>
         """, unsafe_allow_html=True)
 
-        for idx, incident in enumerate(sorted_incidents):
-            # Enhanced card styling based on ocean hazard and priority
-            ocean_level = incident.get('ocean_hazard_level', 0)
-            priority_score = incident.get('priority_score', 0)
+        matches = get_volunteer_matches(st.session_state.username)
+        for incident in page_incidents:
+            show_available_incident_card(incident, incident_match(matches, incident['id']))
 
-            if ocean_level > 1 and priority_score > 80:
-                card_class = "tsunami-alert"
-                urgency_text = "🌊 CRITICAL OCEAN EMERGENCY"
-            elif priority_score > 80:
-                card_class = "alert-box"
-                urgency_text = "🚨 HIGH PRIORITY INCIDENT"
-            elif ocean_level > 0:
-                card_class = "ocean-card" 
-                urgency_text = "🌊 OCEAN HAZARD ALERT"
-            elif priority_score > 60:
-                card_class = "warning-box"
-                urgency_text = "⚠️ PRIORITY RESPONSE NEEDED"
-            else:
-                card_class = "info-box"
-                urgency_text = "📋 STANDARD INCIDENT"
+        show_queue_navigation('available', next_cursor)
 
-            st.markdown(f"""
-            <div class="{card_class}">
-                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                    <h4>{urgency_text}</h4>
-                    <div style="text-align: right;">
-                        <span style="background: rgba(255,255,255,0.3); padding: 4px 12px; border-radius: 15px; font-weight: bold;">
-                            Priority: {priority_score}/100
-                        </span>
-                    </div>
-                </div>
+    else:
+        st.markdown("""
+        <div class="success-box">
+            <h4>✅ All Clear!</h4>
+            <p>No incidents currently require volunteer assistance. Great work team!</p>
+            <p>Stay ready for when the community needs your help.</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-                <div style="display: grid; grid-template-columns: 2fr 1fr; gap: 1.5rem;">
+@st.fragment
+def show_verification_card(incident):
+    """One verification panel; saving re-runs only this panel"""
+    start = time.perf_counter()
+
+    ocean_level = incident.get('ocean_hazard_level', 0)
+    priority_score = incident.get('priority_score', 0)
+
+    # Enhanced expandable verification panel
+    expander_title = f"{'🌊 OCEAN EMERGENCY' if ocean_level > 1 else '🚨 HIGH PRIORITY' if priority_score > 80 else '📋 STANDARD'} - {incident['disaster_type']} at {incident['location']} (Priority: {priority_score}/100)"
+
+    with st.expander(expander_title):
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            # Enhanced incident details
+            st.markdown(f"""
+            <div class="disaster-card">
+                <h4>📋 Enhanced Incident Details</h4>
+                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
                     <div>
-                        <h4>🚨 {incident['disaster_type']} - {incident['severity']}</h4>
                         <p><strong>📍 Location:</strong> {incident['location']}</p>
-                        <p><strong>⏰ Reported:</strong> {incident['timestamp']}</p>
+                        <p><strong>🕒 Reported:</strong> {incident['timestamp']}</p>
                         <p><strong>👤 Reporter:</strong> {incident['username']}</p>
-                        <p><strong>📝 Description:</strong> {incident['description'][:150]}...</p>
-                        {"<p><strong>🌊 Ocean Hazard Level:</strong> " + str(ocean_level) + "/3</p>" if ocean_level > 0 else ""}
-                        {"<p><strong>⚡ Emergency Priority:</strong> Yes</p>" if incident.get('emergency_priority') else ""}
+                        <p><strong>🌪️ Type:</strong> {incident['disaster_type']}</p>
                     </div>
-                    <div style="text-align: center;">
-                        <div style="background: rgba(255,255,255,0.2); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
-                            <h4>📍 Distance</h4>
-                            <p>~{np.random.randint(5, 25)} km</p>
-                            <p>ETA: {np.random.randint(15, 45)} mins</p>
-                        </div>
+                    <div>
+                        <p><strong>⚠️ Severity:</strong> {incident['severity']}</p>
+                        <p><strong>🎯 Priority:</strong> {priority_score}/100</p>
+                        <p><strong>🌊 Ocean Level:</strong> {ocean_level}/3</p>
+                        <p><strong>📞 Contact:</strong> {'Available' if incident.get('contact_shared') else 'Not shared'}</p>
+                    </div>
+                </div>
+                <div style="margin-top: 1rem;">
+                    <p><strong>📝 Description:</strong> {incident['description']}</p>
+                    {f"<p><strong>ℹ️ Context:</strong> {incident.get('additional_context', 'None provided')}</p>" if incident.get('additional_context') else ""}
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
 
-                        <div style="background: rgba(255,255,255,0.2); padding: 1rem; border-radius: 10px; margin-bottom: 1rem;">
-                            <h4>🎯 Match Score</h4>
-                            <p>{np.random.randint(75, 95)}% compatible</p>
-                            <small>Based on skills & location</small>
-                        </div>
+        with col2:
+            st.markdown(f"""
+            <div class="info-box">
+                <h4>🔧 Enhanced Verification Tools</h4>
+            </div>
             """, unsafe_allow_html=True)
 
-            # Real-time acceptance button (KEY FEATURE)
-            if st.button(f"🤝 Accept Mission #{incident['id']}", 
-                        key=f"accept_incident_{incident['id']}", 
-                        use_container_width=True):
+            # Enhanced verification decision with ocean protocols
+            st.markdown("### Enhanced Verification Decision")
 
-                # Assign volunteer to incident
-                success = assign_volunteer_to_incident(incident['id'], st.session_state.username)
+            if ocean_level > 0:
+                st.markdown("""
+                <div class="tsunami-alert">
+                    <h4>🌊 Ocean Protocol Required</h4>
+                    <p>This incident requires specialized maritime verification procedures</p>
+                </div>
+                """, unsafe_allow_html=True)
 
-                if success:
-                    st.markdown("""
-                    <div class="success-box">
-                        <h4>🚀 Mission Accepted Successfully!</h4>
-                        <p>You have been assigned to this incident. Emergency coordination activated!</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+            decision = st.radio(
+                "Enhanced Verification:",
+                ["✅ Verified - Confirmed True", "❌ Verified - Confirmed False", "🔍 Requires Enhanced Investigation", "🌊 Ocean Protocol Review"],
+                key=f"enhanced_decision_{incident['id']}"
+            )
 
-                    time.sleep(1)
-                    st.rerun()
-                else:
-                    st.error("❌ Mission assignment failed. Please try again.")
+            notes = st.text_area(
+                "Enhanced Verification Notes:", 
+                placeholder="Include cross-reference results, social media analysis, and ocean protocol assessments...",
+                key=f"enhanced_notes_{incident['id']}"
+            )
 
-            st.markdown("</div></div></div>", unsafe_allow_html=True)
+            if st.button(f"💾 Save Enhanced Verification", key=f"enhanced_save_{incident['id']}"):
+                incident['verified'] = decision == "✅ Verified - Confirmed True"
+                incident['verification_notes'] = notes
+                incident['verified_by'] = st.session_state.username
+                incident['verification_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                incident['verification_method'] = "Enhanced AI-Assisted with Ocean Protocol" if ocean_level > 0 else "Enhanced AI-Assisted"
+                bump_incidents_version(incident)
 
-    else:
-        st.markdown("""
-        <div class="success-box">
-            <h4>✅ All Clear!</h4>
-            <p>No incidents currently require volunteer assistance. Great work team!</p>
-            <p>Stay ready for when the community needs your help.</p>
-        </div>
-        """, unsafe_allow_html=True)
+                log_user_action("ENHANCED_VERIFICATION", f"Enhanced verification: Incident #{incident['id']} - {decision}")
+
+                st.markdown(f"""
+                <div class="success-box">
+                    <h4>✅ Enhanced Verification Saved</h4>
+                    <p><strong>Decision:</strong> {decision}</p>
+                    <p><strong>Method:</strong> Enhanced AI-assisted verification</p>
+                    {"<p><strong>Ocean Protocol:</strong> Applied</p>" if ocean_level > 0 else ""}
+                </div>
+                """, unsafe_allow_html=True)
+
+                record_interaction_latency('save_verification', time.perf_counter() - start)
 
 def show_enhanced_verification_interface():
     """Enhanced verification interface with ocean protocols"""
@@ -461,10 +571,10 @@ def show_enhanced_verification_interface():
     </div>
     """, unsafe_allow_html=True)
 
-    # Get enhanced unverified incidents
-    unverified_incidents = [inc for inc in st.session_state.incidents if not inc.get('verified', False)]
+    # One page of unverified incidents, sorted by priority and ocean hazard level
+    page_incidents, total_unverified, page_number, next_cursor = get_incident_queue_page('verification')
 
-    if not unverified_incidents:
+    if not page_incidents:
         st.markdown("""
         <div class="success-box">
             <h4>🎉 All Incidents Verified!</h4>
@@ -473,105 +583,18 @@ def show_enhanced_verification_interface():
         """, unsafe_allow_html=True)
         return
 
-    # Enhanced verification queue with priority sorting
-    sorted_incidents = sorted(unverified_incidents, 
-                             key=lambda x: (x.get('ocean_hazard_level', 0) * 30 + x.get('priority_score', 0)), 
-                             reverse=True)
-
     st.markdown(f"""
     <div class="info-box">
         <h4>📋 Enhanced Verification Queue</h4>
-        <p>{len(sorted_incidents)} incident(s) awaiting verification with enhanced AI assistance and ocean protocol support</p>
+        <p>{total_unverified} incident(s) awaiting verification with enhanced AI assistance and ocean protocol support • Page {page_number}</p>
     </div>
     """, unsafe_allow_html=True)
 
-    # Enhanced verification interface for each incident
-    for idx, incident in enumerate(sorted_incidents):
-        ocean_level = incident.get('ocean_hazard_level', 0)
-        priority_score = incident.get('priority_score', 0)
-
-        # Enhanced expandable verification panel
-        expander_title = f"{'🌊 OCEAN EMERGENCY' if ocean_level > 1 else '🚨 HIGH PRIORITY' if priority_score > 80 else '📋 STANDARD'} - {incident['disaster_type']} at {incident['location']} (Priority: {priority_score}/100)"
-
-        with st.expander(expander_title):
-            col1, col2 = st.columns([2, 1])
-
-            with col1:
-                # Enhanced incident details
-                st.markdown(f"""
-                <div class="disaster-card">
-                    <h4>📋 Enhanced Incident Details</h4>
-                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">
-                        <div>
-                            <p><strong>📍 Location:</strong> {incident['location']}</p>
-                            <p><strong>🕒 Reported:</strong> {incident['timestamp']}</p>
-                            <p><strong>👤 Reporter:</strong> {incident['username']}</p>
-                            <p><strong>🌪️ Type:</strong> {incident['disaster_type']}</p>
-                        </div>
-                        <div>
-                            <p><strong>⚠️ Severity:</strong> {incident['severity']}</p>
-                            <p><strong>🎯 Priority:</strong> {priority_score}/100</p>
-                            <p><strong>🌊 Ocean Level:</strong> {ocean_level}/3</p>
-                            <p><strong>📞 Contact:</strong> {'Available' if incident.get('contact_shared') else 'Not shared'}</p>
-                        </div>
-                    </div>
-                    <div style="margin-top: 1rem;">
-                        <p><strong>📝 Description:</strong> {incident['description']}</p>
-                        {f"<p><strong>ℹ️ Context:</strong> {incident.get('additional_context', 'None provided')}</p>" if incident.get('additional_context') else ""}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-
-            with col2:
-                st.markdown(f"""
-                <div class="info-box">
-                    <h4>🔧 Enhanced Verification Tools</h4>
-                </div>
-                """, unsafe_allow_html=True)
-
-                # Enhanced verification decision with ocean protocols
-                st.markdown("### Enhanced Verification Decision")
-
-                if ocean_level > 0:
-                    st.markdown("""
-                    <div class="tsunami-alert">
-                        <h4>🌊 Ocean Protocol Required</h4>
-                        <p>This incident requires specialized maritime verification procedures</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                decision = st.radio(
-                    "Enhanced Verification:",
-                    ["✅ Verified - Confirmed True", "❌ Verified - Confirmed False", "🔍 Requires Enhanced Investigation", "🌊 Ocean Protocol Review"],
-                    key=f"enhanced_decision_{idx}"
-                )
-
-                notes = st.text_area(
-                    "Enhanced Verification Notes:", 
-                    placeholder="Include cross-reference results, social media analysis, and ocean protocol assessments...",
-                    key=f"enhanced_notes_{idx}"
-                )
-
-                if st.button(f"💾 Save Enhanced Verification", key=f"enhanced_save_{idx}"):
-                    incident['verified'] = decision == "✅ Verified - Confirmed True"
-                    incident['verification_notes'] = notes
-                    incident['verified_by'] = st.session_state.username
-                    incident['verification_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    incident['verification_method'] = "Enhanced AI-Assisted with Ocean Protocol" if ocean_level > 0 else "Enhanced AI-Assisted"
-
-                    log_user_action("ENHANCED_VERIFICATION", f"Enhanced verification: Incident #{incident['id']} - {decision}")
-
-                    st.markdown(f"""
-                    <div class="success-box">
-                        <h4>✅ Enhanced Verification Saved</h4>
-                        <p><strong>Decision:</strong> {decision}</p>
-                        <p><strong>Method:</strong> Enhanced AI-assisted verification</p>
-                        {"<p><strong>Ocean Protocol:</strong> Applied</p>" if ocean_level > 0 else ""}
-                    </div>
-                    """, unsafe_allow_html=True)
+    # Enhanced verification interface for each incident on the page
+    for incident in page_incidents:
+        show_verification_card(incident)
 
-                    time.sleep(1)
-                    st.rerun()
+    show_queue_navigation('verification', next_cursor)
 
 def show_enhanced_volunteer_tasks():
     """Enhanced volunteer tasks with ocean mission support"""
@@ -585,8 +608,10 @@ def show_enhanced_volunteer_tasks():
     """, unsafe_allow_html=True)
 
     # Enhanced task statistics
-    assigned_tasks = [inc for inc in st.session_state.incidents if inc.get('assigned_volunteer') == st.session_state.username]
-    ocean_missions = sum(1 for task in assigned_tasks if task.get('ocean_hazard_level', 0) > 0)
+    store = get_incident_store()
+    task_mask = filter_incidents(store, assigned_volunteer=st.session_state.username)
+    assigned_tasks = [st.session_state.incidents[row] for row in np.flatnonzero(task_mask)]
+    ocean_missions = incident_metrics(store, task_mask)['ocean']
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -720,31 +745,111 @@ def show_enhanced_analytics():
     </div>
     """, unsafe_allow_html=True)
 
-    # Enhanced analytics with ocean focus
+    rollups = get_incident_rollups()
+
+    # Last 30 days against the 30 days before, from the daily rollups
+    today = bucket_start((datetime.now() - datetime(1970, 1, 1)).total_seconds(), 'day') + 86400
+    month = 30 * 86400
+
+    def trend(dimension='disaster_type', accept=None):
+        current = rollup_total(rollups, 'day', today - month, today, dimension, accept)
+        previous = rollup_total(rollups, 'day', today - 2 * month, today - month, dimension, accept)
+        change = f"{(current - previous) / previous * 100:+.0f}% vs previous 30 days" if previous else "no earlier data"
+        return current, change
+
+    total_current, total_change = trend()
+    ocean_current, ocean_change = trend('ocean_hazard_level', lambda level: level > 0)
+    assignment = response_time_stats(rollups, 'assignment')
+    verification = response_time_stats(rollups, 'verification')
+
     col1, col2 = st.columns(2)
 
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="info-box">
-            <h4>📈 Enhanced Incident Trends</h4>
-            <p><strong>🌊 Ocean Hazards:</strong> 34% increase this month</p>
-            <p><strong>🚨 Overall Incidents:</strong> 12% increase</p>
-            <p><strong>⚡ Response Time:</strong> 15% improvement</p>
-            <p><strong>🎯 AI Accuracy:</strong> 96.2% (industry leading)</p>
+            <h4>📈 Incident Trends (last 30 days)</h4>
+            <p><strong>🌊 Ocean Hazards:</strong> {ocean_current} ({ocean_change})</p>
+            <p><strong>🚨 Overall Incidents:</strong> {total_current} ({total_change})</p>
         </div>
         """, unsafe_allow_html=True)
 
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div class="success-box">
-            <h4>⚡ Enhanced System Performance</h4>
-            <p><strong>Database Performance:</strong> 5x faster with WAL mode</p>
-            <p><strong>AI Processing Speed:</strong> 1.8 seconds average</p>
-            <p><strong>Location Accuracy:</strong> 99.7% with enhanced geocoding</p>
-            <p><strong>Social Media Monitoring:</strong> 12,000+ posts/hour</p>
+            <h4>⚡ Response Times</h4>
+            <p><strong>🤝 Volunteer Assignment:</strong> median {assignment['p50_min']:.0f} min • p90 {assignment['p90_min']:.0f} min ({assignment['count']} incidents)</p>
+            <p><strong>✅ Verification:</strong> median {verification['p50_min']:.0f} min • p90 {verification['p90_min']:.0f} min ({verification['count']} incidents)</p>
         </div>
         """, unsafe_allow_html=True)
 
+    # Incident counts over time
+    st.subheader("📈 Incidents Over Time")
+    dimension_labels = {'disaster_type': "Disaster type", 'severity': "Severity", 'region': "Region",
+                        'ocean_hazard_level': "Ocean hazard level"}
+    col1, col2 = st.columns(2)
+    with col1:
+        grain = st.selectbox("Interval", list(ROLLUP_GRAINS), index=1, format_func=str.title)
+    with col2:
+        dimension = st.selectbox("Break down by", list(dimension_labels), format_func=dimension_labels.get)
+
+    if rollups['counts'][grain][dimension]:
+        st.plotly_chart(rollup_figure(rollups, grain, dimension), use_container_width=True)
+    else:
+        st.info("No timestamped incidents yet")
+
+    st.subheader("⏱️ Response Time Distribution")
+    if assignment['count'] or verification['count']:
+        st.plotly_chart(response_time_figure(rollups), use_container_width=True)
+    else:
+        st.info("No incidents have been assigned or verified yet")
+
+    show_post_event_analysis()
+
+def show_post_event_analysis():
+    """Ad-hoc queries over the Parquet analytics export"""
+    st.subheader("🗄️ Post-Event Analysis")
+
+    if not PYARROW_AVAILABLE:
+        st.warning("pyarrow is not installed - the Parquet analytics export is unavailable")
+        return
+
+    export_status = get_analytics_export_status()
+    if export_status['error']:
+        st.error(f"Last scheduled export failed: {export_status['error']}")
+    elif export_status['time']:
+        st.caption(f"Last export {export_status['time']}: " +
+                   ", ".join(f"{table} +{rows}" for table, rows in export_status['rows'].items()))
+
+    if st.button("📦 Export Now", use_container_width=True):
+        with st.spinner("📦 Writing Parquet export..."):
+            written = {'session_incidents': export_session_incidents(st.session_state.incidents)}
+            if os.path.exists(ANALYTICS_SOURCE_DB):
+                written.update(export_analytics_tables())
+        st.success("✅ Exported " + ", ".join(f"{rows} {table}" for table, rows in written.items()))
+
+    datasets = exported_datasets()
+    if not datasets:
+        st.info(f"No export in {ANALYTICS_EXPORT_PATH} yet")
+        return
+
+    if DUCKDB_AVAILABLE:
+        sql = st.text_area("SQL over " + ", ".join(datasets), key="analytics_sql", value=(
+            f"SELECT month, disaster_type, COUNT(*) AS incidents\nFROM {datasets[0]}\n"
+            "GROUP BY month, disaster_type\nORDER BY month DESC, incidents DESC\nLIMIT 50"))
+        if st.button("▶️ Run Query", use_container_width=True):
+            try:
+                start = time.perf_counter()
+                result = query_analytics(sql)
+                st.caption(f"{len(result)} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+                st.dataframe(result, hide_index=True)
+            except Exception as e:
+                st.error(f"Query failed: {e}")
+    else:
+        st.caption("DuckDB is not installed - showing Arrow group counts instead of SQL")
+        dataset = st.selectbox("Dataset", datasets, key="analytics_dataset")
+        columns = ['month', 'disaster_type'] if dataset in ('incidents', 'session_incidents') else ['month']
+        st.dataframe(summarize_dataset(dataset, columns), hide_index=True)
+
 def show_enhanced_system_settings():
     """Enhanced system settings with ocean monitoring configuration"""
     st.header("⚙️ Enhanced System Control & Ocean Configuration")
@@ -783,6 +888,69 @@ def show_enhanced_system_settings():
                 time.sleep(1)
                 st.success("✅ All ocean monitoring systems operational!")
 
+        # Authenticity cascade metrics
+        cascade_stats = get_authenticity_cascade_stats()
+        stage_labels = {'header': "📄 Header checks", 'low_res': "🔬 Low-res statistics", 'frequency': "📡 FFT & block analysis"}
+        stage_rows = "".join(
+            f"<p><strong>{stage_labels[stage]}:</strong> {stats['runs']} runs • {stats['avg_ms']:.0f} ms avg • {stats['exit_rate']:.0f}% exit here</p>"
+            for stage, stats in cascade_stats['stages'].items()
+        )
+        st.markdown(f"""
+        <div class="info-box">
+            <h4>🔍 Authenticity Cascade</h4>
+            <p><strong>Images Analysed:</strong> {cascade_stats['images']}</p>
+            {stage_rows}
+            <p><strong>⚡ Full Analysis Skipped:</strong> {cascade_stats['frequency_stage_skipped']} images (~{cascade_stats['estimated_seconds_saved']:.1f}s saved)</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Classifier backend selection and micro-batch metrics
+        backends = available_classifier_backends()
+        selected_backend = st.selectbox("🧠 Disaster Classifier Backend", backends,
+                                        index=backends.index(get_classifier_backend()))
+        if selected_backend != get_classifier_backend():
+            set_classifier_backend(selected_backend)
+            st.success(f"✅ Classifier backend switched to {selected_backend}")
+        if selected_backend == 'onnx' and not ONNXRUNTIME_AVAILABLE:
+            st.warning("onnxruntime is not installed - falling back to heuristic rules")
+
+        for name, stats in get_classifier_batch_stats().items():
+            st.info(f"🧠 {name}: {stats['images']} images in {stats['batches']} micro-batches "
+                    f"(avg {stats['avg_batch_size']:.1f} per batch, {stats['avg_batch_ms']:.0f} ms)")
+
+        # Map render cache metrics
+        map_cache_stats = get_map_cache_stats()
+        st.markdown(f"""
+        <div class="info-box">
+            <h4>🗺️ Map Render Cache</h4>
+            <p><strong>Hit Rate:</strong> {map_cache_stats['hit_rate']:.0f}% ({map_cache_stats['hits']} hits / {map_cache_stats['misses']} builds)</p>
+            <p><strong>⏱️ Avg Build Time:</strong> {map_cache_stats['avg_render_ms']:.0f} ms • <strong>Avg Hit:</strong> {map_cache_stats['avg_hit_ms']:.2f} ms</p>
+            <p><strong>📦 Cached Maps:</strong> {map_cache_stats['entries']}/{MAP_CACHE_SIZE} • <strong>Evictions:</strong> {map_cache_stats['evictions']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Offline basemap tiles
+        tile_status = get_tile_server_status()
+        if tile_status['active']:
+            st.success(f"🗺️ Basemap served from the offline tile cache ({TILE_CACHE_PATH})")
+        else:
+            st.warning(f"🗺️ Basemap loaded from public OpenStreetMap servers - {tile_status['reason']}")
+
+        # Interaction latency: fragment actions vs full script reruns
+        latency_labels = {'full_rerun': "🔁 Full app rerun", 'accept_mission': "🤝 Accept mission",
+                          'save_verification': "✅ Save verification"}
+        latency_rows = "".join(
+            f"<p><strong>{latency_labels.get(name, name)}:</strong> p50 {stats['p50_ms']:.0f} ms • "
+            f"p95 {stats['p95_ms']:.0f} ms • max {stats['max_ms']:.0f} ms ({stats['count']})</p>"
+            for name, stats in get_interaction_latency_stats().items()
+        )
+        st.markdown(f"""
+        <div class="info-box">
+            <h4>⚡ Interaction Latency</h4>
+            {latency_rows or "<p>No interactions recorded yet</p>"}
+        </div>
+        """, unsafe_allow_html=True)
+
     with col2:
         st.subheader("👥 Enhanced User Management")
 
@@ -811,4 +979,8 @@ def show_enhanced_system_settings():
         """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_start = time.perf_counter()
+    try:
+        main()
+    finally:
+        record_interaction_latency('full_rerun', time.perf_counter() - run_start)
\ No newline at end of file
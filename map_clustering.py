@@ -0,0 +1,213 @@
+import math
+import heapq
+import itertools
+from collections import Counter, OrderedDict
+
+# Server-side incident clustering for the live map
+# Each zoom level keeps a grid of web-mercator cells CLUSTER_RADIUS_PX wide
+# on screen. Incidents are added to every level as they arrive, so a map
+# render only walks the cells of the current zoom instead of every incident.
+# Individual incidents are also bucketed into slippy-map tiles so a viewport
+# query only touches the tiles it covers; per-tile results are cached.
+
+CLUSTER_RADIUS_PX = 60
+MIN_CLUSTER_ZOOM = 0
+MAX_CLUSTER_ZOOM = 13
+INDIVIDUAL_MARKER_ZOOM = 14     # street level: every incident gets its own marker
+SEVERITY_LEVELS = ('Critical', 'High', 'Medium', 'Low')
+
+STORAGE_TILE_ZOOM = 10          # incidents are bucketed into zoom-10 tiles (~40 km)
+MAX_TILE_ZOOM = 19
+TILE_CACHE_SIZE = 1024
+# Most individual markers drawn per viewport, highest priority first: (min zoom, cap)
+VIEWPORT_MARKER_CAPS = ((14, 2000), (10, 1000), (6, 600), (0, 300))
+
+def _mercator(lat, lon):
+    """Normalized web-mercator x, y in [0, 1]"""
+    lat = max(min(lat, 85.0511), -85.0511)
+    sin_lat = math.sin(math.radians(lat))
+    x = (lon + 180.0) / 360.0
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+def _tile_key(x, y, zoom):
+    n = 2 ** zoom
+    return min(int(x * n), n - 1), min(int(y * n), n - 1)
+
+def _cell_key(x, y, zoom):
+    cell_size = CLUSTER_RADIUS_PX / (256.0 * 2 ** zoom)
+    return int(x // cell_size), int(y // cell_size)
+
+def create_cluster_index():
+    """Empty cluster hierarchy"""
+    return {
+        'levels': {zoom: {} for zoom in range(MIN_CLUSTER_ZOOM, MAX_CLUSTER_ZOOM + 1)},
+        'incidents': {},
+        'tiles': {},
+        'tile_cache': OrderedDict(),
+        'tile_cache_stats': {'hits': 0, 'misses': 0}
+    }
+
+def add_incident_to_cluster_index(index, incident):
+    """Add one incident to every zoom level of the hierarchy"""
+    incident_id = incident.get('id')
+    lat, lon = incident.get('latitude'), incident.get('longitude')
+    if not lat or not lon or incident_id in index['incidents']:
+        return
+
+    x, y = _mercator(lat, lon)
+    index['incidents'][incident_id] = incident
+    index['tiles'].setdefault(_tile_key(x, y, STORAGE_TILE_ZOOM), []).append(incident)
+
+    # Drop cached viewport tiles that contain the new incident
+    if index['tile_cache']:
+        for zoom in range(MAX_TILE_ZOOM + 1):
+            index['tile_cache'].pop((zoom,) + _tile_key(x, y, zoom), None)
+
+    for zoom, cells in index['levels'].items():
+        cluster = cells.get(_cell_key(x, y, zoom))
+        if cluster is None:
+            cluster = cells[_cell_key(x, y, zoom)] = {
+                'count': 0, 'lat_sum': 0.0, 'lon_sum': 0.0,
+                'severity': Counter(), 'types': Counter(),
+                'max_priority': 0, 'ocean_incidents': 0, 'first_id': incident_id
+            }
+        cluster['count'] += 1
+        cluster['lat_sum'] += lat
+        cluster['lon_sum'] += lon
+        cluster['severity'][incident.get('severity', 'Low')] += 1
+        cluster['types'][incident.get('disaster_type', 'Other')] += 1
+        cluster['max_priority'] = max(cluster['max_priority'], incident.get('priority_score', 50))
+        cluster['ocean_incidents'] += incident.get('ocean_hazard_level', 0) > 0
+
+def sync_cluster_index(index, incidents):
+    """Add incidents not yet indexed; rebuild if any were removed"""
+    mappable = [inc for inc in incidents if inc.get('latitude') and inc.get('longitude')]
+    if len(index['incidents']) > len(mappable):
+        index.update(create_cluster_index())
+
+    for incident in mappable:
+        if incident.get('id') not in index['incidents']:
+            add_incident_to_cluster_index(index, incident)
+    return index
+
+def _in_bounds(lat, lon, bounds):
+    if not bounds:
+        return True
+    south, west, north, east = bounds
+    return south <= lat <= north and west <= lon <= east
+
+def pad_bounds(bounds, ratio=0.5):
+    """Grow (south, west, north, east) by ratio of its size on every side"""
+    south, west, north, east = bounds
+    lat_pad = (north - south) * ratio
+    lon_pad = (east - west) * ratio
+    return south - lat_pad, west - lon_pad, north + lat_pad, east + lon_pad
+
+def bounds_contain(outer, inner):
+    """True if inner lies within outer; None as outer means unbounded"""
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+def viewport_marker_cap(zoom):
+    """Most individual markers drawn at a zoom level"""
+    for min_zoom, cap in VIEWPORT_MARKER_CAPS:
+        if zoom >= min_zoom:
+            return cap
+    return VIEWPORT_MARKER_CAPS[-1][1]
+
+def _priority_key(incident):
+    return -incident.get('priority_score', 50)
+
+def _tile_incidents(index, zoom, tx, ty):
+    """Incidents in one map tile, highest priority first and capped, cached per tile"""
+    key = (zoom, tx, ty)
+    cache = index['tile_cache']
+    if key in cache:
+        cache.move_to_end(key)
+        index['tile_cache_stats']['hits'] += 1
+        return cache[key]
+    index['tile_cache_stats']['misses'] += 1
+
+    if zoom >= STORAGE_TILE_ZOOM:
+        shift = zoom - STORAGE_TILE_ZOOM
+        n = 2 ** zoom
+        candidates = index['tiles'].get((tx >> shift, ty >> shift), [])
+        if shift:
+            candidates = [inc for inc in candidates
+                          if _tile_key(*_mercator(inc['latitude'], inc['longitude']), zoom) == (tx, ty)]
+    else:
+        shift = STORAGE_TILE_ZOOM - zoom
+        candidates = [inc for (sx, sy), bucket in index['tiles'].items()
+                      if (sx >> shift, sy >> shift) == (tx, ty) for inc in bucket]
+
+    result = heapq.nsmallest(viewport_marker_cap(zoom), candidates, key=_priority_key)
+    cache[key] = result
+    if len(cache) > TILE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return result
+
+def query_viewport_incidents(index, bounds, zoom):
+    """Highest-priority incidents in the tiles covering bounds, capped per zoom"""
+    zoom = max(min(int(zoom), MAX_TILE_ZOOM), 0)
+    cap = viewport_marker_cap(zoom)
+    if not bounds:
+        return heapq.nsmallest(cap, index['incidents'].values(), key=_priority_key)
+
+    south, west, north, east = bounds
+    x0, y0 = _tile_key(*_mercator(north, west), zoom)
+    x1, y1 = _tile_key(*_mercator(south, east), zoom)
+    tiles = [_tile_incidents(index, zoom, tx, ty)
+             for tx in range(x0, x1 + 1) for ty in range(y0, y1 + 1)]
+    return list(itertools.islice(heapq.merge(*tiles, key=_priority_key), cap))
+
+def _cells_in_bounds(cells, zoom, bounds):
+    """Clusters of one level whose cell overlaps bounds"""
+    if not bounds:
+        return cells.values()
+    south, west, north, east = bounds
+    x0, y0 = _cell_key(*_mercator(north, west), zoom)
+    x1, y1 = _cell_key(*_mercator(south, east), zoom)
+    if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+        return [cluster for (cx, cy), cluster in cells.items() if x0 <= cx <= x1 and y0 <= cy <= y1]
+    return [cells[(cx, cy)] for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1) if (cx, cy) in cells]
+
+def get_map_clusters(index, zoom, bounds=None):
+    """Clusters and single incidents to draw at a zoom level
+
+    bounds is (south, west, north, east). Single incidents are capped per
+    zoom, highest priority first. Returns (clusters, incidents).
+    """
+    if zoom >= INDIVIDUAL_MARKER_ZOOM:
+        return [], query_viewport_incidents(index, bounds, zoom)
+
+    cluster_zoom = max(min(int(zoom), MAX_CLUSTER_ZOOM), MIN_CLUSTER_ZOOM)
+    clusters = []
+    singles = []
+    for cluster in _cells_in_bounds(index['levels'][cluster_zoom], cluster_zoom, bounds):
+        lat = cluster['lat_sum'] / cluster['count']
+        lon = cluster['lon_sum'] / cluster['count']
+        if cluster['count'] == 1:
+            singles.append(index['incidents'][cluster['first_id']])
+            continue
+        clusters.append({
+            'latitude': lat,
+            'longitude': lon,
+            'count': cluster['count'],
+            'severity': {level: cluster['severity'][level] for level in SEVERITY_LEVELS if cluster['severity'][level]},
+            'top_types': cluster['types'].most_common(3),
+            'max_priority': cluster['max_priority'],
+            'ocean_incidents': cluster['ocean_incidents']
+        })
+    return clusters, heapq.nsmallest(viewport_marker_cap(zoom), singles, key=_priority_key)
+
+def leaflet_bounds_to_tuple(bounds):
+    """st_folium's bounds dict as (south, west, north, east)"""
+    try:
+        return (bounds['_southWest']['lat'], bounds['_southWest']['lng'],
+                bounds['_northEast']['lat'], bounds['_northEast']['lng'])
+    except (KeyError, TypeError):
+        return None
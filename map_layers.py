@@ -0,0 +1,132 @@
+import json
+import math
+import folium
+from folium.utilities import JsCode
+
+# Lightweight map layers for the live map
+# Incidents go out as one GeoJSON feature collection with a handful of
+# compact properties; colors, sizes and the popup are produced in the
+# browser, and the full incident detail is rendered by the app on click.
+# Server-side clusters (map_clustering) are drawn here as count markers
+# colored by their worst severity with SEVERITY_COLORS.
+
+# Enhanced color mapping with ocean hazards
+INCIDENT_COLOR_MAP = {
+    'Tsunami': 'red',
+    'Coastal Surge': 'purple',
+    'Storm Surge': 'darkred',
+    'Harmful Algal Bloom': 'green',
+    'Fire/Wildfire': 'orange',
+    'Flood': 'blue',
+    'Earthquake/Building Collapse': 'black',
+    'Cyclone/Storm': 'purple',
+    'Landslide': 'brown',
+    'Natural Disaster': 'gray',
+    'Other': 'gray'
+}
+
+SEVERITY_COLORS = {
+    'Critical': '#d63031',
+    'High': '#e17055',
+    'Medium': '#f0a500',
+    'Low': '#0984e3'
+}
+
+GEOJSON_COORD_DECIMALS = 5   # ~1 m
+
+INCIDENT_FEATURE_JS = """
+function(feature, layer) {
+    var typeColors = %s;
+    var severityColors = %s;
+    var p = feature.properties;
+    var color = typeColors[p.type] || 'gray';
+    var riskZone = p.priority > 70 || p.ocean > 1;
+    layer.setStyle({
+        radius: p.priority > 80 ? 10 : p.priority > 60 ? 8 : 6,
+        color: riskZone ? color : (severityColors[p.severity] || '#636e72'),
+        weight: riskZone ? 3 : 1.5,
+        fillColor: color,
+        fillOpacity: p.verified ? 0.9 : 0.55
+    });
+    layer.on('click', function() {
+        if (!layer.getPopup()) {
+            layer.bindPopup(
+                '<b>' + (p.ocean > 0 ? '🌊 ' : '🚨 ') + p.type + '</b><br>' +
+                '⚠️ <span style="color:' + (severityColors[p.severity] || '#636e72') + '">' + p.severity + '</span>' +
+                ' • 🎯 ' + p.priority + '/100<br>' +
+                (p.verified ? '✓ Verified' : '⏳ Pending Verification') +
+                '<br><small>Details shown below the map</small>'
+            );
+            layer.openPopup();
+        }
+    });
+}
+""" % (json.dumps(INCIDENT_COLOR_MAP), json.dumps(SEVERITY_COLORS))
+
+def incidents_to_geojson(incidents):
+    """Feature collection with only the properties the map styles on"""
+    features = []
+    for incident in incidents:
+        lat, lon = incident.get('latitude'), incident.get('longitude')
+        if not lat or not lon:
+            continue
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point',
+                         'coordinates': [round(lon, GEOJSON_COORD_DECIMALS), round(lat, GEOJSON_COORD_DECIMALS)]},
+            'properties': {
+                'id': incident.get('id'),
+                'type': incident.get('disaster_type', 'Other'),
+                'severity': incident.get('severity', 'Low'),
+                'priority': incident.get('priority_score', 50),
+                'verified': int(bool(incident.get('verified'))),
+                'ocean': incident.get('ocean_hazard_level', 0)
+            }
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+def add_incident_geojson_layer(m, incidents, name="Incidents"):
+    """All incidents as a single client-styled GeoJSON layer"""
+    geojson = incidents_to_geojson(incidents)
+    if geojson['features']:
+        folium.GeoJson(
+            geojson,
+            name=name,
+            marker=folium.CircleMarker(radius=6, fill=True),
+            on_each_feature=JsCode(INCIDENT_FEATURE_JS)
+        ).add_to(m)
+    return m
+
+def add_cluster_marker(m, cluster):
+    """Aggregated marker with count and severity breakdown"""
+    top_severity = next(iter(cluster['severity']), 'Low')
+    color = SEVERITY_COLORS[top_severity]
+    size = int(30 + 8 * math.log10(cluster['count']))
+
+    severity_html = "".join(
+        f"<span style='color: {SEVERITY_COLORS[level]};'>● {level}: {count}</span><br>"
+        for level, count in cluster['severity'].items()
+    )
+    types_html = ", ".join(f"{disaster_type} ({count})" for disaster_type, count in cluster['top_types'])
+    popup_html = f"""
+    <div style="font-family: Poppins, sans-serif;">
+        <h4 style="margin-bottom: 6px;">📍 {cluster['count']} incidents</h4>
+        <p>{severity_html}</p>
+        <p><strong>Top types:</strong> {types_html}</p>
+        <p><strong>🎯 Max priority:</strong> {cluster['max_priority']}/100 • <strong>🌊 Ocean:</strong> {cluster['ocean_incidents']}</p>
+        <small>Zoom in for individual reports</small>
+    </div>
+    """
+
+    folium.Marker(
+        location=[cluster['latitude'], cluster['longitude']],
+        popup=folium.Popup(popup_html, max_width=260),
+        icon=folium.DivIcon(
+            icon_size=(size, size),
+            icon_anchor=(size // 2, size // 2),
+            html=f"""<div style="background: {color}; color: white; width: {size}px; height: {size}px;
+                     border-radius: 50%; border: 3px solid rgba(255,255,255,0.8); opacity: 0.9;
+                     display: flex; align-items: center; justify-content: center;
+                     font-weight: 600; font-size: 12px;">{cluster['count']}</div>"""
+        )
+    ).add_to(m)
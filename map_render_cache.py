@@ -0,0 +1,57 @@
+import time
+import threading
+from collections import OrderedDict
+
+# Cache of built folium maps shared by all sessions in the server process
+# Keys carry the session's incident dataset id and version, the warnings
+# version, the viewport and the user role, so an entry is only reused while
+# everything drawn on the map is unchanged.
+
+MAP_CACHE_SIZE = 64
+
+_map_cache_lock = threading.Lock()
+_map_cache = OrderedDict()
+_map_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'render_seconds': 0.0, 'hit_seconds': 0.0}
+
+def get_cached_map(key, build_map):
+    """Return (map, cache hit) for key, building and storing the map on a miss
+
+    A map that came from the cache has already been rendered once, so it can
+    be passed to st_folium with render=False; folium appends duplicate
+    scripts every time the same map object is rendered again.
+    """
+    start = time.perf_counter()
+    with _map_cache_lock:
+        if key in _map_cache:
+            _map_cache.move_to_end(key)
+            _map_cache_stats['hits'] += 1
+            _map_cache_stats['hit_seconds'] += time.perf_counter() - start
+            return _map_cache[key], True
+
+    m = build_map()
+
+    with _map_cache_lock:
+        _map_cache_stats['misses'] += 1
+        _map_cache_stats['render_seconds'] += time.perf_counter() - start
+        _map_cache[key] = m
+        while len(_map_cache) > MAP_CACHE_SIZE:
+            _map_cache.popitem(last=False)
+            _map_cache_stats['evictions'] += 1
+    return m, False
+
+def clear_map_cache():
+    """Drop all cached maps"""
+    with _map_cache_lock:
+        _map_cache.clear()
+
+def get_map_cache_stats():
+    """Hit rate, average render and lookup times"""
+    with _map_cache_lock:
+        stats = dict(_map_cache_stats)
+        stats['entries'] = len(_map_cache)
+
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups * 100 if lookups else 0.0
+    stats['avg_render_ms'] = stats['render_seconds'] / stats['misses'] * 1000 if stats['misses'] else 0.0
+    stats['avg_hit_ms'] = stats['hit_seconds'] / stats['hits'] * 1000 if stats['hits'] else 0.0
+    return stats
@@ -0,0 +1,180 @@
+import os
+import csv
+import threading
+import numpy as np
+import cv2
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from config_and_database import get_db_connection, init_enhanced_database
+
+# Known-fake / recycled media corpus
+# Reference images (old disaster footage, stock photos, previously debunked
+# posts) are indexed by a 64-bit DCT perceptual hash. Uploads are hashed the
+# same way and compared by Hamming distance before any pixel analysis runs.
+
+CORPUS_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+CONFIDENT_MATCH_DISTANCE = 6   # bits out of 64
+POSSIBLE_MATCH_DISTANCE = 12
+CORPUS_INSERT_BATCH_SIZE = 1000
+
+_corpus_lock = threading.Lock()
+_corpus_index = None  # (hashes uint64 array, list of reference rows)
+
+def compute_perceptual_hash(image):
+    """64-bit DCT perceptual hash of a PIL image or RGB/gray array"""
+    img_array = np.asarray(image)
+    if img_array.ndim == 3:
+        if img_array.shape[2] == 4:
+            img_array = img_array[:, :, :3]
+        gray = cv2.cvtColor(np.ascontiguousarray(img_array, dtype=np.uint8), cv2.COLOR_RGB2GRAY)
+    else:
+        gray = img_array.astype(np.uint8)
+
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8].flatten()
+    median = np.median(low_freq[1:])
+    bits = (low_freq > median).astype(np.uint8)
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def _to_signed(value):
+    """SQLite INTEGER is signed 64-bit"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+def _hamming_distances(hashes, query):
+    """Vectorized Hamming distance between a uint64 array and one hash"""
+    xor = np.bitwise_xor(hashes, np.uint64(query))
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(xor).astype(np.int32)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+def _hash_reference_file(path):
+    """Decode at reduced resolution - the hash only needs 32x32 pixels"""
+    gray = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None or gray.size == 0:
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    return compute_perceptual_hash(gray)
+
+def _read_corpus_manifest(manifest_path):
+    """Optional CSV manifest: file_name, source, description, original_date"""
+    manifest = {}
+    if manifest_path and os.path.exists(manifest_path):
+        with open(manifest_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('file_name'):
+                    manifest[row['file_name']] = row
+    return manifest
+
+def load_known_fake_corpus(directory, source="", description="", manifest_path=None, workers=8):
+    """Bulk-load a directory of reference images into the known-fake corpus
+
+    Returns (images added, unreadable files). Hashes already stored for the
+    same source are skipped, so reloading a directory adds only new images.
+    """
+    init_enhanced_database()
+    manifest = _read_corpus_manifest(manifest_path)
+
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(CORPUS_IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+
+    loaded = 0
+    skipped = 0
+    added_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with get_db_connection() as conn:
+        c = conn.cursor()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for start in range(0, len(paths), CORPUS_INSERT_BATCH_SIZE):
+                batch_paths = paths[start:start + CORPUS_INSERT_BATCH_SIZE]
+                rows = []
+                for path, phash in zip(batch_paths, pool.map(_hash_reference_file, batch_paths)):
+                    if phash is None:
+                        skipped += 1
+                        continue
+                    meta = manifest.get(os.path.basename(path), {})
+                    rows.append((_to_signed(phash),
+                                 meta.get('source') or source or os.path.basename(path),
+                                 meta.get('description') or description,
+                                 meta.get('original_date', ''),
+                                 path, added_at))
+
+                changes = conn.total_changes
+                c.executemany("""INSERT OR IGNORE INTO known_fake_media
+                                 (phash, source, description, original_date, file_path, added_at)
+                                 VALUES (?, ?, ?, ?, ?, ?)""", rows)
+                conn.commit()
+                loaded += conn.total_changes - changes
+
+    invalidate_corpus_index()
+    return loaded, skipped
+
+def invalidate_corpus_index():
+    """Force the in-memory hash index to reload on next lookup"""
+    global _corpus_index
+    with _corpus_lock:
+        _corpus_index = None
+
+def _get_corpus_index():
+    global _corpus_index
+    with _corpus_lock:
+        if _corpus_index is None:
+            try:
+                with get_db_connection() as conn:
+                    c = conn.cursor()
+                    c.execute("""SELECT phash, source, description, original_date, file_path
+                                 FROM known_fake_media""")
+                    rows = c.fetchall()
+            except Exception:
+                rows = []
+
+            hashes = np.array([_to_unsigned(row[0]) for row in rows], dtype=np.uint64)
+            _corpus_index = (hashes, rows)
+        return _corpus_index
+
+def find_recycled_media(image, max_distance=POSSIBLE_MATCH_DISTANCE):
+    """Look up an image in the known-fake corpus, returns closest match or None"""
+    try:
+        hashes, rows = _get_corpus_index()
+        if len(hashes) == 0:
+            return None
+
+        distances = _hamming_distances(hashes, compute_perceptual_hash(image))
+        best = int(np.argmin(distances))
+        distance = int(distances[best])
+        if distance > max_distance:
+            return None
+
+        _, source, description, original_date, file_path = rows[best]
+        return {
+            'source': source,
+            'description': description,
+            'original_date': original_date,
+            'file_path': file_path,
+            'distance': distance,
+            'similarity': round((1 - distance / 64) * 100, 1),
+            'confident': distance <= CONFIDENT_MATCH_DISTANCE
+        }
+    except Exception:
+        return None
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load reference images into the known-fake media corpus")
+    parser.add_argument("directory", help="Directory of reference images (searched recursively)")
+    parser.add_argument("--source", default="", help="Source attribution for all images, e.g. '2011 Japan tsunami'")
+    parser.add_argument("--description", default="", help="Description stored with each reference")
+    parser.add_argument("--manifest", help="CSV with file_name, source, description, original_date columns")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    loaded, skipped = load_known_fake_corpus(args.directory, args.source, args.description,
+                                             args.manifest, args.workers)
+    print(f"Loaded {loaded} new reference images ({skipped} unreadable)")
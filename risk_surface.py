@@ -0,0 +1,167 @@
+import math
+import time
+import numpy as np
+import folium
+
+# Kernel-density risk surface for the live map
+# Incident weights (priority and ocean hazard level) are accumulated on a
+# fixed lat/lon grid over India. The density is the weight grid convolved
+# with a Gaussian kernel: a full rebuild uses one FFT convolution, while a
+# small batch of new incidents adds its kernel patches directly, so the
+# surface stays current without recomputing everything on each report.
+
+RISK_GRID_BOUNDS = (5.0, 66.0, 37.0, 98.0)   # south, west, north, east
+RISK_CELL_DEG = 0.05                          # ~5.5 km
+RISK_BANDWIDTH_KM = 15.0
+RISK_KERNEL_SIGMAS = 4                        # kernel truncated at this many standard deviations
+RISK_INCREMENTAL_MAX = 2000                   # larger batches are folded in with a full FFT rebuild
+OCEAN_LEVEL_WEIGHT = 0.5
+RISK_MIN_DISPLAY = 0.03                       # fraction of the display scale below which cells are transparent
+
+def incident_risk_weight(incident):
+    """Kernel weight of one incident from its priority and ocean hazard level"""
+    return incident.get('priority_score', 50) / 100.0 + OCEAN_LEVEL_WEIGHT * incident.get('ocean_hazard_level', 0)
+
+def _gaussian_kernel(cell_deg, bandwidth_km, center_lat):
+    """Normalized 2D Gaussian in grid cells, narrower in rows than columns away from the equator"""
+    sigma_rows = bandwidth_km / (111.0 * cell_deg)
+    sigma_cols = bandwidth_km / (111.0 * math.cos(math.radians(center_lat)) * cell_deg)
+    half_rows = int(math.ceil(RISK_KERNEL_SIGMAS * sigma_rows))
+    half_cols = int(math.ceil(RISK_KERNEL_SIGMAS * sigma_cols))
+    rows = np.arange(-half_rows, half_rows + 1)[:, None]
+    cols = np.arange(-half_cols, half_cols + 1)[None, :]
+    kernel = np.exp(-0.5 * ((rows / sigma_rows) ** 2 + (cols / sigma_cols) ** 2))
+    return kernel / kernel.sum()
+
+def create_risk_surface(bounds=RISK_GRID_BOUNDS, cell_deg=RISK_CELL_DEG, bandwidth_km=RISK_BANDWIDTH_KM):
+    """Empty risk surface"""
+    south, west, north, east = bounds
+    shape = (int(round((north - south) / cell_deg)), int(round((east - west) / cell_deg)))
+    kernel = _gaussian_kernel(cell_deg, bandwidth_km, (north + south) / 2)
+
+    # Linear (not circular) convolution needs the grid padded by the kernel size
+    fft_shape = tuple(_fft_size(n + k - 1) for n, k in zip(shape, kernel.shape))
+    return {
+        'bounds': bounds,
+        'cell_deg': cell_deg,
+        'bandwidth_km': bandwidth_km,
+        'kernel': kernel,
+        'kernel_fft': np.fft.rfft2(kernel, fft_shape),
+        'fft_shape': fft_shape,
+        'weights': np.zeros(shape, dtype=np.float64),
+        'density': np.zeros(shape, dtype=np.float64),
+        'pending': [],
+        'incident_ids': set(),
+        'stats': {'rebuilds': 0, 'incremental_updates': 0, 'last_update_ms': 0.0}
+    }
+
+def _fft_size(n):
+    """Smallest 2^a * 3^b * 5^c >= n, which numpy's FFT handles quickly"""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            size = p35
+            while size < n:
+                size *= 2
+            best = min(best, size)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+def _grid_cell(surface, lat, lon):
+    """(row, col) of a point with row 0 at the north edge, None outside the grid"""
+    south, west, north, east = surface['bounds']
+    if not (south <= lat < north and west <= lon < east):
+        return None
+    return int((north - lat) / surface['cell_deg']), int((lon - west) / surface['cell_deg'])
+
+def add_incidents_to_risk_surface(surface, incidents):
+    """Accumulate new incidents; the density is brought up to date by risk_surface_density"""
+    for incident in incidents:
+        incident_id = incident.get('id')
+        lat, lon = incident.get('latitude'), incident.get('longitude')
+        if not lat or not lon or incident_id in surface['incident_ids']:
+            continue
+        surface['incident_ids'].add(incident_id)
+        cell = _grid_cell(surface, lat, lon)
+        if cell is not None:
+            surface['pending'].append(cell + (incident_risk_weight(incident),))
+    return surface
+
+def sync_risk_surface(surface, incidents):
+    """Add incidents not yet on the surface; rebuild if any were removed"""
+    mappable = [inc for inc in incidents if inc.get('latitude') and inc.get('longitude')]
+    if len(surface['incident_ids']) > len(mappable):
+        surface.update(create_risk_surface(surface['bounds'], surface['cell_deg'], surface['bandwidth_km']))
+    return add_incidents_to_risk_surface(surface, mappable)
+
+def _rebuild_density(surface):
+    """Full FFT convolution of the weight grid with the kernel"""
+    weights, kernel = surface['weights'], surface['kernel']
+    full = np.fft.irfft2(np.fft.rfft2(weights, surface['fft_shape']) * surface['kernel_fft'], surface['fft_shape'])
+    half_rows, half_cols = kernel.shape[0] // 2, kernel.shape[1] // 2
+    density = full[half_rows:half_rows + weights.shape[0], half_cols:half_cols + weights.shape[1]]
+    surface['density'] = np.maximum(density, 0.0)   # FFT round-off leaves tiny negatives
+    surface['stats']['rebuilds'] += 1
+
+def _add_kernel_patches(surface, pending):
+    """Add each new incident's kernel directly, clipped at the grid edges"""
+    density, kernel = surface['density'], surface['kernel']
+    half_rows, half_cols = kernel.shape[0] // 2, kernel.shape[1] // 2
+    rows, cols = density.shape
+    for row, col, weight in pending:
+        r0, r1 = max(row - half_rows, 0), min(row + half_rows + 1, rows)
+        c0, c1 = max(col - half_cols, 0), min(col + half_cols + 1, cols)
+        density[r0:r1, c0:c1] += weight * kernel[r0 - row + half_rows:r1 - row + half_rows,
+                                                 c0 - col + half_cols:c1 - col + half_cols]
+    surface['stats']['incremental_updates'] += 1
+
+def risk_surface_density(surface):
+    """Current density grid, folding in any pending incidents"""
+    pending = surface['pending']
+    if pending:
+        start = time.perf_counter()
+        rows, cols, weights = zip(*pending)
+        np.add.at(surface['weights'], (np.array(rows), np.array(cols)), np.array(weights))
+        if len(pending) > RISK_INCREMENTAL_MAX:
+            _rebuild_density(surface)
+        else:
+            _add_kernel_patches(surface, pending)
+        surface['pending'] = []
+        surface['stats']['last_update_ms'] = (time.perf_counter() - start) * 1000
+    return surface['density']
+
+def risk_surface_to_rgba(density):
+    """Yellow-to-red heat colors, alpha rising with density
+
+    The color scale tops out at the 99th percentile of occupied cells so a
+    single dense hotspot does not wash out the rest of the map.
+    """
+    occupied = density[density > 0]
+    scale = np.percentile(occupied, 99) if occupied.size else 1.0
+    level = np.clip(density / scale, 0.0, 1.0)
+
+    rgba = np.zeros(density.shape + (4,), dtype=np.uint8)
+    rgba[:, :, 0] = 255
+    rgba[:, :, 1] = (220 * (1 - level)).astype(np.uint8)
+    rgba[:, :, 2] = 0
+    rgba[:, :, 3] = np.where(level >= RISK_MIN_DISPLAY, 60 + 170 * level, 0).astype(np.uint8)
+    return rgba
+
+def add_risk_surface_overlay(m, surface, opacity=0.6):
+    """Risk surface as a single image overlay"""
+    density = risk_surface_density(surface)
+    if not density.any():
+        return m
+
+    south, west, north, east = surface['bounds']
+    folium.raster_layers.ImageOverlay(
+        image=risk_surface_to_rgba(density),
+        bounds=[[south, west], [north, east]],
+        opacity=opacity,
+        mercator_project=True,
+        name="Risk Surface"
+    ).add_to(m)
+    return m
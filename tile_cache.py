@@ -0,0 +1,302 @@
+import os
+import math
+import sqlite3
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import folium
+from branca.element import MacroElement
+from jinja2 import Template
+
+# Offline basemap tiles
+# Tiles are stored in an MBTiles (SQLite) file, pre-seeded for India and a
+# buffer around its coastline, and served by a small HTTP server started
+# once per process. Missing tiles inside India at the seeded zooms are
+# fetched upstream and stored when the network is up (nothing else is
+# proxied, so the server cannot be used for bulk downloads); the map falls
+# back to the public tiles if the local server cannot be reached.
+
+TILE_CACHE_PATH = os.environ.get('HARBINGER_TILE_CACHE', os.path.join('tiles', 'india_coast.mbtiles'))
+TILE_SERVER_HOST = os.environ.get('HARBINGER_TILE_HOST', '127.0.0.1')
+TILE_SERVER_PORT = int(os.environ.get('HARBINGER_TILE_PORT', '8765'))
+# URL the browser uses to reach the tile server; set this when the app is not viewed on the host itself
+TILE_PUBLIC_URL = os.environ.get('HARBINGER_TILE_PUBLIC_URL', f"http://localhost:{TILE_SERVER_PORT}/tiles/{{z}}/{{x}}/{{y}}.png")
+TILE_READ_THROUGH = os.environ.get('HARBINGER_TILE_READ_THROUGH', '1') == '1'
+
+UPSTREAM_TILE_URL = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+UPSTREAM_TIMEOUT = 3
+TILE_USER_AGENT = "Harbinger-Disaster-Management/1.0 (offline tile cache)"
+OSM_ATTRIBUTION = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+
+INDIA_BBOX = (6.5, 68.0, 35.5, 97.5)   # south, west, north, east
+DEFAULT_SEED_ZOOMS = range(4, 12)
+FULL_COUNTRY_MAX_ZOOM = 7              # zooms up to this are seeded for the whole country
+DEFAULT_COAST_BUFFER_KM = 25
+
+# Mainland coastline from the Rann of Kutch to the Sundarbans, plus island groups
+INDIA_COASTLINE = [
+    (23.70, 68.20), (22.80, 69.00), (22.40, 69.10), (21.60, 69.60), (20.90, 70.40), (20.70, 71.00),
+    (21.70, 72.20), (21.20, 72.80), (20.40, 72.80), (19.00, 72.80), (17.00, 73.30), (15.50, 73.80),
+    (14.80, 74.10), (12.90, 74.80), (11.25, 75.80), (9.95, 76.25), (8.90, 76.60), (8.50, 76.90),
+    (8.08, 77.55), (8.80, 78.15), (9.30, 79.30), (10.80, 79.85), (11.90, 79.83), (13.08, 80.29),
+    (14.40, 80.15), (16.17, 81.13), (16.95, 82.25), (17.70, 83.30), (18.30, 84.10), (19.26, 84.90),
+    (19.80, 85.83), (20.26, 86.67), (21.50, 87.00), (21.62, 87.50), (21.65, 88.05), (21.70, 88.90)
+]
+INDIA_ISLANDS = [
+    [(13.60, 92.90), (12.50, 92.80), (11.62, 92.73), (10.60, 92.55), (9.20, 92.80), (7.00, 93.80)],   # Andaman & Nicobar
+    [(11.20, 72.75), (10.57, 72.64), (8.30, 73.05)]                                                     # Lakshadweep
+]
+
+READ_THROUGH_ZOOMS = DEFAULT_SEED_ZOOMS
+
+_server_lock = threading.Lock()
+_server = None
+_server_error = None
+
+def lat_lon_to_tile(lat, lon, zoom):
+    """Slippy-map tile containing a point"""
+    n = 2 ** zoom
+    lat_rad = math.radians(max(min(lat, 85.0511), -85.0511))
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def bbox_tiles(zoom, bbox):
+    """All tiles covering (south, west, north, east)"""
+    south, west, north, east = bbox
+    x0, y0 = lat_lon_to_tile(north, west, zoom)
+    x1, y1 = lat_lon_to_tile(south, east, zoom)
+    return {(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)}
+
+def tile_in_bbox(zoom, x, y, bbox):
+    """Whether a tile overlaps (south, west, north, east)"""
+    south, west, north, east = bbox
+    x0, y0 = lat_lon_to_tile(north, west, zoom)
+    x1, y1 = lat_lon_to_tile(south, east, zoom)
+    return x0 <= x <= x1 and y0 <= y <= y1
+
+def coastline_tiles(zoom, buffer_km=DEFAULT_COAST_BUFFER_KM):
+    """Tiles within buffer_km of the coastline and island chains"""
+    buffer_lat = buffer_km / 111.0
+    tiles = set()
+    for line in [INDIA_COASTLINE] + INDIA_ISLANDS:
+        for (lat0, lon0), (lat1, lon1) in zip(line, line[1:]):
+            # Step at most half the buffer along each segment
+            steps = max(int(math.hypot(lat1 - lat0, lon1 - lon0) / (buffer_lat / 2)), 1)
+            for i in range(steps + 1):
+                lat = lat0 + (lat1 - lat0) * i / steps
+                lon = lon0 + (lon1 - lon0) * i / steps
+                buffer_lon = buffer_lat / math.cos(math.radians(lat))
+                tiles |= bbox_tiles(zoom, (lat - buffer_lat, lon - buffer_lon, lat + buffer_lat, lon + buffer_lon))
+    return tiles
+
+def tiles_to_seed(zooms=DEFAULT_SEED_ZOOMS, buffer_km=DEFAULT_COAST_BUFFER_KM):
+    """(z, x, y) for the whole country at low zooms and the coastal strip above that"""
+    for zoom in zooms:
+        tiles = bbox_tiles(zoom, INDIA_BBOX) if zoom <= FULL_COUNTRY_MAX_ZOOM else coastline_tiles(zoom, buffer_km)
+        for x, y in sorted(tiles):
+            yield zoom, x, y
+
+def open_mbtiles(path=None):
+    """Connection to an MBTiles file, creating the schema if needed"""
+    path = path or TILE_CACHE_PATH
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT, value TEXT)")
+    conn.execute("""CREATE TABLE IF NOT EXISTS tiles
+                    (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB)""")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row)")
+    if conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0] == 0:
+        conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+            ('name', 'India coastline basemap'), ('format', 'png'), ('type', 'baselayer'),
+            ('bounds', f"{INDIA_BBOX[1]},{INDIA_BBOX[0]},{INDIA_BBOX[3]},{INDIA_BBOX[2]}"),
+            ('attribution', OSM_ATTRIBUTION)
+        ])
+    conn.commit()
+    return conn
+
+def read_tile(conn, zoom, x, y):
+    """Tile bytes or None; MBTiles rows use the TMS (flipped) y axis"""
+    row = conn.execute("SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                       (zoom, x, 2 ** zoom - 1 - y)).fetchone()
+    return row[0] if row else None
+
+def write_tiles(conn, tiles):
+    """Store (z, x, y, data) tuples"""
+    conn.executemany("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)",
+                     [(z, x, 2 ** z - 1 - y, sqlite3.Binary(data)) for z, x, y, data in tiles])
+    conn.commit()
+
+def fetch_upstream_tile(zoom, x, y, source_url=UPSTREAM_TILE_URL, timeout=UPSTREAM_TIMEOUT):
+    """Download one tile, None on any failure"""
+    try:
+        response = requests.get(source_url.format(z=zoom, x=x, y=y), timeout=timeout,
+                                headers={'User-Agent': TILE_USER_AGENT})
+        if response.status_code == 200 and response.content:
+            return response.content
+    except requests.RequestException:
+        pass
+    return None
+
+def seed_tile_cache(path=None, zooms=DEFAULT_SEED_ZOOMS, buffer_km=DEFAULT_COAST_BUFFER_KM,
+                    source_url=UPSTREAM_TILE_URL, workers=2, progress_callback=None):
+    """Download missing tiles into the MBTiles file; returns (fetched, skipped, failed)
+
+    Bulk downloads from tile.openstreetmap.org are restricted by its usage
+    policy; point source_url at your own or a commercial tile server for
+    large seeds.
+    """
+    conn = open_mbtiles(path)
+    existing = set(conn.execute("SELECT zoom_level, tile_column, tile_row FROM tiles"))
+    missing = [(z, x, y) for z, x, y in tiles_to_seed(zooms, buffer_km) if (z, x, 2 ** z - 1 - y) not in existing]
+    skipped = sum(1 for _ in tiles_to_seed(zooms, buffer_km)) - len(missing)
+
+    fetched = failed = 0
+    pending = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (z, x, y), data in zip(missing, pool.map(lambda t: fetch_upstream_tile(*t, source_url=source_url), missing)):
+            if data is None:
+                failed += 1
+            else:
+                pending.append((z, x, y, data))
+                fetched += 1
+            if len(pending) >= 200:
+                write_tiles(conn, pending)
+                pending = []
+            if progress_callback:
+                progress_callback(fetched + failed, len(missing))
+    if pending:
+        write_tiles(conn, pending)
+    conn.close()
+    return fetched, skipped, failed
+
+class _TileRequestHandler(BaseHTTPRequestHandler):
+    """GET /tiles/{z}/{x}/{y}.png from the MBTiles file"""
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        try:
+            assert parts[0] == 'tiles' and len(parts) == 4
+            zoom, x, y = int(parts[1]), int(parts[2]), int(parts[3].split('.')[0])
+        except (AssertionError, ValueError):
+            self.send_error(404)
+            return
+
+        # One connection per server; each request runs on its own thread
+        with self.server.mbtiles_lock:
+            data = read_tile(self.server.mbtiles, zoom, x, y)
+        if data is None and TILE_READ_THROUGH and zoom in READ_THROUGH_ZOOMS and tile_in_bbox(zoom, x, y, INDIA_BBOX):
+            data = fetch_upstream_tile(zoom, x, y)
+            if data is not None:
+                with self.server.mbtiles_lock:
+                    write_tiles(self.server.mbtiles, [(zoom, x, y, data)])
+
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'public, max-age=86400')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_tile_server(path=None, host=TILE_SERVER_HOST, port=TILE_SERVER_PORT):
+    """Start the local tile server once per process; False if it cannot bind"""
+    global _server, _server_error
+    with _server_lock:
+        if _server is None and _server_error is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _TileRequestHandler)
+                _server.daemon_threads = True
+                _server.mbtiles = open_mbtiles(path)
+                _server.mbtiles_lock = threading.Lock()
+                threading.Thread(target=_server.serve_forever, name="tile-server", daemon=True).start()
+            except OSError as e:
+                _server_error = str(e)
+        return _server is not None
+
+def get_tile_server_status():
+    """Whether local tiles are in use, and why not"""
+    if not os.path.exists(TILE_CACHE_PATH):
+        return {'active': False, 'reason': f"No tile cache at {TILE_CACHE_PATH} (run: python tile_cache.py seed)"}
+    if not start_tile_server():
+        return {'active': False, 'reason': f"Tile server failed to start: {_server_error}"}
+    return {'active': True, 'reason': None, 'url': TILE_PUBLIC_URL}
+
+def add_basemap(m):
+    """Offline tiles when a seeded cache exists, public OpenStreetMap otherwise
+
+    Tiles the local server cannot provide are retried from the public
+    servers in the browser.
+    """
+    if not get_tile_server_status()['active']:
+        folium.TileLayer('OpenStreetMap').add_to(m)
+        return m
+
+    tile_layer = folium.TileLayer(tiles=TILE_PUBLIC_URL, attr=OSM_ATTRIBUTION + " (offline cache)",
+                                  name="OpenStreetMap (offline cache)", max_zoom=19)
+    fallback = MacroElement()
+    fallback._template = Template("""
+        {% macro script(this, kwargs) %}
+            {{ this._parent.get_name() }}.on('tileerror', function(e) {
+                if (!e.tile.dataset.fallback) {
+                    e.tile.dataset.fallback = 1;
+                    e.tile.src = L.Util.template({{ this.fallback_url|tojson }}, e.coords);
+                }
+            });
+        {% endmacro %}
+    """)
+    fallback.fallback_url = UPSTREAM_TILE_URL
+    tile_layer.add_child(fallback)
+    tile_layer.add_to(m)
+    return m
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline basemap tile cache for India's coastline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed = subparsers.add_parser("seed", help="Download tiles into the MBTiles file")
+    seed.add_argument("--min-zoom", type=int, default=DEFAULT_SEED_ZOOMS.start)
+    seed.add_argument("--max-zoom", type=int, default=DEFAULT_SEED_ZOOMS.stop - 1)
+    seed.add_argument("--coast-buffer-km", type=float, default=DEFAULT_COAST_BUFFER_KM)
+    seed.add_argument("--source", default=UPSTREAM_TILE_URL, help="Tile URL template to seed from")
+    seed.add_argument("--workers", type=int, default=2)
+    seed.add_argument("--dry-run", action="store_true", help="Only count the tiles that would be seeded")
+
+    serve = subparsers.add_parser("serve", help="Run the tile server in the foreground")
+    serve.add_argument("--port", type=int, default=TILE_SERVER_PORT)
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        zooms = range(args.min_zoom, args.max_zoom + 1)
+        if args.dry_run:
+            for zoom in zooms:
+                count = sum(1 for z, _, _ in tiles_to_seed([zoom], args.coast_buffer_km))
+                print(f"zoom {zoom}: {count} tiles")
+            sys.exit(0)
+
+        def report(done, total):
+            if done % 100 == 0 or done == total:
+                print(f"{done}/{total} tiles", file=sys.stderr)
+
+        fetched, skipped, failed = seed_tile_cache(zooms=zooms, buffer_km=args.coast_buffer_km,
+                                                   source_url=args.source, workers=args.workers,
+                                                   progress_callback=report)
+        print(f"Fetched {fetched}, already cached {skipped}, failed {failed} -> {TILE_CACHE_PATH}")
+    else:
+        if not start_tile_server(port=args.port):
+            print(f"Tile server failed to start: {_server_error}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Serving {TILE_CACHE_PATH} on port {args.port}")
+        threading.Event().wait()
@@ -0,0 +1,235 @@
+import os
+import time
+import numpy as np
+import folium
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from PIL import Image
+from ai_analysis import extract_classification_features
+from feature_store import FEATURE_VECTOR_DTYPE, CLASSIFICATION_FEATURES, CLASS_ORDER, classification_confidences
+try:
+    import rasterio
+    from rasterio.windows import Window
+    from rasterio.warp import transform_bounds
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+# Tiled analysis for drone mosaics and satellite scenes
+# The image is read one window at a time (memory map for .npy/.ppm, windowed
+# reads for GeoTIFF via rasterio), features are extracted per tile on a thread
+# pool with a bounded number of tiles in flight, and the existing rules are
+# applied to all tiles at once to produce a per-tile hazard grid.
+
+DEFAULT_TILE_SIZE = 512
+DEFAULT_TILE_WORKERS = 4
+
+# Hazard layers offered for map overlays, mapped to classifier classes
+HAZARD_LAYERS = {
+    '🌊 Flood Extent': 'Flood',
+    '🔥 Burn Scar / Active Fire': 'Fire/Wildfire',
+    '⛰️ Landslide': 'Landslide',
+    '🌪️ Storm Damage': 'Cyclone/Storm',
+    '🌊 Coastal Surge': 'Coastal Surge'
+}
+
+HAZARD_COLORS = {
+    'Flood': (30, 144, 255),
+    'Fire/Wildfire': (255, 69, 0),
+    'Landslide': (139, 69, 19),
+    'Cyclone/Storm': (128, 0, 128),
+    'Coastal Surge': (75, 0, 130)
+}
+
+def _to_rgb_uint8(tile, value_scale=None):
+    """Normalise a raster window to an RGB uint8 array"""
+    if tile.ndim == 2:
+        tile = np.repeat(tile[:, :, None], 3, axis=2)
+    tile = tile[:, :, :3]
+    if value_scale is None and tile.dtype != np.uint8:
+        value_scale = np.iinfo(tile.dtype).max if np.issubdtype(tile.dtype, np.integer) else 1.0
+    if value_scale is not None and not (tile.dtype == np.uint8 and value_scale == 255):
+        tile = np.clip(tile.astype(np.float32) * (255.0 / value_scale), 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(tile)
+
+def _read_ppm_header(path):
+    """Width, height, maxval and data offset of a binary P6 PPM"""
+    with open(path, 'rb') as f:
+        header = f.read(512)
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while header[pos:pos + 1].isspace():
+            pos += 1
+        if header[pos:pos + 1] == b'#':
+            pos = header.index(b'\n', pos) + 1
+            continue
+        end = pos
+        while not header[end:end + 1].isspace():
+            end += 1
+        fields.append(header[pos:end])
+        pos = end
+    if fields[0] != b'P6':
+        raise ValueError("Only binary P6 PPM files can be memory-mapped")
+    return int(fields[1]), int(fields[2]), int(fields[3]), pos + 1
+
+def open_tiled_source(path):
+    """Open a large image for windowed reads
+
+    Returns (height, width, read_window, geographic bounds or None, close,
+    value scale or None). The value scale is the raw value that maps to 255
+    when the format declares one (a PPM's maxval).
+    """
+    lower = path.lower()
+
+    if lower.endswith('.npy'):
+        data = np.load(path, mmap_mode='r')
+        return data.shape[0], data.shape[1], lambda y, x, h, w: data[y:y + h, x:x + w], None, lambda: None, None
+
+    if lower.endswith('.ppm'):
+        width, height, maxval, offset = _read_ppm_header(path)
+        dtype = np.uint8 if maxval < 256 else np.dtype('>u2')
+        data = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(height, width, 3))
+        return height, width, lambda y, x, h, w: data[y:y + h, x:x + w], None, lambda: None, maxval
+
+    if RASTERIO_AVAILABLE and lower.endswith(('.tif', '.tiff', '.jp2', '.img', '.vrt')):
+        dataset = rasterio.open(path)
+        bands = [1, 2, 3] if dataset.count >= 3 else [1]
+
+        def read_window(y, x, h, w):
+            return np.moveaxis(dataset.read(bands, window=Window(x, y, w, h)), 0, -1)
+
+        bounds = None
+        if dataset.crs is not None:
+            west, south, east, north = transform_bounds(dataset.crs, 'EPSG:4326', *dataset.bounds)
+            bounds = [[south, west], [north, east]]
+        return dataset.height, dataset.width, read_window, bounds, dataset.close, None
+
+    # Fallback: PIL decodes the whole image, memory is not bounded here
+    Image.MAX_IMAGE_PIXELS = None
+    data = np.asarray(Image.open(path).convert('RGB'))
+    return data.shape[0], data.shape[1], lambda y, x, h, w: data[y:y + h, x:x + w], None, lambda: None, None
+
+def _tile_features(tile):
+    """Classification features for one tile, None for empty (nodata) tiles"""
+    if tile.size == 0 or not tile.any():
+        return None
+    return extract_classification_features(tile)
+
+def analyze_large_image_tiled(path, tile_size=DEFAULT_TILE_SIZE, workers=DEFAULT_TILE_WORKERS,
+                              value_scale=None, thresholds=None, progress_callback=None):
+    """Per-tile hazard grid for an image of any size with bounded memory"""
+    start = time.perf_counter()
+    height, width, read_window, bounds, close, source_scale = open_tiled_source(path)
+    if value_scale is None:
+        value_scale = source_scale
+
+    rows = (height + tile_size - 1) // tile_size
+    cols = (width + tile_size - 1) // tile_size
+    vectors = np.zeros(rows * cols, dtype=FEATURE_VECTOR_DTYPE)
+    valid = np.zeros(rows * cols, dtype=bool)
+
+    tiles = ((r, c) for r in range(rows) for c in range(cols))
+    max_in_flight = workers * 2
+    completed = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+
+            def submit_next_tile():
+                for r, c in tiles:
+                    y, x = r * tile_size, c * tile_size
+                    tile = _to_rgb_uint8(np.asarray(read_window(y, x, min(tile_size, height - y), min(tile_size, width - x))), value_scale)
+                    in_flight[pool.submit(_tile_features, tile)] = r * cols + c
+                    return True
+                return False
+
+            while len(in_flight) < max_in_flight and submit_next_tile():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    features = future.result()
+                    if features is not None:
+                        valid[index] = True
+                        for name in CLASSIFICATION_FEATURES:
+                            vectors['cls_' + name][index] = features[name]
+                    completed += 1
+                    submit_next_tile()
+
+                if progress_callback:
+                    progress_callback(completed, rows * cols)
+    finally:
+        close()
+
+    conf, rank = classification_confidences(vectors, thresholds)
+    conf[~valid] = np.nan
+
+    hazard_grids = {name: conf[:, i].reshape(rows, cols) for i, name in enumerate(CLASS_ORDER)}
+
+    # Dominant class per tile (index into CLASS_ORDER, -1 for none), ties as in the scalar classifier
+    any_class = ~np.all(np.isnan(conf), axis=1)
+    best = np.full(rows * cols, np.inf)
+    best[any_class] = np.nanmax(conf[any_class], axis=1)
+    dominant = np.argmin(np.where(conf == best[:, None], rank, np.inf), axis=1)
+    dominant[~any_class] = -1
+
+    return {
+        'path': path,
+        'image_size': (height, width),
+        'tile_size': tile_size,
+        'grid_shape': (rows, cols),
+        'hazard_grids': hazard_grids,
+        'dominant_class': dominant.reshape(rows, cols),
+        'bounds': bounds,
+        'seconds': time.perf_counter() - start
+    }
+
+def hazard_grid_to_rgba(grid, hazard_class):
+    """Color a confidence grid for map overlay, alpha proportional to confidence"""
+    color = HAZARD_COLORS.get(hazard_class, (255, 0, 0))
+    confidence = np.nan_to_num(grid, nan=0.0)
+    rgba = np.zeros(grid.shape + (4,), dtype=np.uint8)
+    rgba[:, :, :3] = color
+    rgba[:, :, 3] = np.clip(confidence / 95 * 200, 0, 200).astype(np.uint8)
+    return rgba
+
+def add_hazard_grid_overlay(m, tiled_result, hazard_class, bounds=None, opacity=0.7):
+    """Overlay one hazard layer of a tiled analysis on a folium map"""
+    bounds = bounds or tiled_result['bounds']
+    if not bounds:
+        return m
+
+    folium.raster_layers.ImageOverlay(
+        image=hazard_grid_to_rgba(tiled_result['hazard_grids'][hazard_class], hazard_class),
+        bounds=bounds,
+        opacity=opacity,
+        mercator_project=True,
+        name=f"{hazard_class} - {os.path.basename(tiled_result['path'])}"
+    ).add_to(m)
+    return m
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tiled hazard analysis of large drone or satellite imagery")
+    parser.add_argument("path", help="Image file (.npy, .ppm, GeoTIFF with rasterio, or any PIL format)")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_TILE_WORKERS)
+    parser.add_argument("--value-scale", type=float, default=None, help="Raw value mapped to 255 for non-8-bit rasters")
+    parser.add_argument("--out", help="Write the hazard grids to this .npz file")
+    args = parser.parse_args()
+
+    result = analyze_large_image_tiled(args.path, args.tile_size, args.workers, args.value_scale)
+    rows, cols = result['grid_shape']
+    print(f"Analyzed {rows * cols} tiles of {result['image_size'][1]}x{result['image_size'][0]} px in {result['seconds']:.1f}s")
+    for hazard_class, grid in result['hazard_grids'].items():
+        flagged = int(np.sum(~np.isnan(grid)))
+        if flagged:
+            print(f"  {hazard_class}: {flagged} tiles ({flagged / (rows * cols) * 100:.1f}%)")
+
+    if args.out:
+        np.savez_compressed(args.out, dominant_class=result['dominant_class'],
+                            **{name.replace('/', '_'): grid for name, grid in result['hazard_grids'].items()})
@@ -6,114 +6,88 @@ import time
 from datetime import datetime, timedelta
 from config_and_database import *
 from ai_analysis import *
+from analysis_jobs import *
+from feature_store import *
+from tiled_analysis import *
+from map_clustering import *
+from map_layers import *
+from map_render_cache import *
+from tile_cache import *
+from risk_surface import *
+from incident_queues import *
+from incident_store import *
+from incident_query import *
+from incident_analytics import *
+from analytics_export import *
+from incident_export import *
+from incident_import import *
+from volunteer_matching import *
+
+OCEAN_WARNINGS_REFRESH_SECONDS = 300
 
 # Enhanced map creation with ocean focus
-def create_enhanced_india_map(incidents, center_lat=20.5937, center_lon=78.9629):
-    """Enhanced map with ocean hazard visualization"""
+def incident_detail_html(incident):
+    """Full incident detail card, rendered when an incident is clicked"""
+    color = INCIDENT_COLOR_MAP.get(incident.get('disaster_type', 'Other'), 'gray')
+
+    # Enhanced detail card with ocean hazard info
+    popup_html = f"""
+    <div style="max-width: 400px; font-family: Poppins, sans-serif;">
+        <h3 style="color: {color}; margin-bottom: 10px;">
+            {'🌊' if 'Surge' in incident['disaster_type'] or 'Tsunami' in incident['disaster_type'] else '🚨'} 
+            {incident['disaster_type']}
+        </h3>
+        <div style="background: #f8f9fa; padding: 10px; border-radius: 8px; margin-bottom: 10px;">
+            <p><strong>📍 Location:</strong> {incident['location']}</p>
+            <p><strong>⚠️ Severity:</strong> <span style="color: {'red' if incident['severity'] == 'Critical' else 'orange' if incident['severity'] == 'High' else 'blue'};">{incident['severity']}</span></p>
+            <p><strong>🕒 Reported:</strong> {incident['timestamp']}</p>
+            <p><strong>👤 Reporter:</strong> {incident.get('username', 'Anonymous')}</p>
+        </div>
+        <div style="background: {'#d4edda' if incident.get('verified') else '#fff3cd'}; padding: 10px; border-radius: 8px; margin-bottom: 10px;">
+            <p><strong>✅ Status:</strong> {'✓ Verified' if incident.get('verified') else '⏳ Pending Verification'}</p>
+            <p><strong>🎯 Priority:</strong> {incident.get('priority_score', 'N/A')}/100</p>
+            {'<p><strong>🤝 Assigned:</strong> ' + incident.get('assigned_volunteer', 'Unassigned') + '</p>' if incident.get('volunteer_assigned') else '<p><strong>🤝 Status:</strong> Awaiting Volunteer</p>'}
+        </div>
+        <div style="background: #e3f2fd; padding: 10px; border-radius: 8px;">
+            <p><strong>📝 Description:</strong> {incident['description'][:120]}...</p>
+            {'<p><strong>🤖 AI Score:</strong> ' + str(round(incident.get('authenticity_score', 0), 1)) + '%</p>' if incident.get('authenticity_score') else ''}
+            {'<p><strong>🌊 Ocean Level:</strong> ' + str(incident.get('ocean_hazard_level', 0)) + '/3</p>' if incident.get('ocean_hazard_level', 0) > 0 else ''}
+        </div>
+    </div>
+    """
+    return popup_html
+
+def create_enhanced_india_map(incidents, center_lat=20.5937, center_lon=78.9629, hazard_overlays=None,
+                              zoom=5, bounds=None, cluster_index=None, ocean_warnings=None, risk_surface=None):
+    """Enhanced map with ocean hazard visualization
+
+    With a cluster_index, incidents are drawn as server-side clusters below
+    street-level zoom. A risk_surface is drawn as a kernel-density overlay.
+    """
     m = folium.Map(
         location=[center_lat, center_lon], 
-        zoom_start=5,
-        tiles='OpenStreetMap',
-        attr='Enhanced Harbinger Ocean & Disaster Management'
+        zoom_start=zoom,
+        tiles=None
     )
+    add_basemap(m)
+
+    if risk_surface is not None:
+        add_risk_surface_overlay(m, risk_surface)
 
-    # Enhanced color mapping with ocean hazards
-    color_map = {
-        'Tsunami': 'red',
-        'Coastal Surge': 'purple', 
-        'Storm Surge': 'darkred',
-        'Harmful Algal Bloom': 'green',
-        'Fire/Wildfire': 'orange',
-        'Flood': 'blue',
-        'Earthquake/Building Collapse': 'black',
-        'Cyclone/Storm': 'purple',
-        'Landslide': 'brown',
-        'Natural Disaster': 'gray',
-        'Other': 'gray'
-    }
-
-    # Enhanced marker icons for ocean hazards
-    icon_map = {
-        'Tsunami': 'warning',
-        'Coastal Surge': 'tint',
-        'Storm Surge': 'cloud',
-        'Harmful Algal Bloom': 'leaf',
-        'Fire/Wildfire': 'fire',
-        'Flood': 'tint',
-        'Earthquake/Building Collapse': 'home',
-        'Cyclone/Storm': 'cloud',
-        'Landslide': 'mountain'
-    }
+    if cluster_index is None:
+        clusters, markers = [], incidents
+    else:
+        clusters, markers = get_map_clusters(cluster_index, zoom, bounds)
+
+    for cluster in clusters:
+        add_cluster_marker(m, cluster)
 
     # Add incidents with enhanced visualization
-    for incident in incidents:
-        if incident.get('latitude') and incident.get('longitude'):
-            color = color_map.get(incident.get('disaster_type', 'Other'), 'gray')
-            icon = icon_map.get(incident.get('disaster_type', 'Other'), 'exclamation-triangle')
-
-            # Enhanced popup with ocean hazard info
-            popup_html = f"""
-            <div style="width: 350px; font-family: Poppins, sans-serif;">
-                <h3 style="color: {color}; margin-bottom: 10px;">
-                    {'🌊' if 'Surge' in incident['disaster_type'] or 'Tsunami' in incident['disaster_type'] else '🚨'} 
-                    {incident['disaster_type']}
-                </h3>
-                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px; margin-bottom: 10px;">
-                    <p><strong>📍 Location:</strong> {incident['location']}</p>
-                    <p><strong>⚠️ Severity:</strong> <span style="color: {'red' if incident['severity'] == 'Critical' else 'orange' if incident['severity'] == 'High' else 'blue'};">{incident['severity']}</span></p>
-                    <p><strong>🕒 Reported:</strong> {incident['timestamp']}</p>
-                    <p><strong>👤 Reporter:</strong> {incident.get('username', 'Anonymous')}</p>
-                </div>
-                <div style="background: {'#d4edda' if incident.get('verified') else '#fff3cd'}; padding: 10px; border-radius: 8px; margin-bottom: 10px;">
-                    <p><strong>✅ Status:</strong> {'✓ Verified' if incident.get('verified') else '⏳ Pending Verification'}</p>
-                    <p><strong>🎯 Priority:</strong> {incident.get('priority_score', 'N/A')}/100</p>
-                    {'<p><strong>🤝 Assigned:</strong> ' + incident.get('assigned_volunteer', 'Unassigned') + '</p>' if incident.get('volunteer_assigned') else '<p><strong>🤝 Status:</strong> Awaiting Volunteer</p>'}
-                </div>
-                <div style="background: #e3f2fd; padding: 10px; border-radius: 8px;">
-                    <p><strong>📝 Description:</strong> {incident['description'][:120]}...</p>
-                    {'<p><strong>🤖 AI Score:</strong> ' + str(round(incident.get('authenticity_score', 0), 1)) + '%</p>' if incident.get('authenticity_score') else ''}
-                    {'<p><strong>🌊 Ocean Level:</strong> ' + str(incident.get('ocean_hazard_level', 0)) + '/3</p>' if incident.get('ocean_hazard_level', 0) > 0 else ''}
-                </div>
-            </div>
-            """
-
-            # Enhanced marker sizing based on priority
-            priority_score = incident.get('priority_score', 50)
-            if priority_score > 80:
-                marker_size = 25
-                popup_width = 400
-            elif priority_score > 60:
-                marker_size = 20
-                popup_width = 350
-            else:
-                marker_size = 15
-                popup_width = 300
-
-            # Add enhanced marker
-            folium.Marker(
-                location=[incident['latitude'], incident['longitude']],
-                popup=folium.Popup(popup_html, max_width=popup_width),
-                icon=folium.Icon(
-                    color=color, 
-                    icon=icon,
-                    prefix='fa'
-                )
-            ).add_to(m)
-
-            # Enhanced risk zone visualization for high priority/ocean incidents
-            if priority_score > 70 or incident.get('ocean_hazard_level', 0) > 1:
-                folium.CircleMarker(
-                    location=[incident['latitude'], incident['longitude']],
-                    radius=marker_size,
-                    popup=f"Enhanced Risk Zone - {incident['disaster_type']}",
-                    color=color,
-                    fillColor=color,
-                    fillOpacity=0.4,
-                    weight=3
-                ).add_to(m)
+    add_incident_geojson_layer(m, markers)
 
     # Add ocean warning zones
-    ocean_warnings = generate_ocean_warnings()
+    if ocean_warnings is None:
+        ocean_warnings = generate_ocean_warnings()
     for warning in ocean_warnings:
         folium.CircleMarker(
             location=[warning['lat'], warning['lon']],
@@ -126,6 +100,10 @@ def create_enhanced_india_map(incidents, center_lat=20.5937, center_lon=78.9629)
             dashArray='10,5'
         ).add_to(m)
 
+    # Tiled drone/satellite hazard grids
+    for tiled_result, hazard_class, bounds, opacity in hazard_overlays or []:
+        add_hazard_grid_overlay(m, tiled_result, hazard_class, bounds, opacity)
+
     return m
 
 def show_enhanced_authentication():
@@ -314,6 +292,18 @@ def show_enhanced_authentication():
         </div>
         """, unsafe_allow_html=True)
 
+@st.fragment(run_every=0.5)
+def show_analysis_job_progress(image_bytes, job_id, extension=None):
+    """Poll a background analysis job and show its real stage progress"""
+    job = get_analysis_job(job_id) or submit_analysis_job(image_bytes, job_id, extension)
+
+    with st.spinner("🤖 Enhanced AI Analysis Pipeline..."):
+        st.progress(job['progress'])
+        st.markdown(f"**{job['stage']}**")
+
+    if job['status'] in ('done', 'failed'):
+        st.rerun()
+
 def show_enhanced_incident_reporting():
     """Enhanced incident reporting with ocean hazard detection"""
     st.header("📤 Enhanced Incident Reporting System")
@@ -351,95 +341,81 @@ def show_enhanced_incident_reporting():
         st.subheader("📷 Enhanced Evidence Upload")
 
         # Enhanced file uploader
-        st.markdown("""
+        upload_types = ['jpg', 'jpeg', 'png'] + list(VIDEO_EXTENSIONS)
+        st.markdown(f"""
         <div class="upload-box">
             <h3>📸 Advanced Evidence Upload</h3>
             <p>Upload images with automatic ocean hazard detection and enhanced AI analysis</p>
-            <small>✨ Supports: JPG, JPEG, PNG • Enhanced processing • Ocean-focused analysis</small>
+            <small>✨ Supports: {', '.join(ext.upper() for ext in upload_types)} • Enhanced processing • Ocean-focused analysis</small>
         </div>
         """, unsafe_allow_html=True)
 
         uploaded_file = st.file_uploader(
             "Upload incident evidence",
-            type=['jpg', 'jpeg', 'png'],
+            type=upload_types,
             help="Enhanced system supports automatic ocean hazard detection and improved disaster classification"
         )
 
         if uploaded_file is not None:
             st.session_state.enhanced_report_step = max(st.session_state.enhanced_report_step, 2)
 
-            image = Image.open(uploaded_file)
-            st.image(image, caption="📸 Uploaded Evidence - Enhanced Analysis Ready", use_column_width=True)
-
-            # Enhanced analysis with beautiful progress
-            analysis_progress = st.progress(0)
-            analysis_status = st.empty()
-
-            with st.spinner("🤖 Enhanced AI Analysis Pipeline..."):
-                # Step 1: GPS Analysis
-                analysis_status.markdown("**🗺️ Enhanced GPS Extraction...**")
-                analysis_progress.progress(15)
-                time.sleep(0.5)
-                lat, lon = extract_gps_info(image)
-
-                # Step 2: Metadata Analysis
-                analysis_status.markdown("**📅 Advanced Metadata Analysis...**")
-                analysis_progress.progress(30)
-                time.sleep(0.5)
-                is_recent, metadata_msg, camera_info = check_image_metadata(image)
-
-                # Step 3: Enhanced Authenticity
-                analysis_status.markdown("**🔍 Enhanced Authenticity Verification...**")
-                analysis_progress.progress(50)
-                time.sleep(0.7)
-                is_authentic, auth_score, auth_msg = advanced_deepfake_detection(image)
-
-                # Step 4: Enhanced Classification
-                analysis_status.markdown("**🎯 Enhanced Disaster Classification...**")
-                analysis_progress.progress(70)
-                time.sleep(0.7)
-                disaster_type, confidence, class_msg = classify_disaster_enhanced(image)
-
-                # Step 5: Ocean Hazard Assessment
-                analysis_status.markdown("**🌊 Ocean Hazard Assessment...**")
-                analysis_progress.progress(90)
-                time.sleep(0.5)
-
-                # Determine ocean hazard level
-                ocean_hazard_level = 0
-                if disaster_type in ['Tsunami', 'Coastal Surge', 'Storm Surge', 'Harmful Algal Bloom']:
-                    if disaster_type == 'Tsunami':
-                        ocean_hazard_level = 3  # Critical
-                    elif disaster_type in ['Coastal Surge', 'Storm Surge']:
-                        ocean_hazard_level = 2  # High
-                    else:
-                        ocean_hazard_level = 1  # Medium
-
-                analysis_progress.progress(100)
-                analysis_status.markdown("**✅ Enhanced Analysis Complete!**")
-
-            st.session_state.enhanced_report_step = max(st.session_state.enhanced_report_step, 3)
+            image_bytes = uploaded_file.getvalue()
+            extension = uploaded_file.name.rsplit('.', 1)[-1].lower()
+            if extension in VIDEO_EXTENSIONS:
+                st.video(image_bytes)
+                st.caption("🎞️ Uploaded Video Evidence - analyzed scene by scene")
+            else:
+                image = Image.open(BytesIO(image_bytes))
+                st.image(image, caption="📸 Uploaded Evidence - Enhanced Analysis Ready", use_column_width=True)
+
+            # Analysis runs in the background job queue, keyed by upload hash,
+            # so reruns while the user types reuse the finished result
+            job_id = compute_upload_hash(image_bytes)
+            analysis_job = submit_analysis_job(image_bytes, job_id, extension)
+
+            if analysis_job['status'] not in ('done', 'failed'):
+                show_analysis_job_progress(image_bytes, job_id, extension)
+            elif analysis_job['status'] == 'failed':
+                st.error(f"❌ Enhanced analysis failed: {analysis_job['error']}")
+            else:
+                analysis = analysis_job['result']
+                lat, lon = analysis['lat'], analysis['lon']
+                is_recent, metadata_msg, camera_info = analysis['is_recent'], analysis['metadata_msg'], analysis['camera_info']
+                is_authentic, auth_score, auth_msg = analysis['is_authentic'], analysis['auth_score'], analysis['auth_msg']
+                disaster_type, confidence, class_msg = analysis['disaster_type'], analysis['confidence'], analysis['class_msg']
+                ocean_hazard_level = analysis['ocean_hazard_level']
+
+                st.session_state.enhanced_report_step = max(st.session_state.enhanced_report_step, 3)
+
+                # Display enhanced analysis results
+                st.markdown("""
+                <div class="ocean-card">
+                    <h3>🔍 Enhanced AI Analysis Results</h3>
+                    <p>Comprehensive analysis with ocean hazard specialization</p>
+                </div>
+                """, unsafe_allow_html=True)
 
-            # Display enhanced analysis results
-            st.markdown("""
-            <div class="ocean-card">
-                <h3>🔍 Enhanced AI Analysis Results</h3>
-                <p>Comprehensive analysis with ocean hazard specialization</p>
-            </div>
-            """, unsafe_allow_html=True)
+                # Show classification results
+                col_a, col_b = st.columns(2)
 
-            # Show classification results
-            col_a, col_b = st.columns(2)
+                with col_a:
+                    st.success(f"🎯 Disaster Type: {disaster_type}")
+                    st.info(f"🤖 AI Confidence: {confidence:.1f}%")
+                    st.info(f"🔍 Authenticity: {auth_score:.1f}%")
 
-            with col_a:
-                st.success(f"🎯 Disaster Type: {disaster_type}")
-                st.info(f"🤖 AI Confidence: {confidence:.1f}%")
-                st.info(f"🔍 Authenticity: {auth_score:.1f}%")
+                with col_b:
+                    st.info(f"📍 GPS Data: {'Available' if lat and lon else 'Manual entry needed'}")
+                    st.info(f"🌊 Ocean Hazard: Level {ocean_hazard_level}/3")
+                    st.info(f"📅 Image Timing: {metadata_msg}")
 
-            with col_b:
-                st.info(f"📍 GPS Data: {'Available' if lat and lon else 'Manual entry needed'}")
-                st.info(f"🌊 Ocean Hazard: Level {ocean_hazard_level}/3")
-                st.info(f"📅 Image Timing: {metadata_msg}")
+                if analysis.get('keyframes'):
+                    st.markdown(f"**🎞️ Scene breakdown:** {class_msg}")
+                    st.dataframe(pd.DataFrame([{
+                        'Time (s)': round(frame['timestamp'], 1),
+                        'Classification': frame['disaster_type'],
+                        'Confidence': f"{frame['confidence']:.0f}%",
+                        'Authenticity': f"{frame['auth_score']:.0f}%"
+                    } for frame in analysis['keyframes']]), hide_index=True)
 
     with col2:
         st.subheader("📝 Enhanced Incident Details")
@@ -531,7 +507,17 @@ def show_enhanced_incident_reporting():
                     'camera_info': camera_info if 'camera_info' in locals() else {}
                 }
 
+                # Keep the extracted features so tuned rules can be re-scored later
+                if 'analysis' in locals():
+                    enhanced_incident['image_hash'] = job_id
+                    append_feature_vectors(build_feature_vector(
+                        analysis['classification_features'], analysis['authenticity_features'],
+                        analysis['disaster_type'], analysis['confidence'], analysis['auth_score'],
+                        analysis['is_authentic'], enhanced_incident['id'], job_id
+                    ))
+
                 st.session_state.incidents.append(enhanced_incident)
+                bump_incidents_version(enhanced_incident)
                 log_user_action("ENHANCED_INCIDENT_REPORTED", f"Enhanced {selected_disaster} report: {manual_location}")
 
                 st.success("🚀 Enhanced Response System Activated!")
@@ -562,29 +548,30 @@ def show_enhanced_citizen_dashboard():
     """, unsafe_allow_html=True)
 
     # Enhanced user statistics
-    user_incidents = [inc for inc in st.session_state.incidents if inc.get('username') == st.session_state.username]
-    ocean_reports = sum(1 for inc in user_incidents if inc.get('ocean_hazard_level', 0) > 0)
+    store = get_incident_store()
+    user_mask = filter_incidents(store, username=st.session_state.username)
+    user_metrics = incident_metrics(store, user_mask)
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Reports Submitted", len(user_incidents))
+        st.metric("Reports Submitted", user_metrics['total'])
 
     with col2:
-        verified_count = sum(1 for inc in user_incidents if inc.get('verified', False))
-        st.metric("Verified Reports", verified_count)
+        st.metric("Verified Reports", user_metrics['verified'])
 
     with col3:
-        avg_priority = np.mean([inc.get('priority_score', 50) for inc in user_incidents]) if user_incidents else 0
-        st.metric("Avg Priority Score", f"{avg_priority:.0f}")
+        st.metric("Avg Priority Score", f"{user_metrics['avg_priority']:.0f}")
 
     with col4:
-        st.metric("Ocean Hazard Reports", ocean_reports, delta="🌊")
+        st.metric("Ocean Hazard Reports", user_metrics['ocean'], delta="🌊")
 
     # Show recent reports
-    if user_incidents:
+    if user_metrics['total']:
         st.subheader("📋 Your Recent Reports")
-        for incident in sorted(user_incidents, key=lambda x: x['timestamp'], reverse=True)[:3]:
+        user_rows = np.flatnonzero(user_mask)
+        recent_rows = user_rows[np.argsort(-incident_column(store, 'timestamp')[user_rows], kind='stable')[:3]]
+        for incident in (st.session_state.incidents[row] for row in recent_rows):
             with st.expander(f"{incident['disaster_type']} - {incident['location']}"):
                 col1, col2 = st.columns(2)
                 with col1:
@@ -608,7 +595,9 @@ def show_enhanced_volunteer_dashboard():
     col1, col2, col3, col4 = st.columns(4)
 
     # Simulate enhanced volunteer stats
-    missions_completed = 34 + len([inc for inc in st.session_state.incidents if inc.get('assigned_volunteer') == st.session_state.username])
+    store = get_incident_store()
+    mission_rows = np.flatnonzero(filter_incidents(store, assigned_volunteer=st.session_state.username))
+    missions_completed = 34 + len(mission_rows)
     ocean_missions = np.random.randint(8, 15)
 
     with col1:
@@ -626,8 +615,7 @@ def show_enhanced_volunteer_dashboard():
         st.metric("Avg Response Time", f"{response_time} min")
 
     # Enhanced active missions
-    assigned_missions = [inc for inc in st.session_state.incidents 
-                        if inc.get('assigned_volunteer') == st.session_state.username]
+    assigned_missions = [st.session_state.incidents[row] for row in mission_rows]
 
     if assigned_missions:
         st.subheader("📋 Your Active Missions")
@@ -656,35 +644,28 @@ def show_enhanced_official_dashboard():
     """, unsafe_allow_html=True)
 
     # Enhanced system-wide statistics
-    total_incidents = len(st.session_state.incidents)
-    verified_incidents = sum(1 for inc in st.session_state.incidents if inc.get('verified', False))
-    high_priority = sum(1 for inc in st.session_state.incidents if inc.get('priority_score', 0) > 70)
-    ocean_incidents = sum(1 for inc in st.session_state.incidents if inc.get('ocean_hazard_level', 0) > 0)
+    system_metrics = incident_metrics(get_incident_store())
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Total Incidents", total_incidents)
+        st.metric("Total Incidents", system_metrics['total'])
 
     with col2:
-        st.metric("Ocean Hazards", ocean_incidents, delta="🌊")
+        st.metric("Ocean Hazards", system_metrics['ocean'], delta="🌊")
 
     with col3:
-        st.metric("Verified Reports", verified_incidents)
+        st.metric("Verified Reports", system_metrics['verified'])
 
     with col4:
-        st.metric("High Priority", high_priority)
+        st.metric("High Priority", system_metrics['high_priority'])
 
     # Enhanced critical incidents
     if st.session_state.incidents:
         st.subheader("🚨 Priority Incident Queue")
 
-        # Enhanced sorting with ocean hazard weighting
-        priority_incidents = sorted(
-            [inc for inc in st.session_state.incidents if not inc.get('verified', False)],
-            key=lambda x: (x.get('ocean_hazard_level', 0) * 30 + x.get('priority_score', 0)), 
-            reverse=True
-        )[:3]
+        # Top of the verification queue, ranked with ocean hazard weighting
+        priority_incidents, _ = queue_page(get_incident_queue('verification'), page_size=3)
 
         for incident in priority_incidents:
             ocean_level = incident.get('ocean_hazard_level', 0)
@@ -716,16 +697,335 @@ def show_enhanced_official_dashboard():
                 
                 st.write(f"**Description:** {incident['description']}")
 
+        show_incident_query_panel()
+
+    show_partner_export_panel()
+    show_historical_import_panel()
+
+def show_incident_query_panel():
+    """Ad-hoc incident filters answered from the bitmap query index"""
+    index = get_incident_query_index()
+
+    with st.expander("🔎 Incident Query"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            disaster_types = st.multiselect("Type", list(indexed_values(index, 'disaster_type')), key="query_types")
+            severities = st.multiselect("Severity", [level for level in SEVERITY_ORDER_ASC
+                                                      if level in indexed_values(index, 'severity')],
+                                        key="query_severities")
+        with col2:
+            jurisdictions = st.multiselect("Jurisdiction", list(indexed_values(index, 'jurisdiction')),
+                                           key="query_jurisdictions")
+            verified = st.selectbox("Verification", ["Any", "Unverified", "Verified"], key="query_verified")
+        with col3:
+            assigned = st.selectbox("Assignment", ["Any", "Unassigned", "Assigned"], key="query_assigned")
+            min_ocean_level = st.slider("Min ocean level", 0, 3, 0, key="query_ocean_level")
+        hours = st.number_input("Reported in the last N hours (0 = any time)", 0, 24 * 30, 0, key="query_hours")
+
+        now = datetime.now()
+        since = (now - timedelta(hours=hours) - datetime(1970, 1, 1)).total_seconds() if hours else None
+        rows = query_incidents(
+            index,
+            since=since,
+            min_ocean_level=min_ocean_level or None,
+            disaster_type=disaster_types or None,
+            severity=severities or None,
+            jurisdiction=jurisdictions or None,
+            verified=None if verified == "Any" else verified == "Verified",
+            volunteer_assigned=None if assigned == "Any" else assigned == "Assigned"
+        )
+
+        st.write(f"**{len(rows)}** matching incidents")
+        if len(rows):
+            newest = rows[np.argsort(-index['timestamps'][rows], kind='stable')][:50]
+            incidents = st.session_state.incidents
+            st.dataframe(pd.DataFrame([{
+                'ID': incidents[row]['id'],
+                'Time': incidents[row].get('timestamp'),
+                'Type': incidents[row].get('disaster_type'),
+                'Severity': incidents[row].get('severity'),
+                'Jurisdiction': index['row_values']['jurisdiction'][row],
+                'Ocean': incidents[row].get('ocean_hazard_level', 0),
+                'Verified': incidents[row].get('verified', False),
+                'Assigned': incidents[row].get('volunteer_assigned', False)
+            } for row in newest]), hide_index=True)
+
+def show_partner_export_panel():
+    """Filtered incident downloads for partner agencies, streamed by the export server"""
+    with st.expander("📤 Partner Agency Export"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS), format_func=str.upper, key="export_format")
+            compress = st.checkbox("gzip", value=export_format != 'parquet', key="export_gzip")
+            sources = ["Session incidents"] + (["Incident database"] if os.path.exists(ANALYTICS_SOURCE_DB) else [])
+            source = st.radio("Source", sources, key="export_source")
+        with col2:
+            today = datetime.now().date()
+            date_range = st.date_input("Reported between", (today - timedelta(days=30), today), key="export_dates")
+            disaster_types = st.multiselect("Types", list(INCIDENT_COLOR_MAP), key="export_types")
+        with col3:
+            use_bbox = st.checkbox("Limit to bounding box", key="export_use_bbox")
+            south, north = st.slider("Latitude", 5.0, 37.0, (INDIA_BBOX[0], INDIA_BBOX[2]), key="export_lat",
+                                     disabled=not use_bbox)
+            west, east = st.slider("Longitude", 66.0, 98.0, (INDIA_BBOX[1], INDIA_BBOX[3]), key="export_lon",
+                                   disabled=not use_bbox)
+
+        filters = {
+            'since': f"{date_range[0]} 00:00:00" if len(date_range) > 0 else None,
+            'until': f"{date_range[-1]} 23:59:59" if len(date_range) > 0 else None,
+            'bbox': (south, west, north, east) if use_bbox else None,
+            'disaster_types': set(disaster_types) or None
+        }
+
+        if st.button("🔗 Create Download Link", use_container_width=True):
+            if source == "Session incidents":
+                incidents = st.session_state.incidents
+                rows_factory = lambda: iter_session_incidents(incidents, **filters)
+            else:
+                rows_factory = lambda: iter_db_incidents(ANALYTICS_SOURCE_DB, **filters)
+            try:
+                url = register_incident_export(rows_factory, export_format, compress)
+                st.success(f"✅ [Download {export_filename(export_format, compress)}]({url}) "
+                           f"(link valid for {EXPORT_LINK_TTL // 60} minutes)")
+            except RuntimeError as e:
+                st.error(f"❌ {e}")
+
+def show_historical_import_panel():
+    """Bulk import of archive records (CSV or JSONL) into the database and this session"""
+    with st.expander("📥 Historical Incident Import"):
+        uploaded = st.file_uploader("IMD / NDMA archive (CSV or JSONL, optionally gzipped)",
+                                    type=['csv', 'jsonl', 'json', 'gz'], key="import_file")
+        source = st.text_input("Source", value="IMD", key="import_source")
+
+        if uploaded is not None and st.button("📥 Import Records", use_container_width=True):
+            incidents = st.session_state.incidents
+            first_id = max((incident.get('id', 0) for incident in incidents), default=0) + 1
+            imported = []
+            status = st.empty()
+
+            def add_to_session(rows):
+                imported.extend(session_incidents_from_rows(rows, first_id + len(imported)))
+
+            def report(stats):
+                status.info(f"📥 {stats['read']} records read, {stats['rejected']} rejected...")
+
+            try:
+                stats = import_incidents(read_import_records(uploaded), source=source,
+                                         defer_indexes=uploaded.size >= DEFER_INDEXES_MIN_BYTES,
+                                         on_rows=add_to_session, progress_callback=report)
+            except IMPORT_ERRORS as e:
+                stats = None
+                status.error(f"❌ Import stopped: {e}. {len(imported)} records committed before the error were kept.")
+
+            # Derived views are rebuilt once from the extended list
+            if imported:
+                incidents.extend(imported)
+                bump_incidents_version()
+                log_user_action("INCIDENTS_IMPORTED", f"{len(imported)} {source} records imported")
+            if stats is None:
+                return
+
+            status.success(f"✅ Imported {stats['imported']} of {stats['read']} records in {stats['seconds']:.1f}s "
+                           f"({stats['rows_per_second']:.0f} rows/s, {stats['geocoded_locations']} locations geocoded)")
+            if stats['rejected']:
+                st.warning(f"⚠️ {stats['rejected']} records rejected")
+                st.dataframe(pd.DataFrame(stats['errors'], columns=['Record', 'Reason']), hide_index=True)
+
+def show_tiled_imagery_controls():
+    """Official controls for tiled drone/satellite hazard overlays"""
+    if 'tiled_analyses' not in st.session_state:
+        st.session_state.tiled_analyses = []
+
+    with st.expander("🛰️ Drone / Satellite Imagery Analysis"):
+        image_path = st.text_input("Image path on server", placeholder="/data/drone/mosaic.tif")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            tile_size = st.selectbox("Tile size (px)", [256, 512, 1024], index=1)
+        with col2:
+            hazard_label = st.selectbox("Hazard layer", list(HAZARD_LAYERS))
+        with col3:
+            opacity = st.slider("Overlay opacity", 0.1, 1.0, 0.7)
+
+        st.caption("Bounds are read from GeoTIFF georeferencing when available; otherwise enter them below.")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            south = st.number_input("South lat", value=0.0, format="%.5f")
+        with col2:
+            west = st.number_input("West lon", value=0.0, format="%.5f")
+        with col3:
+            north = st.number_input("North lat", value=0.0, format="%.5f")
+        with col4:
+            east = st.number_input("East lon", value=0.0, format="%.5f")
+
+        if st.button("🔍 Analyze Imagery", disabled=not image_path):
+            if not os.path.exists(image_path):
+                st.error(f"File not found: {image_path}")
+            else:
+                progress_bar = st.progress(0)
+                try:
+                    result = analyze_large_image_tiled(
+                        image_path, tile_size=tile_size,
+                        progress_callback=lambda done, total: progress_bar.progress(done / total))
+                    st.session_state.tiled_analyses.append(result)
+                    rows, cols = result['grid_shape']
+                    st.success(f"✅ Analyzed {rows * cols} tiles in {result['seconds']:.1f}s")
+                except Exception as e:
+                    st.error(f"Imagery analysis failed: {str(e)}")
+
+        manual_bounds = [[south, west], [north, east]] if north > south and east > west else None
+        hazard_class = HAZARD_LAYERS[hazard_label]
+
+        overlays = []
+        for result in st.session_state.tiled_analyses:
+            bounds = result['bounds'] or manual_bounds
+            flagged = int(np.sum(~np.isnan(result['hazard_grids'][hazard_class])))
+            rows, cols = result['grid_shape']
+            st.write(f"**{os.path.basename(result['path'])}:** {hazard_label} in {flagged}/{rows * cols} tiles")
+            if bounds:
+                overlays.append((result, hazard_class, bounds, opacity))
+            else:
+                st.warning("No georeferencing found - enter bounds to place this overlay on the map")
+
+        if st.session_state.tiled_analyses and st.button("🗑️ Clear Imagery Overlays"):
+            st.session_state.tiled_analyses = []
+            st.rerun()
+
+    return overlays
+
+def get_current_ocean_warnings():
+    """Ocean warnings for this session, refreshed every OCEAN_WARNINGS_REFRESH_SECONDS
+
+    Returns (warnings, version); the version changes only when the warnings are refreshed.
+    """
+    now = time.time()
+    if now - st.session_state.get('ocean_warnings_refreshed_at', 0) > OCEAN_WARNINGS_REFRESH_SECONDS:
+        st.session_state.ocean_warnings = generate_ocean_warnings()
+        st.session_state.ocean_warnings_refreshed_at = now
+        st.session_state.ocean_warnings_version = st.session_state.get('ocean_warnings_version', 0) + 1
+    return st.session_state.ocean_warnings, st.session_state.ocean_warnings_version
+
+def get_incident_store():
+    """Columnar copy of this session's incidents, row i being st.session_state.incidents[i]"""
+    if 'incident_store' not in st.session_state:
+        st.session_state.incident_store = create_incident_store()
+    return sync_incident_store(st.session_state.incident_store, st.session_state.incidents,
+                               st.session_state.incidents_version, st.session_state.incident_changes)
+
+def get_incident_query_index():
+    """Bitmap query index over this session's incidents, row i being st.session_state.incidents[i]"""
+    if 'incident_query_index' not in st.session_state:
+        st.session_state.incident_query_index = create_query_index()
+    return sync_query_index(st.session_state.incident_query_index, st.session_state.incidents,
+                            st.session_state.incidents_version, st.session_state.incident_changes)
+
+def get_incident_rollups():
+    """Analytics rollups of this session's incidents, brought up to the current incidents version"""
+    if 'incident_rollups' not in st.session_state:
+        st.session_state.incident_rollups = create_incident_rollups()
+    return sync_incident_rollups(st.session_state.incident_rollups, st.session_state.incidents,
+                                 st.session_state.incidents_version, st.session_state.incident_changes)
+
+def get_volunteer_matches(username):
+    """Distance, ETA and match score of every incident for this session's volunteer"""
+    if 'volunteer_matches' not in st.session_state:
+        st.session_state.volunteer_matches = create_match_cache()
+    return sync_volunteer_matches(st.session_state.volunteer_matches, get_volunteer(username), get_incident_store())
+
+def get_incident_queue(queue_name):
+    """Work queue for this session, brought up to the current incidents version"""
+    queues = st.session_state.setdefault('incident_queues', {})
+    if queue_name not in queues:
+        queues[queue_name] = create_incident_queue(queue_name)
+    return sync_incident_queue(queues[queue_name], st.session_state.incidents, st.session_state.incidents_version,
+                               st.session_state.incident_changes)
+
+def get_incident_queue_page(queue_name, page_size=QUEUE_PAGE_SIZE):
+    """Current page of a work queue for this session
+
+    Returns (incidents, total count, page number, next cursor).
+    """
+    queue = get_incident_queue(queue_name)
+
+    # Cursor stack: one entry per page the user has moved through
+    cursors = st.session_state.setdefault('queue_cursors', {}).setdefault(queue_name, [None])
+    page, next_cursor = queue_page(queue, cursors[-1], page_size)
+    if not page and len(cursors) > 1:
+        # Everything past the cursor was resolved; start again from the top
+        del cursors[1:]
+        page, next_cursor = queue_page(queue, None, page_size)
+    return page, queue_count(queue), len(cursors), next_cursor
+
+def show_queue_navigation(queue_name, next_cursor):
+    """Previous page / load more buttons for a work queue"""
+    cursors = st.session_state.queue_cursors[queue_name]
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("⬆️ Previous", key=f"queue_prev_{queue_name}", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if len(cursors) > 1 and st.button("⏫ Back to Top", key=f"queue_top_{queue_name}", use_container_width=True):
+            del cursors[1:]
+            st.rerun()
+    with col3:
+        if next_cursor is not None and st.button("⬇️ Load Next Page", key=f"queue_next_{queue_name}", use_container_width=True):
+            cursors.append(next_cursor)
+            st.rerun()
+
 def show_enhanced_live_map():
     """Enhanced live map with ocean hazard visualization"""
     st.header("🗺️ Enhanced Live Disaster & Ocean Hazard Map")
 
-    if st.session_state.incidents:
-        enhanced_map = create_enhanced_india_map(st.session_state.incidents)
-        
+    hazard_overlays = []
+    if st.session_state.user_type == "Official":
+        hazard_overlays = show_tiled_imagery_controls()
+
+    if st.session_state.incidents or hazard_overlays:
+        # Cluster hierarchy grows incrementally as incidents are reported
+        if 'incident_cluster_index' not in st.session_state:
+            st.session_state.incident_cluster_index = create_cluster_index()
+        cluster_index = st.session_state.incident_cluster_index
+        if cluster_index.get('version') != st.session_state.incidents_version:
+            sync_cluster_index(cluster_index, st.session_state.incidents)
+            cluster_index['version'] = st.session_state.incidents_version
+
+        # Kernel-density risk surface, updated with the incidents reported since the last render
+        show_risk_surface = st.checkbox("🔥 Show risk density surface", value=True,
+                                        help="Concentration of incidents weighted by priority and ocean hazard level")
+        risk_surface = None
+        if show_risk_surface:
+            if 'incident_risk_surface' not in st.session_state:
+                st.session_state.incident_risk_surface = create_risk_surface()
+            risk_surface = st.session_state.incident_risk_surface
+            if risk_surface.get('version') != st.session_state.incidents_version:
+                sync_risk_surface(risk_surface, st.session_state.incidents)
+                risk_surface['version'] = st.session_state.incidents_version
+
+        if 'map_view' not in st.session_state:
+            st.session_state.map_view = {'center': (20.5937, 78.9629), 'zoom': 5, 'bounds': None}
+        view = st.session_state.map_view
+        ocean_warnings, warnings_version = get_current_ocean_warnings()
+
+        # Reruns from unrelated widgets and pans inside the rendered area reuse the built map;
+        # the stored centre is only the initial location of a re-rendered view
+        map_key = (
+            st.session_state.incidents_dataset_id, st.session_state.incidents_version, warnings_version,
+            view['zoom'], view['bounds'], st.session_state.user_type, show_risk_surface,
+            tuple((result['path'], result['seconds'], hazard_class, str(bounds), opacity)
+                  for result, hazard_class, bounds, opacity in hazard_overlays)
+        )
+        enhanced_map, map_cached = get_cached_map(map_key, lambda: create_enhanced_india_map(
+            st.session_state.incidents, view['center'][0], view['center'][1],
+            hazard_overlays=hazard_overlays, zoom=view['zoom'], bounds=view['bounds'],
+            cluster_index=cluster_index, ocean_warnings=ocean_warnings, risk_surface=risk_surface
+        ))
+
+        map_data = None
         try:
             from streamlit_folium import st_folium
-            map_data = st_folium(enhanced_map, width=700, height=600)
+            map_data = st_folium(enhanced_map, width=700, height=600, key="enhanced_live_map",
+                                 returned_objects=["zoom", "center", "bounds", "last_active_drawing"],
+                                 render=not map_cached)
         except:
             st.error("Enhanced map requires streamlit-folium. Install with: pip install streamlit-folium")
             
@@ -734,5 +1034,25 @@ def show_enhanced_live_map():
             for incident in st.session_state.incidents:
                 with st.expander(f"{incident['disaster_type']} - {incident['location']}"):
                     st.write(f"Severity: {incident['severity']} | Priority: {incident.get('priority_score', 'N/A')}/100")
+
+        # Incident detail is only rendered for the clicked feature
+        clicked = (map_data or {}).get('last_active_drawing') or {}
+        clicked_id = (clicked.get('properties') or {}).get('id')
+        clicked_incident = next((inc for inc in st.session_state.incidents if inc.get('id') == clicked_id), None)
+        if clicked_incident:
+            st.markdown(incident_detail_html(clicked_incident), unsafe_allow_html=True)
+
+        # Re-cluster when the zoom changes or the viewport leaves the rendered area
+        if map_data and map_data.get('zoom') is not None and map_data.get('center'):
+            visible_bounds = leaflet_bounds_to_tuple(map_data.get('bounds'))
+            zoom_changed = map_data['zoom'] != view['zoom']
+            panned_out = visible_bounds is not None and not bounds_contain(view['bounds'], visible_bounds)
+            if zoom_changed or panned_out:
+                st.session_state.map_view = {
+                    'center': (map_data['center']['lat'], map_data['center']['lng']),
+                    'zoom': map_data['zoom'],
+                    'bounds': pad_bounds(visible_bounds) if visible_bounds else view['bounds']
+                }
+                st.rerun()
     else:
         st.info("No incidents to display on map yet.")
\ No newline at end of file
@@ -0,0 +1,191 @@
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+from PIL import Image
+from ai_analysis import run_authenticity_cascade, AUTHENTIC_THRESHOLD
+from classifier_backends import classify_disaster_with_backend
+
+# Video evidence analysis
+# Frames are decoded as a stream and only a few per second are compared
+# against the last keyframe with a small hue/saturation histogram; the full
+# classification and authenticity pipeline runs once per detected scene.
+
+VIDEO_EXTENSIONS = ('mp4', 'mov', 'avi', 'mkv', 'webm', '3gp')
+SCENE_SAMPLE_FPS = 2              # frames per second checked for scene changes
+SCENE_CHANGE_THRESHOLD = 0.35     # Bhattacharyya distance between histograms
+MIN_SCENE_SECONDS = 1.0
+MAX_KEYFRAMES = 24
+KEYFRAME_MAX_SIDE = 1280
+KEYFRAME_WORKERS = 4
+
+def _frame_signature(frame):
+    """Normalized hue/saturation histogram of a downscaled frame"""
+    small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [16, 16], [0, 180, 0, 256])
+    return cv2.normalize(hist, hist).flatten()
+
+def _frame_to_image(frame):
+    """BGR video frame to an RGB PIL image capped at KEYFRAME_MAX_SIDE"""
+    height, width = frame.shape[:2]
+    scale = KEYFRAME_MAX_SIDE / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+def extract_keyframes(path, sample_fps=SCENE_SAMPLE_FPS, threshold=SCENE_CHANGE_THRESHOLD,
+                      max_keyframes=MAX_KEYFRAMES, stats=None):
+    """Yield (timestamp_seconds, image) for the first frame of each scene
+
+    Every frame is still decoded by grab(); frames between samples skip
+    retrieve(), i.e. the copy and colour conversion to a BGR array.
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError("Could not open video")
+
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        step = max(int(round(fps / sample_fps)), 1)
+        last_signature = None
+        last_keyframe_time = -MIN_SCENE_SECONDS
+        frame_index = 0
+        keyframes = 0
+
+        while keyframes < max_keyframes:
+            if not capture.grab():
+                break
+            frame_index += 1
+            if (frame_index - 1) % step:
+                continue
+
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+
+            timestamp = (frame_index - 1) / fps
+            signature = _frame_signature(frame)
+            if last_signature is None or (
+                    timestamp - last_keyframe_time >= MIN_SCENE_SECONDS and
+                    cv2.compareHist(last_signature, signature, cv2.HISTCMP_BHATTACHARYYA) > threshold):
+                last_signature = signature
+                last_keyframe_time = timestamp
+                keyframes += 1
+                yield timestamp, _frame_to_image(frame)
+
+        if stats is not None:
+            # Scanning stops at max_keyframes; the container's frame count then gives the length
+            stats['frames_scanned'] = frame_index
+            stats['frames'] = frame_index
+            if keyframes >= max_keyframes:
+                stats['frames'] = max(int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0), frame_index)
+            stats['fps'] = fps
+            stats['duration'] = stats['frames'] / fps
+    finally:
+        capture.release()
+
+def analyze_keyframe(timestamp, image):
+    """Classification and authenticity for one keyframe"""
+    disaster_type, confidence, class_msg, classification_features = classify_disaster_with_backend(image)
+    is_authentic, auth_score, auth_msg, authenticity_features = run_authenticity_cascade(image)
+    return {
+        'timestamp': timestamp,
+        'disaster_type': disaster_type,
+        'confidence': confidence,
+        'class_msg': class_msg,
+        'is_authentic': is_authentic,
+        'auth_score': auth_score,
+        'auth_msg': auth_msg,
+        'classification_features': classification_features,
+        'authenticity_features': authenticity_features
+    }
+
+def aggregate_video_verdict(frame_results):
+    """Combine keyframe results into one verdict for the video"""
+    if not frame_results:
+        return None
+
+    # Confidence-weighted vote; "Natural Disaster" only wins when nothing specific was seen
+    votes = defaultdict(float)
+    for result in frame_results:
+        votes[result['disaster_type']] += result['confidence']
+    specific = {k: v for k, v in votes.items() if k != "Natural Disaster"}
+    disaster_type = max(specific or votes, key=(specific or votes).get)
+
+    matching = [r for r in frame_results if r['disaster_type'] == disaster_type]
+    representative = max(matching, key=lambda r: r['confidence'])
+    confidence = float(np.mean([r['confidence'] for r in matching]))
+
+    auth_scores = [r['auth_score'] for r in frame_results]
+    recycled = [r for r in frame_results if r['authenticity_features'].get('recycled')]
+    authentic_frames = sum(1 for r in frame_results if r['is_authentic'])
+    auth_score = float(np.mean(auth_scores))
+    is_authentic = not recycled and authentic_frames * 2 > len(frame_results) and auth_score > AUTHENTIC_THRESHOLD
+
+    if recycled:
+        auth_msg = f"{recycled[0]['auth_msg']} (scene at {recycled[0]['timestamp']:.1f}s)"
+    else:
+        auth_msg = (f"{'✅' if is_authentic else '⚠️'} {authentic_frames}/{len(frame_results)} scenes look authentic "
+                    f"(lowest {min(auth_scores):.0f}%)")
+
+    class_msg = f"{disaster_type} in {len(matching)}/{len(frame_results)} scenes - {representative['class_msg']}"
+
+    return {
+        'disaster_type': disaster_type,
+        'confidence': confidence,
+        'class_msg': class_msg,
+        'is_authentic': is_authentic,
+        'auth_score': auth_score,
+        'auth_msg': auth_msg,
+        'classification_features': representative['classification_features'],
+        'authenticity_features': representative['authenticity_features']
+    }
+
+def analyze_video(path, workers=KEYFRAME_WORKERS, progress_callback=None):
+    """Analyze the keyframes of a video in parallel and aggregate a verdict"""
+    stats = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_keyframe, timestamp, image)
+                   for timestamp, image in extract_keyframes(path, stats=stats)]
+
+        frame_results = []
+        for future in futures:
+            frame_results.append(future.result())
+            if progress_callback:
+                progress_callback(len(frame_results), len(futures))
+
+    verdict = aggregate_video_verdict(frame_results)
+    if verdict is None:
+        raise ValueError("No frames could be decoded from the video")
+
+    verdict.update({
+        'keyframes': [{k: r[k] for k in ('timestamp', 'disaster_type', 'confidence', 'auth_score')}
+                      for r in frame_results],
+        'frames': stats.get('frames', 0),
+        'frames_scanned': stats.get('frames_scanned', 0),
+        'duration': stats.get('duration', 0.0)
+    })
+    return verdict
+
+def analyze_video_bytes(video_bytes, extension='mp4', **kwargs):
+    """analyze_video for an upload held in memory"""
+    handle, path = tempfile.mkstemp(suffix='.' + extension)
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(video_bytes)
+        return analyze_video(path, **kwargs)
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    import sys
+
+    for video_path in sys.argv[1:]:
+        verdict = analyze_video(video_path)
+        print(f"{video_path}: {len(verdict['keyframes'])} scenes from {verdict['frames_scanned']} of "
+              f"{verdict['frames']} frames ({verdict['duration']:.1f}s)")
+        print(f"  {verdict['class_msg']}")
+        print(f"  {verdict['auth_msg']}")
@@ -0,0 +1,164 @@
+import os
+import time
+import threading
+import numpy as np
+from config_and_database import get_db_connection, geocode_location_enhanced
+from incident_store import incident_column
+
+# Volunteer-incident distance, ETA and match score
+# A volunteer's registered location is looked up and geocoded when their
+# view is first rendered (each distinct location text once per process).
+# Distances are a vectorized haversine matrix between volunteer and
+# incident coordinates (the incident store's latitude/longitude columns).
+# Each session caches its volunteer's distance, ETA and score for every
+# stored incident and only computes rows that are new or whose coordinates
+# or hazard level changed since the last sync, so rendering a long list is
+# a dict lookup per card.
+
+EARTH_RADIUS_KM = 6371.0088
+# route_factor converts straight-line distance to travelled distance
+SPEED_PROFILES = {
+    'road': {'speed_kmh': float(os.environ.get('HARBINGER_ROAD_SPEED_KMH', '35')), 'route_factor': 1.3,
+             'mobilization_minutes': 10},
+    'boat': {'speed_kmh': float(os.environ.get('HARBINGER_BOAT_SPEED_KMH', '25')), 'route_factor': 1.1,
+             'mobilization_minutes': 20}
+}
+BOAT_MIN_OCEAN_LEVEL = 2   # ocean-certified volunteers reach these incidents by boat
+MATCH_DISTANCE_SCALE_KM = 25.0   # distance at which the location part of the score falls to 1/e
+MATCH_DISTANCE_WEIGHT = 0.6
+RESPONSE_SKILLS = {'First Aid', 'Emergency Medical', 'Search & Rescue', 'Crisis Management'}
+VOLUNTEER_REFRESH_SECONDS = 60
+
+_volunteers_lock = threading.Lock()
+_volunteers = {}   # username -> (time looked up, volunteer or None for other users)
+_positions = {}    # registered location text -> (lat, lon), NaN if it could not be resolved
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between coordinates in degrees; broadcasts like NumPy"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def volunteer_distance_matrix(volunteers, latitude, longitude):
+    """Distances in km, one row per volunteer and one column per incident coordinate"""
+    return haversine_km(volunteers['latitude'][:, None], volunteers['longitude'][:, None],
+                        np.asarray(latitude)[None, :], np.asarray(longitude)[None, :]).astype(np.float32)
+
+def _volunteer_position(location):
+    """Coordinates of a registered location, geocoded once per distinct text"""
+    with _volunteers_lock:
+        position = _positions.get(location)
+    if position is None:
+        lat, lon, message = geocode_location_enhanced(location)
+        position = (np.nan, np.nan) if not location or message.startswith("⚠️") else (lat, lon)
+        with _volunteers_lock:
+            _positions[location] = position
+    return position
+
+def _volunteer_record(username, location, skills, ocean_certified):
+    lat, lon = _volunteer_position(location or "")
+    return {'username': username, 'latitude': np.array([lat]), 'longitude': np.array([lon]),
+            'ocean_certified': bool(ocean_certified),
+            'responder': bool(RESPONSE_SKILLS & set((skills or "").split(', ')))}
+
+def get_volunteer(username):
+    """One volunteer's position and skills, None if the user is not a registered volunteer
+
+    Looked up at most every VOLUNTEER_REFRESH_SECONDS per user (misses
+    included), so a changed registration is picked up without querying on
+    every render. Only this volunteer's location is geocoded.
+    """
+    with _volunteers_lock:
+        entry = _volunteers.get(username)
+    if entry is not None and time.time() - entry[0] < VOLUNTEER_REFRESH_SECONDS:
+        return entry[1]
+
+    with get_db_connection() as conn:
+        row = conn.execute("""SELECT location, skills, ocean_certified FROM users
+                              WHERE username = ? AND user_type = 'Volunteer'""", (username,)).fetchone()
+    volunteer = None if row is None else _volunteer_record(username, *row)
+    with _volunteers_lock:
+        _volunteers[username] = (time.time(), volunteer)
+    return volunteer
+
+def travel_estimates(distance_km, ocean_level, ocean_certified):
+    """ETA in minutes and whether each incident is reached by boat"""
+    by_boat = (ocean_level >= BOAT_MIN_OCEAN_LEVEL) & ocean_certified
+    road, boat = SPEED_PROFILES['road'], SPEED_PROFILES['boat']
+    eta = np.where(by_boat,
+                   boat['mobilization_minutes'] + distance_km * boat['route_factor'] / boat['speed_kmh'] * 60,
+                   road['mobilization_minutes'] + distance_km * road['route_factor'] / road['speed_kmh'] * 60)
+    return eta.astype(np.float32), by_boat
+
+def match_scores(distance_km, ocean_level, volunteer):
+    """0-100 compatibility from distance and whether the volunteer's skills suit the incident"""
+    if volunteer['ocean_certified']:
+        skill_fit = np.ones(len(ocean_level))
+    else:
+        skill_fit = np.where(ocean_level > 0, 0.4, 1.0 if volunteer['responder'] else 0.7)
+    nearness = np.exp(-distance_km / MATCH_DISTANCE_SCALE_KM)
+    return 100 * (MATCH_DISTANCE_WEIGHT * nearness + (1 - MATCH_DISTANCE_WEIGHT) * skill_fit)
+
+def create_match_cache():
+    """Empty per-session match cache"""
+    return {'volunteer': None, 'store_version': None, 'size': 0, 'rows': {},
+            'snapshot': {name: np.empty(0) for name in ('id', 'latitude', 'longitude', 'ocean_hazard_level')},
+            'distance_km': np.empty(0, dtype=np.float32), 'eta_minutes': np.empty(0, dtype=np.float32),
+            'by_boat': np.empty(0, dtype=bool), 'score': np.empty(0, dtype=np.float32)}
+
+def _changed_rows(cache, store):
+    """Stored rows that are new or differ from the cached snapshot"""
+    size, cached = store['size'], min(cache['size'], store['size'])
+    changed = np.zeros(size, dtype=bool)
+    changed[cached:] = True
+    for name, snapshot in cache['snapshot'].items():
+        current, previous = incident_column(store, name)[:cached], snapshot[:cached]
+        differs = current != previous
+        if current.dtype.kind == 'f':
+            differs &= ~(np.isnan(current) & np.isnan(previous))
+        changed[:cached] |= differs
+    return np.flatnonzero(changed)
+
+def sync_volunteer_matches(cache, volunteer, store):
+    """Bring distance, ETA and score up to date with the store for one volunteer"""
+    key = None if volunteer is None else (volunteer['username'], f"{volunteer['latitude'][0]:.6f}",
+                                          f"{volunteer['longitude'][0]:.6f}", volunteer['ocean_certified'],
+                                          volunteer['responder'])
+    if key is None or cache['volunteer'] != key:
+        cache.update(create_match_cache())
+        cache['volunteer'] = key
+    if volunteer is None or cache['store_version'] == store['version']:
+        return cache
+
+    rows = _changed_rows(cache, store)
+    size = store['size']
+    for name in ('distance_km', 'eta_minutes', 'by_boat', 'score'):
+        grown = np.zeros(size, dtype=cache[name].dtype)
+        kept = min(size, len(cache[name]))
+        grown[:kept] = cache[name][:kept]
+        cache[name] = grown
+
+    if len(rows):
+        ocean_level = incident_column(store, 'ocean_hazard_level')[rows]
+        distance = volunteer_distance_matrix(volunteer, incident_column(store, 'latitude')[rows],
+                                             incident_column(store, 'longitude')[rows])[0]
+        cache['distance_km'][rows] = distance
+        cache['eta_minutes'][rows], cache['by_boat'][rows] = travel_estimates(distance, ocean_level,
+                                                                             volunteer['ocean_certified'])
+        cache['score'][rows] = match_scores(distance, ocean_level, volunteer)
+        cache['rows'].update(zip(incident_column(store, 'id')[rows].tolist(), rows.tolist()))
+
+    cache['snapshot'] = {name: incident_column(store, name).copy() for name in cache['snapshot']}
+    cache['size'] = size
+    cache['store_version'] = store['version']
+    return cache
+
+def incident_match(cache, incident_id):
+    """Distance, ETA, travel mode and score for an incident; None if unknown"""
+    row = cache['rows'].get(incident_id)
+    # Rows can be reassigned when the store is rebuilt; the snapshot has the current ids
+    if row is None or row >= cache['size'] or cache['snapshot']['id'][row] != incident_id \
+            or np.isnan(cache['distance_km'][row]):
+        return None
+    return {'distance_km': float(cache['distance_km'][row]), 'eta_minutes': int(round(cache['eta_minutes'][row])),
+            'profile': 'boat' if cache['by_boat'][row] else 'road', 'score': int(round(cache['score'][row]))}